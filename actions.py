@@ -0,0 +1,170 @@
+import importlib
+import threading
+from urllib.parse import urlparse
+
+# 动作插件：shortcuts.json 中的 "action" 字段选择快捷键触发时做什么，缺省为 "command"（启动进程）。
+# 其他动作在分派器的工作线程中于本进程内执行，不创建进程：
+#   {"action": "url", "command": "https://example.com"}            用缓存的浏览器控制器打开网址
+#   {"action": "text", "command": "此致敬礼", "delay": 0}            在当前窗口输入文本
+#   {"action": "clipboard", "command": "文本", "paste": true}        放入剪贴板，paste 为真时随后粘贴
+#   {"action": "python", "command": "模块:函数", "args": [], "kwargs": {}}  调用 Python 函数
+# 第三方插件通过 entry points（组名见 ENTRY_POINT_GROUP）安装，或调用 ActionRegistry.register 注册。
+
+COMMAND = "command"
+ENTRY_POINT_GROUP = "shortcutmanager.actions"
+
+# 内置动作以 "模块:属性" 登记，第一次用到时才创建
+BUILTIN_ACTIONS = {
+    "url": "actions:UrlAction",
+    "text": "actions:TextAction",
+    "clipboard": "actions:ClipboardAction",
+    "python": "actions:PythonAction",
+}
+
+
+def loadObject(reference):
+    #按 "包.模块:属性" 导入对象#
+    module, _, attribute = reference.partition(":")
+    if not module or not attribute:
+        raise ValueError(f"引用必须是 模块:属性 的形式: {reference}")
+    target = importlib.import_module(module)
+    for name in attribute.split("."):
+        target = getattr(target, name)
+    return target
+
+
+class UrlAction:
+    #打开网址；浏览器控制器只查找一次#
+
+    def __init__(self):
+        self.browser = None
+        self.lock = threading.Lock()
+
+    def check(self, command, data):
+        if not urlparse(command).scheme:
+            raise ValueError(f"网址缺少协议（如 https://）: {command}")
+
+    def run(self, command, data):
+        browser = self.browser
+        if browser is None:
+            import webbrowser
+            with self.lock:
+                if self.browser is None:
+                    self.browser = webbrowser.get()
+                browser = self.browser
+        if not browser.open(command):
+            raise OSError(f"无法打开网址: {command}")
+
+
+class TextAction:
+    #在当前窗口输入文本；keyboard.write 会先释放仍按着的修改键，输入后再恢复#
+
+    def check(self, command, data):
+        pass
+
+    def run(self, command, data):
+        import keyboard
+        keyboard.write(command, delay=data.get("delay", 0))
+
+
+class ClipboardAction:
+    #把文本放入剪贴板（需要 pyperclip），"paste": true 时随后发送 ctrl+v#
+
+    def check(self, command, data):
+        pass
+
+    def run(self, command, data):
+        try:
+            import pyperclip
+        except ImportError:
+            raise RuntimeError("请安装pyperclip库: pip install pyperclip")
+        pyperclip.copy(command)
+        if data.get("paste"):
+            import keyboard
+            state = keyboard.stash_state()
+            try:
+                keyboard.send("ctrl+v")
+            finally:
+                keyboard.restore_modifiers(state)
+
+
+class PythonAction:
+    #调用 "模块:函数"，函数在第一次触发时导入并缓存#
+
+    def __init__(self):
+        self.functions = {}
+
+    def check(self, command, data):
+        module, _, attribute = command.partition(":")
+        if not module or not attribute:
+            raise ValueError(f"Python 动作的命令必须是 模块:函数 的形式: {command}")
+        if not isinstance(data.get("args", []), list) or not isinstance(data.get("kwargs", {}), dict):
+            raise ValueError("args 必须是数组，kwargs 必须是对象")
+
+    def run(self, command, data):
+        function = self.functions.get(command)
+        if function is None:
+            function = self.functions[command] = loadObject(command)
+        function(*data.get("args", ()), **data.get("kwargs", {}))
+
+
+class ActionRegistry:
+    #动作类型名 -> 动作插件，插件在第一次用到时才导入和创建#
+    # 插件是有 check(command, data) 和 run(command, data) 方法的对象：
+    # check 在添加或加载快捷键时校验参数（无效时抛出 ValueError），run 在工作线程中执行。
+
+    def __init__(self):
+        self.factories = dict(BUILTIN_ACTIONS)
+        self.actions = {}
+        self.discovered = False
+        self.lock = threading.Lock()
+
+    def register(self, name, factory):
+        #注册动作类型，factory 为 "模块:属性" 或返回插件对象的可调用对象#
+        with self.lock:
+            self.factories[name] = factory
+            self.actions.pop(name, None)
+
+    def discover(self):
+        #读取通过 entry points 安装的插件（只登记，不导入）#
+        self.discovered = True
+        try:
+            from importlib.metadata import entry_points
+            try:
+                found = entry_points(group=ENTRY_POINT_GROUP)
+            except TypeError:
+                found = entry_points().get(ENTRY_POINT_GROUP, [])
+        except Exception:
+            return
+        for entry in found:
+            self.factories.setdefault(entry.name, entry.value)
+
+    def get(self, name):
+        action = self.actions.get(name)
+        if action is not None:
+            return action
+        with self.lock:
+            action = self.actions.get(name)
+            if action is not None:
+                return action
+            factory = self.factories.get(name)
+            if factory is None and not self.discovered:
+                self.discover()
+                factory = self.factories.get(name)
+            if factory is None:
+                raise ValueError(f"未知的动作类型: {name}")
+            if isinstance(factory, str):
+                factory = loadObject(factory)
+            action = self.actions[name] = factory()
+        return action
+
+    def check(self, name, command, data):
+        #校验动作类型和参数，无效时抛出 ValueError#
+        try:
+            action = self.get(name)
+        except ImportError as e:
+            raise ValueError(f"无法加载动作插件 {name}: {str(e)}")
+        action.check(command, data)
+
+    def run(self, name, command, data):
+        self.get(name).run(command, data)
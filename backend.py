@@ -1,211 +1,623 @@
-import json
-import os
-import sys
+import time
 import asyncio
 import threading
-import winreg
-import subprocess
-from PyQt5.QtCore import QObject, pyqtSignal
+from hotkeys import HotkeyRegistry
+from dispatcher import TriggerDispatcher, Throttle
+from launcher import CommandLauncher
+from actions import ActionRegistry, COMMAND
+from supervisor import ProcessSupervisor
+from storage import openStore, MigrationError
+from watcher import ConfigWatcher
+from chords import parseSequence, canonicalShortcut
+from conflicts import ConflictIndex
+from events import EventBus, DEBUG, INFO, WARNING, ERROR, TRIGGER, EXEC, EXIT
+from latency import LatencyRecorder
+from notifier import Signal, DirectNotifier
+from platforms import currentPlatform, startupCommand
 
-class ShortcutBackend(QObject):
-    shortcutTriggered = pyqtSignal(str)
-    statusUpdate = pyqtSignal(str)
+class BatchError(Exception):
+    #批量修改失败，index 为出错操作的序号（应用阶段出错时为 None）#
+    def __init__(self, message, index=None):
+        super().__init__(message)
+        self.index = index
 
-    def __init__(self):
-        super().__init__()
-        self.configFile = "shortcuts.json"
+
+class ShortcutBatch:
+    #快捷键批量修改，配合 ShortcutBackend.batch() 使用#
+    def __init__(self, backend):
+        self.backend = backend
+        self.operations = []
+
+    def add(self, shortcut, command, description="", **options):
+        self.operations.append(("add", shortcut, command, description, options))
+
+    def remove(self, shortcut):
+        self.operations.append(("remove", shortcut))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, exc, traceback):
+        if excType is None:
+            self.backend.applyBatch(self.operations)
+        return False
+
+
+class ShortcutBackend:
+    #快捷键引擎，不依赖 Qt#
+    # 快捷键表只在所属线程（界面线程或无界面运行时的主线程）中修改；
+    # 其他线程需要修改时通过 notifier.post(函数, *参数) 投递到所属线程执行。
+    # 界面使用 Qt 事件循环投递，无界面运行使用 notifier.LoopNotifier。
+
+    def __init__(self, configFile="shortcuts.json", sequenceTimeout=1.0, workers=4, maxQueue=64,
+                 overflowPolicy='coalesce', watchConfig=True, traceLatency=False,
+                 notifier=None, platform=None, rpcSocket=None):
+        # 快捷键触发：在工作线程中以 "快捷键 ... 触发: 命令" 文本调用
+        self.shortcutTriggered = Signal()
+        # 快捷键表变化：{快捷键: 新数据或 None（已删除）}，在所属线程中调用
+        self.shortcutsChanged = Signal()
+        self.notifier = notifier or DirectNotifier()
+        # 开机自启动、打开网址等平台相关操作
+        self.platform = platform or currentPlatform()
+        # configFile 以 .db/.sqlite 结尾时使用 SQLite 存储，否则使用 JSON 文件
+        self.configFile = configFile
         self.shortcuts = {}
+        # 状态消息写入固定容量的事件缓冲区，由界面按固定频率汇总显示
+        self.events = EventBus()
         self.isRunning = False
+        # 键盘钩子安装完成、快捷键可以触发时置位，armedAt 为当时的 perf_counter
+        self.armed = threading.Event()
+        self.armedAt = None
         self.loop = None
         self.thread = None
+        self.stopEvent = None
+        # sequenceTimeout: 多步快捷键（如 "ctrl+k, ctrl+c"）两步之间允许的最长间隔（秒）
+        self.registry = HotkeyRegistry(self.dispatchShortcut, sequenceTimeout=sequenceTimeout)
+        # 启动监听时在所属线程上生成的 {快捷键: 组合键} 快照，监听线程同步注册表后置为 None
+        self.pendingHotkeys = None
+        # 钩子回调只负责入队，命令由分派器在有界线程池中执行
+        self.dispatcher = TriggerDispatcher(self.handleShortcut, concurrency=workers,
+                                            maxQueue=maxQueue, overflow=overflowPolicy)
+        self.launcher = CommandLauncher()
+        # 非 command 动作（url、text、clipboard、python 及插件）在本进程内执行，不创建进程
+        self.actions = ActionRegistry()
+        self.supervisor = ProcessSupervisor(onExit=self.onProcessExit)
+        # traceLatency: 记录从按键到进程启动各阶段的延迟直方图
+        self.latency = LatencyRecorder(traceLatency)
+        # rpcSocket: JSON-RPC 控制接口的 Unix 域套接字路径（见 rpc.py），为 None 时不启动
+        self.rpcSocket = rpcSocket
+        self.throttles = {}
+        self.repeatable = set()
+        self.conflicts = ConflictIndex()
+        self.store = openStore(self.configFile, onSaved=self.onConfigSaved, onError=self.onConfigError)
         self.loadConfig()
+        # 外部修改 shortcuts.json 时增量应用，忽略自身写入；
+        # 监视线程解析出的配置投递到所属线程应用
+        self.watcher = ConfigWatcher(self.configFile, self.onConfigFileChanged,
+                                     onError=self.onConfigFileError,
+                                     isOwnWrite=self.store.isOwnWrite)
+        if watchConfig and self.store.watchable:
+            self.watcher.start()
+
+    def notify(self, message, level=INFO, shortcut=None, kind=None, data=None):
+        #发布一条状态事件（可在任意线程调用），kind/data 见 events.TRIGGER 等#
+        self.events.publish(level, message, shortcut, kind, data)
 
     def loadConfig(self):
         #加载配置文件#
         try:
-            if os.path.exists(self.configFile):
-                with open(self.configFile, 'r', encoding='utf-8') as f:
-                    self.shortcuts = json.load(f)
-            self.statusUpdate.emit(f"已加载 {len(self.shortcuts)} 个快捷键")
+            self.shortcuts = self.store.load()
         except Exception as e:
-            self.statusUpdate.emit(f"加载配置失败: {str(e)}")
-            self.shortcuts = {}
+            self.notify(f"加载配置失败: {str(e)}", ERROR)
+            self.shortcuts = self.store.reset()
+            return
+        # 预先解析命令和节流策略，触发时无需再解析和搜索 PATH；
+        # SQLite 存储只给出带 options 的行，命令在首次触发时解析。
+        # 单条配置无效时只报告并跳过预处理，条目保留在表中，不会因此清空整张表
+        for shortcut, data in self.store.iterOptions():
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError("配置必须是对象")
+                self.prepareShortcut(shortcut, data)
+            except Exception as e:
+                self.notify(f"快捷键 {shortcut} 配置无效: {str(e)}", WARNING)
+        self.indexConflicts()
+        self.notify(f"已加载 {len(self.shortcuts)} 个快捷键")
+
+    def indexConflicts(self):
+        #为已加载的快捷键建立冲突索引，报告配置文件中已有的冲突#
+        self.conflicts.clear()
+        found = []
+        for shortcut in self.shortcuts:
+            try:
+                sequence = parseSequence(self.normalize_shortcut(shortcut))
+            except ValueError:
+                continue
+            found.extend(f"{shortcut}: {conflict}" for conflict in self.conflicts.check(sequence)
+                         if conflict.blocking)
+            self.conflicts.add(shortcut, sequence)
+        if found:
+            more = f" 等 {len(found)} 处" if len(found) > 3 else ""
+            self.notify(f"配置中存在快捷键冲突: {'; '.join(found[:3])}{more}", WARNING)
+
+    def findConflicts(self, shortcut, ignore=None):
+        #返回快捷键与现有快捷键的冲突列表（conflicts.Conflict），ignore 为正在编辑的快捷键#
+        try:
+            sequence = parseSequence(self.normalize_shortcut(shortcut))
+        except ValueError:
+            return []
+        return self.conflicts.check(sequence, ignore)
+
+    def saveConfig(self, changes=None):
+        #保存配置#
+        # JSON 文件只做标记并立即返回，短时间内的多次修改合并为一次原子写入；
+        # SQLite 只 upsert 发生变化的行
+        self.store.commit(changes)
+        return True
 
-    def saveConfig(self):
-        #保存配置到文件#
+    def flushConfig(self):
+        #立即写入尚未保存的配置#
+        self.store.flush()
+
+    def onConfigSaved(self, latency, size):
+        self.notify(f"配置保存成功 ({size}, {latency * 1000:.1f} ms)", DEBUG)
+
+    def onConfigError(self, error):
+        if isinstance(error, MigrationError):
+            self.notify(str(error), ERROR)
+        else:
+            self.notify(f"保存配置失败: {str(error)}", ERROR)
+
+    def addShortcut(self, shortcut, command, description="", **options):
+        #添加快捷键#
+        # options 为可选配置项，例如：
+        #   shell=True        命令需要 shell 语法
+        #   maxInstances=N    该快捷键的命令最多同时运行 N 个实例
+        #   repeat=True       按住不放时随按键自动重复多次触发
+        #   throttle={...}    节流策略，见 dispatcher.Throttle
+        #   action="python"   在本进程内执行的动作类型，见 actions.py
         try:
-            with open(self.configFile, 'w', encoding='utf-8') as f:
-                json.dump(self.shortcuts, f, ensure_ascii=False, indent=2)
-            self.statusUpdate.emit("配置保存成功")
+            with self.batch() as batch:
+                batch.add(shortcut, command, description, **options)
             return True
-        except Exception as e:
-            self.statusUpdate.emit(f"保存配置失败: {str(e)}")
+        except BatchError as e:
+            self.notify(f"添加快捷键失败: {str(e)}", WARNING)
             return False
 
-    def addShortcut(self, shortcut, command, description=""):
-        #添加快捷键#
-        # 标准化快捷键格式
-        shortcut = self.normalize_shortcut(shortcut)
-        
-        self.shortcuts[shortcut] = {
+    def batch(self):
+        #批量修改：with backend.batch() as batch: batch.add(...); batch.remove(...)#
+        # 退出 with 块时整体校验并应用，只写一次配置、只做一次注册差量
+        return ShortcutBatch(self)
+
+    def buildShortcutData(self, command, description, options):
+        data = {
             "command": command,
             "description": description
         }
-        self.saveConfig()
-        self.statusUpdate.emit(f"添加快捷键: {shortcut}")
-        # 重新注册快捷键
+        data.update((key, value) for key, value in options.items() if value not in (None, False))
+        return data
+
+    def reloadConfig(self):
+        #重新读取配置文件并增量应用#
+        try:
+            config = self.store.readAll()
+        except Exception as e:
+            self.onConfigFileError(e)
+            return False
+        return self.applyExternalConfig(config)
+
+    def onConfigFileChanged(self, config):
+        #监视线程回调#
+        self.notifier.post(self.applyExternalConfig, config)
+
+    def applyExternalConfig(self, config):
+        #把外部修改后的配置与当前快捷键表比较，只应用变化的条目#
+        try:
+            if not isinstance(config, dict):
+                raise ValueError("配置文件顶层必须是对象")
+            operations = []
+            incoming = set()
+            for shortcut, data in config.items():
+                if not isinstance(data, dict):
+                    raise ValueError(f"快捷键 {shortcut} 的配置必须是对象")
+                key = self.normalize_shortcut(shortcut)
+                incoming.add(key)
+                if self.shortcuts.get(key) != data:
+                    options = {k: v for k, v in data.items() if k not in ("command", "description")}
+                    operations.append(("add", key, data.get("command", ""), data.get("description", ""), options))
+            for shortcut in self.shortcuts:
+                if shortcut not in incoming:
+                    operations.append(("remove", shortcut))
+            changes = self.applyBatch(operations, save=False)
+        except (ValueError, BatchError) as e:
+            self.onConfigFileError(e)
+            return False
+        if changes:
+            self.notify(f"配置文件已更新，应用了 {len(changes)} 处修改")
+        return True
+
+    def onConfigFileError(self, error):
+        self.notify(f"配置文件无效，保留当前配置: {str(error)}", WARNING)
+
+    def applyBatch(self, operations, save=True):
+        #校验并原子地应用一组修改，任一步失败则全部回滚并抛出 BatchError#
+        # save=False 用于从配置文件重新加载，此时文件已是最新内容
+        # 校验阶段：在不修改任何状态的前提下模拟整批操作
+        changes = {}
+        positions = {}
+        for index, operation in enumerate(operations):
+            try:
+                if operation[0] == "add":
+                    shortcut, data = self.checkShortcut(*operation[1:])
+                    changes[shortcut] = data
+                    positions[shortcut] = index
+                elif operation[0] == "remove":
+                    shortcut = operation[1]
+                    exists = changes[shortcut] is not None if shortcut in changes else shortcut in self.shortcuts
+                    if not exists:
+                        raise ValueError(f"快捷键不存在: {shortcut}")
+                    changes[shortcut] = None
+                else:
+                    raise ValueError(f"未知的操作: {operation[0]}")
+            except ValueError as e:
+                raise BatchError(str(e), index)
+        if not changes:
+            return {}
+
+        # 冲突检查：在索引上试应用整批修改，重复和前缀冲突拒绝整批，系统保留组合键只提示
+        found = self.conflicts.trial({shortcut: None if data is None else parseSequence(shortcut)
+                                      for shortcut, data in changes.items()})
+        warnings = []
+        for shortcut, conflicts in found.items():
+            for conflict in conflicts:
+                if conflict.blocking:
+                    raise BatchError(f"快捷键 {shortcut} 冲突: {conflict}", positions.get(shortcut))
+                warnings.append(f"{shortcut}: {conflict}")
+
+        # 应用阶段：记录原值，失败时回滚
+        previous = {shortcut: self.shortcuts.get(shortcut) for shortcut in changes}
+        try:
+            self.applyChanges(changes)
+        except Exception as e:
+            try:
+                self.applyChanges(previous)
+            except Exception:
+                pass
+            self.notify(f"修改失败，已回滚: {str(e)}", ERROR)
+            raise BatchError(str(e))
+
+        if save:
+            self.saveConfig(changes)
+        self.shortcutsChanged.emit(changes)
+        added = [s for s, data in changes.items() if data is not None and previous[s] is None]
+        updated = [s for s, data in changes.items() if data is not None and previous[s] is not None]
+        removed = [s for s, data in changes.items() if data is None]
+        if len(changes) == 1:
+            if added:
+                self.notify(f"添加快捷键: {added[0]}")
+            elif updated:
+                self.notify(f"更新快捷键: {updated[0]}")
+            else:
+                self.notify(f"删除快捷键: {removed[0]}")
+        else:
+            self.notify(f"批量修改完成: 添加 {len(added)} 个，更新 {len(updated)} 个，"
+                                   f"删除 {len(removed)} 个")
+        if warnings:
+            self.notify(f"注意: {'; '.join(warnings[:3])}", WARNING)
+        return changes
+
+    def checkShortcut(self, shortcut, command, description="", options=None):
+        #校验一条快捷键，返回 (标准化快捷键, 数据)，无效时抛出 ValueError#
+        shortcut = self.normalize_shortcut(shortcut)
+        if not command:
+            raise ValueError("命令不能为空")
+        parseSequence(shortcut)
+        data = self.buildShortcutData(command, description, options or {})
+        if data.get("throttle"):
+            Throttle(shortcut, data["throttle"])
+        action = data.get("action", COMMAND)
+        if action != COMMAND:
+            self.actions.check(action, command, data)
+        return shortcut, data
+
+    def applyChanges(self, changes):
+        #把 {快捷键: 新数据或 None} 应用到快捷键表和注册表#
+        for shortcut, data in changes.items():
+            if data is None:
+                self.shortcuts.pop(shortcut, None)
+                self.throttles.pop(shortcut, None)
+                self.repeatable.discard(shortcut)
+                self.conflicts.remove(shortcut)
+            else:
+                self.prepareShortcut(shortcut, data)
+                self.shortcuts[shortcut] = data
+                try:
+                    self.conflicts.add(shortcut, parseSequence(self.normalize_shortcut(shortcut)))
+                except ValueError:
+                    # 配置文件中原有的无效快捷键（回滚时恢复），不参与冲突检查
+                    self.conflicts.remove(shortcut)
+        # 只对变化的快捷键做注册差量
         if self.isRunning:
-            self.restartListener()
+            with self.registry.lock:
+                # 监听线程还没有同步注册表时，变化记入待同步的快照，避免被 sync 撤销
+                pending = self.pendingHotkeys
+                for shortcut, data in changes.items():
+                    if data is None:
+                        if pending is not None:
+                            pending.pop(shortcut, None)
+                        else:
+                            self.registry.unregister(shortcut)
+                    else:
+                        hotkey = self.normalize_shortcut(shortcut)
+                        if pending is not None:
+                            pending[shortcut] = hotkey
+                        else:
+                            self.registry.register(shortcut, hotkey)
 
     def normalize_shortcut(self, shortcut):
         #标准化快捷键格式#
-        parts = shortcut.split('+')
-        normalized_parts = []
-        
-        for part in parts:
-            part_lower = part.lower().strip()
-            if part_lower in ['ctrl', 'control']:
-                normalized_parts.append('ctrl')
-            elif part_lower in ['alt']:
-                normalized_parts.append('alt')
-            elif part_lower in ['shift']:
-                normalized_parts.append('shift')
-            elif part_lower in ['win', 'windows', 'super']:
-                normalized_parts.append('windows')
-            else:
-                # 保持其他键的原样
-                normalized_parts.append(part)
-        
-        return '+'.join(normalized_parts)
+        # 修饰键按 ctrl、alt、shift、windows 排序，主键小写，多步快捷键用 ", " 分隔，
+        # 因此 "alt+ctrl+A" 与 "ctrl+alt+a" 得到同一个键；无法解析时原样返回，由校验报错
+        try:
+            return canonicalShortcut(shortcut)
+        except ValueError:
+            return shortcut.strip()
 
     def removeShortcut(self, shortcut):
         #删除快捷键#
         if shortcut in self.shortcuts:
-            del self.shortcuts[shortcut]
-            self.saveConfig()
-            self.statusUpdate.emit(f"删除快捷键: {shortcut}")
-            # 重新注册快捷键
-            if self.isRunning:
-                self.restartListener()
+            with self.batch() as batch:
+                batch.remove(shortcut)
             return True
         return False
 
-    def executeCommand(self, command):
-        #执行命令#
+    def isUrl(self, command):
+        return command.startswith("http://") or command.startswith("https://")
+
+    def prepareShortcut(self, shortcut, data):
+        #预解析命令为 argv 和可执行文件路径，并编译节流策略#
+        policy = data.get("throttle")
+        if policy:
+            self.throttles[shortcut] = Throttle(shortcut, policy)
+        else:
+            self.throttles.pop(shortcut, None)
+        if data.get("repeat"):
+            self.repeatable.add(shortcut)
+        else:
+            self.repeatable.discard(shortcut)
+        command = data.get("command", "")
+        action = self.actionOf(command, data.get("action"))
+        if action != COMMAND:
+            # 提前导入并创建动作插件，第一次触发时不再付出导入开销；加载失败留到触发时报告
+            try:
+                self.actions.get(action)
+            except (ValueError, ImportError):
+                pass
+        elif command:
+            self.launcher.prepare(command, data.get("shell", False))
+
+    def actionOf(self, command, action=None):
+        #未指定动作时，网址按 url 动作处理，其余命令启动进程#
+        if action:
+            return action
+        return "url" if self.isUrl(command) else COMMAND
+
+    def executeCommand(self, command, shell=False, action=None, data=None):
+        #执行命令；只有 command 动作返回启动的进程#
         try:
-            if command.startswith("http://") or command.startswith("https://"):
-                os.startfile(command)
+            process = None
+            action = self.actionOf(command, action)
+            if action == COMMAND:
+                # 直接启动预解析的可执行文件，标记了 shell 的命令才经过 shell
+                process = self.launcher.launch(command, shell)
             else:
-                # 使用shell执行命令，但避免弹出命令行窗口
-                subprocess.Popen(command, shell=True, 
-                               stdout=subprocess.DEVNULL, 
-                               stderr=subprocess.DEVNULL)
-            self.statusUpdate.emit(f"执行命令: {command}")
+                self.actions.run(action, command, data or {})
+            self.notify(f"执行命令: {command}", DEBUG)
+            return process
         except Exception as e:
-            self.statusUpdate.emit(f"执行失败: {str(e)}")
+            self.notify(f"执行失败: {str(e)}", ERROR)
+            return None
 
     def setStartup(self, enable):
         #设置开机自启动#
         try:
-            key = winreg.HKEY_CURRENT_USER
-            subkey = r"Software\Microsoft\Windows\CurrentVersion\Run"
-            
-            with winreg.OpenKey(key, subkey, 0, winreg.KEY_SET_VALUE) as reg_key:
-                if enable:
-                    exe_path = os.path.abspath(sys.argv[0])
-                    winreg.SetValueEx(reg_key, "ShortcutManager", 0, winreg.REG_SZ, exe_path)
-                    self.statusUpdate.emit("已启用开机自启动")
-                else:
-                    try:
-                        winreg.DeleteValue(reg_key, "ShortcutManager")
-                        self.statusUpdate.emit("已禁用开机自启动")
-                    except FileNotFoundError:
-                        self.statusUpdate.emit("开机自启动未设置")
+            changed = self.platform.setStartup(enable, startupCommand())
+            if enable:
+                self.notify("已启用开机自启动")
+            elif changed:
+                self.notify("已禁用开机自启动")
+            else:
+                self.notify("开机自启动未设置")
         except Exception as e:
-            self.statusUpdate.emit(f"设置自启动失败: {str(e)}")
+            self.notify(f"设置自启动失败: {str(e)}", ERROR)
 
     def checkStartup(self):
         #检查是否设置了开机自启动#
         try:
-            key = winreg.HKEY_CURRENT_USER
-            subkey = r"Software\Microsoft\Windows\CurrentVersion\Run"
-            with winreg.OpenKey(key, subkey, 0, winreg.KEY_READ) as reg_key:
-                try:
-                    winreg.QueryValueEx(reg_key, "ShortcutManager")
-                    return True
-                except FileNotFoundError:
-                    return False
+            return self.platform.isStartupEnabled()
         except Exception:
             return False
 
     async def shortcutListener(self):
         #异步快捷键监听器#
-        self.statusUpdate.emit("快捷键监听器已启动")
+        self.notify("快捷键监听器已启动")
         try:
-            import keyboard
-            # 清除所有已注册的快捷键
-            keyboard.unhook_all()
+            # 编译分派索引并安装唯一的键盘钩子
+            # 快照由 startListener 在所属线程上生成，取出与同步在同一把锁内完成
+            with self.registry.lock:
+                hotkeys, self.pendingHotkeys = self.pendingHotkeys or {}, None
+                failures = dict(self.registry.sync(hotkeys))
+            self.registry.install()
+            self.armedAt = time.perf_counter()
+            self.armed.set()
+            # 逐条注册结果只写入事件缓冲区（调试级别），界面只显示汇总
+            for shortcut in hotkeys:
+                if shortcut in failures:
+                    self.notify(f"注册快捷键失败 {shortcut}: {str(failures[shortcut])}", WARNING, shortcut)
+                else:
+                    self.notify(f"注册快捷键: {shortcut}", DEBUG, shortcut)
+            summary = f"已注册 {len(hotkeys) - len(failures):,} 个快捷键"
+            if failures:
+                summary += f"，{len(failures)} 个失败"
+            self.notify(summary, WARNING if failures else INFO)
             
-            # 注册新的快捷键
-            for shortcut in self.shortcuts.keys():
-                # 确保快捷键格式正确
-                normalized_shortcut = self.normalize_shortcut(shortcut)
-                try:
-                    keyboard.add_hotkey(normalized_shortcut, 
-                                      lambda s=shortcut: self.handleShortcut(s))
-                    self.statusUpdate.emit(f"注册快捷键: {shortcut}")
-                except Exception as e:
-                    self.statusUpdate.emit(f"注册快捷键失败 {shortcut}: {str(e)}")
+            # 子进程在本事件循环上异步回收
+            self.supervisor.attach(asyncio.get_running_loop())
+            # 控制接口与键盘钩子同生命周期，也运行在本事件循环上
+            rpc = await self.startRpc() if self.rpcSocket else None
             
-            # 保持监听
-            while self.isRunning:
-                await asyncio.sleep(0.1)
+            # 挂起等待停止信号，空闲时不产生任何唤醒
+            self.stopEvent = asyncio.Event()
+            if self.isRunning:
+                await self.stopEvent.wait()
+            if rpc is not None:
+                await rpc.close()
+            # 在监听线程内注销，避免与正在进行的注册交错
+            self.supervisor.detach()
+            self.registry.uninstall()
+            self.registry.clear()
                 
         except ImportError:
-            self.statusUpdate.emit("请安装keyboard库: pip install keyboard")
+            self.notify("请安装keyboard库: pip install keyboard", ERROR)
         except Exception as e:
-            self.statusUpdate.emit(f"快捷键监听错误: {str(e)}")
+            self.notify(f"快捷键监听错误: {str(e)}", ERROR)
+
+    async def startRpc(self):
+        #在监听线程的事件循环上启动 JSON-RPC 控制接口，失败时返回 None#
+        if not hasattr(asyncio, "start_unix_server"):
+            self.notify("当前平台不支持 Unix 域套接字，控制接口未启动", WARNING)
+            return None
+        from rpc import RpcServer
+        server = RpcServer(self, self.rpcSocket)
+        try:
+            await server.start()
+        except OSError as e:
+            self.notify(f"控制接口启动失败: {str(e)}", ERROR)
+            return None
+        self.notify(f"控制接口已启动: {self.rpcSocket}")
+        return server
+
+    def dispatchShortcut(self, shortcut, repeat=False):
+        #键盘钩子回调：把触发记录交给分派器后立即返回#
+        # 默认每次物理按下只触发一次，配置了 repeat 的快捷键才响应自动重复
+        if repeat and shortcut not in self.repeatable:
+            return
+        stamp = None
+        if self.latency.enabled:
+            stamp = (self.registry.eventStamp, time.perf_counter_ns())
+        if not self.dispatcher.submit(shortcut, self.throttles.get(shortcut), stamp):
+            self.notify(f"触发队列已满，丢弃快捷键: {shortcut}", WARNING, shortcut)
+
+    def triggerShortcut(self, shortcut):
+        #不经键盘直接触发快捷键（如另一个进程转发的 --trigger），返回是否已提交#
+        key = shortcut if shortcut in self.shortcuts else self.normalize_shortcut(shortcut)
+        if key not in self.shortcuts:
+            return False
+        if not self.dispatcher.submit(key, self.throttles.get(key)):
+            self.notify(f"触发队列已满，丢弃快捷键: {key}", WARNING, key)
+            return False
+        return True
 
-    def handleShortcut(self, shortcut):
-        #处理快捷键触发#
+    def handleShortcut(self, shortcut, trace=None):
+        #处理快捷键触发，trace 为分派器传入的延迟时间戳#
+        if shortcut not in self.shortcuts:
+            shortcut = self.normalize_shortcut(shortcut)
         if shortcut in self.shortcuts:
-            command = self.shortcuts[shortcut]["command"]
+            data = self.shortcuts[shortcut]
+            command = data["command"]
+            if not self.supervisor.acquire(shortcut, data.get("maxInstances")):
+                self.notify(f"快捷键 {shortcut} 已达到最大运行实例数", WARNING, shortcut)
+                return
             self.shortcutTriggered.emit(f"快捷键 {shortcut} 触发: {command}")
-            self.executeCommand(command)
+            self.notify(f"快捷键 {shortcut} 触发: {command}", INFO, shortcut, TRIGGER, {"command": command})
+            process = self.executeCommand(command, data.get("shell", False), data.get("action"), data)
+            if trace is not None:
+                self.latency.record(shortcut, trace, time.perf_counter_ns())
+            if process is None:
+                self.supervisor.release(shortcut)
+            else:
+                # 先发布启动事件再登记回收，保证订阅者看到的顺序是启动在退出之前
+                self.notify(f"快捷键 {shortcut} 启动进程 {process.pid}", DEBUG, shortcut, EXEC,
+                            {"pid": process.pid})
+                self.supervisor.track(shortcut, process)
+
+    def onProcessExit(self, shortcut, pid, code, wall):
+        #子进程退出（在监听线程中调用）#
+        self.notify(f"快捷键 {shortcut} 的进程 {pid} 已退出，退出码 {code}，运行 {wall:.2f} 秒",
+                    DEBUG, shortcut, EXIT, {"pid": pid, "code": code, "wall": wall})
 
     def startListener(self):
         #启动监听线程#
         if not self.isRunning:
             self.isRunning = True
+            self.dispatcher.start()
+            # 快捷键表只在所属线程上修改，注册快照也在这里生成，监听线程不再遍历 self.shortcuts
+            with self.registry.lock:
+                self.pendingHotkeys = {s: self.normalize_shortcut(s) for s in self.shortcuts}
+            # 事件循环在启动线程前创建，保证 stopListener 随时可以向其投递停止信号
+            self.loop = asyncio.new_event_loop()
+            self.stopEvent = None
             self.thread = threading.Thread(target=self.runAsync)
             self.thread.daemon = True
             self.thread.start()
 
     def runAsync(self):
         #运行异步事件循环#
-        self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
         try:
             self.loop.run_until_complete(self.shortcutListener())
         except Exception as e:
-            self.statusUpdate.emit(f"监听器错误: {str(e)}")
+            self.notify(f"监听器错误: {str(e)}", ERROR)
+        finally:
+            asyncio.set_event_loop(None)
 
     def stopListener(self):
         #停止监听#
         self.isRunning = False
+        self.armed.clear()
+        loop, thread = self.loop, self.thread
+        if loop is None or thread is None:
+            self.dispatcher.stop()
+            return
         try:
-            import keyboard
-            keyboard.unhook_all()
-        except ImportError:
+            loop.call_soon_threadsafe(self.signalStop)
+        except RuntimeError:
+            # 事件循环已关闭
             pass
-        
-        if self.loop and self.loop.is_running():
-            self.loop.stop()
+        # 等待监听线程真正退出后再返回
+        if thread is not threading.current_thread():
+            thread.join()
+            loop.close()
+            self.loop = None
+            self.thread = None
+            self.dispatcher.stop()
 
-    def restartListener(self):
-        #重启监听器以应用新的快捷键#
+    def shutdown(self):
+        #退出前停止监听并写入尚未保存的配置#
         self.stopListener()
-        # 给一点时间让监听器完全停止
-        import time
-        time.sleep(0.5)
-        self.startListener()
\ No newline at end of file
+        self.watcher.stop()
+        self.store.close()
+
+    def processStats(self):
+        #按快捷键返回子进程统计：启动次数、退出码、运行时长、峰值内存等#
+        return self.supervisor.snapshot()
+
+    def metrics(self):
+        #返回键盘钩子与触发队列的运行指标#
+        metrics = self.registry.metrics()
+        metrics.update(self.dispatcher.metrics())
+        metrics.update(self.store.metrics())
+        return metrics
+
+    def setLatencyTracing(self, enable):
+        #开启或关闭触发延迟记录，已记录的直方图保留#
+        self.latency.enabled = bool(enable)
+
+    def latencyStats(self):
+        #按快捷键返回各阶段延迟的 p50/p99/最大值（微秒）#
+        return self.latency.summary()
+
+    def signalStop(self):
+        #在事件循环线程内设置停止事件#
+        if self.stopEvent is not None:
+            self.stopEvent.set()
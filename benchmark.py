@@ -0,0 +1,460 @@
+#后端基准测试#
+# 在 Linux 上无界面运行：键盘事件由 FakeKeyEvent 模拟，进程启动由 FakeLauncher 代替，
+# 不安装键盘钩子、不创建窗口。每项取多次运行的中位数，随机数种子固定。
+#
+#   python benchmark.py                         运行并打印结果
+#   python benchmark.py --output result.json    同时把结果写入 JSON，用于跟踪趋势
+#   python benchmark.py --baseline base.json    与保存的结果比较，变慢超过阈值时返回 1
+#   python benchmark.py --quick                 使用较小的规模快速检查
+#   python benchmark.py --clients 500           JSON-RPC 负载测试的并发客户端数
+#   python benchmark.py --ui                    同时测量界面控件的创建与绘制（需要 PyQt5，离屏运行）
+
+import os
+import sys
+import gc
+import json
+import time
+import socket
+import asyncio
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+
+from chords import CTRL, ALT, SHIFT, parseChord, parseSequence, canonicalShortcut
+from hotkeys import HotkeyRegistry
+from launcher import CommandLauncher
+from actions import ActionRegistry
+
+MODIFIERS = {CTRL: 'ctrl', CTRL | ALT: 'ctrl+alt', CTRL | SHIFT: 'ctrl+shift'}
+MODIFIER_CODES = {'ctrl': 29, 'alt': 56, 'shift': 42}
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+QUICK_SIZES = (100, 1000)
+
+
+class FakeKeyEvent:
+    #模拟 keyboard 库的按键事件#
+    __slots__ = ('event_type', 'scan_code', 'name')
+
+    def __init__(self, event_type, scan_code, name):
+        self.event_type = event_type
+        self.scan_code = scan_code
+        self.name = name
+
+
+def fakeResolver(key):
+    #将 "k123" 形式的键名映射为扫描码 1000+123#
+    if key.startswith('k') and key[1:].isdigit():
+        return (1000 + int(key[1:]),)
+    return (len(key),)
+
+
+class FakeLauncher(CommandLauncher):
+    #不创建进程的启动器：记录启动次数，并在每次启动时置位 launched#
+
+    def __init__(self):
+        super().__init__()
+        self.launches = 0
+        self.launched = threading.Event()
+
+    def launch(self, command, shell=False):
+        self.lookup(command, shell)
+        self.launches += 1
+        self.launched.set()
+        return None
+
+
+def shortcutName(i):
+    masks = list(MODIFIERS)
+    return f"{MODIFIERS[masks[i % len(masks)]]}+k{i}"
+
+
+def pressEvents(i):
+    #按下并松开第 i 个快捷键的事件序列#
+    modifiers = shortcutName(i).split('+')[:-1]
+    code = 1000 + i
+    events = [FakeKeyEvent('down', MODIFIER_CODES[name], name) for name in modifiers]
+    events.append(FakeKeyEvent('down', code, f"k{i}"))
+    events.append(FakeKeyEvent('up', code, f"k{i}"))
+    events.extend(FakeKeyEvent('up', MODIFIER_CODES[name], name) for name in reversed(modifiers))
+    return events
+
+
+def coldCaches():
+    #清空组合键解析缓存，使每次加载的测量条件相同#
+    parseChord.cache_clear()
+    parseSequence.cache_clear()
+    canonicalShortcut.cache_clear()
+    gc.collect()
+
+
+def median(samples):
+    return statistics.median(samples)
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def makeBackend(path, **options):
+    from backend import ShortcutBackend
+    backend = ShortcutBackend(path, watchConfig=False, **options)
+    backend.registry.resolveKey = fakeResolver
+    backend.launcher = FakeLauncher()
+    return backend
+
+
+def benchConfig(directory, sizes, repeat):
+    #配置保存与加载耗时（毫秒），JSON 与 SQLite 两种存储#
+    results = {}
+    for kind, extension in (("json", "json"), ("sqlite", "db")):
+        for size in sizes:
+            path = os.path.join(directory, f"config-{size}.{extension}")
+            operations = [("add", shortcutName(i), f"echo {i}", f"描述 {i}", {}) for i in range(size)]
+            backend = makeBackend(path)
+            try:
+                elapsed = timed(lambda: (backend.applyBatch(operations), backend.store.flush()))
+                results[f"config.saveAll.{kind}.{size}"] = (elapsed * 1e3, "ms")
+                samples = []
+                for r in range(repeat):
+                    samples.append(timed(lambda: (backend.addShortcut(shortcutName(0), f"echo {r}"),
+                                                  backend.store.flush())))
+                results[f"config.saveOne.{kind}.{size}"] = (median(samples) * 1e3, "ms")
+            finally:
+                backend.shutdown()
+            samples = []
+            for _ in range(repeat):
+                coldCaches()
+                start = time.perf_counter()
+                backend = makeBackend(path)
+                samples.append(time.perf_counter() - start)
+                backend.shutdown()
+            results[f"config.load.{kind}.{size}"] = (median(samples) * 1e3, "ms")
+    return results
+
+
+def benchRegister(sizes, repeat):
+    #整表注册与修改 1% 后重新注册的耗时（毫秒）#
+    results = {}
+    for size in sizes:
+        hotkeys = {shortcutName(i): shortcutName(i) for i in range(size)}
+        changed = dict(hotkeys)
+        for i in range(0, size, 100):
+            changed[shortcutName(i)] = shortcutName(i + size)
+        full = []
+        delta = []
+        for _ in range(repeat):
+            coldCaches()
+            registry = HotkeyRegistry(lambda s, repeat: None, fakeResolver)
+            full.append(timed(lambda: registry.sync(hotkeys)))
+            delta.append(timed(lambda: registry.sync(changed)))
+        results[f"register.full.{size}"] = (median(full) * 1e3, "ms")
+        results[f"register.delta.{size}"] = (median(delta) * 1e3, "ms")
+    return results
+
+
+def benchDispatch(sizes, presses=200000):
+    #不同表规模下每个按键事件的分派耗时（纳秒）#
+    results = {}
+    for size in sizes:
+        hits = [0]
+        registry = HotkeyRegistry(lambda s, repeat: hits.__setitem__(0, hits[0] + 1), fakeResolver)
+        for i in range(size):
+            registry.register(f"s{i}", shortcutName(i))
+        rng = random.Random(size)
+        registry.onKeyEvent(FakeKeyEvent('down', 29, 'ctrl'))
+        codes = [1000 + rng.randrange(size) for _ in range(1024)]
+        downs = [FakeKeyEvent('down', code, 'x') for code in codes]
+        ups = [FakeKeyEvent('up', code, 'x') for code in codes]
+        gc.collect()
+        start = time.perf_counter()
+        for i in range(presses):
+            registry.onKeyEvent(downs[i & 1023])
+            registry.onKeyEvent(ups[i & 1023])
+        elapsed = time.perf_counter() - start
+        results[f"dispatch.keystroke.{size}"] = (elapsed / (presses * 2) * 1e9, "ns")
+    return results
+
+
+def benchTrigger(directory, size, presses):
+    #从键盘钩子回调到启动调用返回的延迟（微秒），使用 ShortcutBackend 的延迟直方图#
+    path = os.path.join(directory, f"trigger-{size}.json")
+    backend = makeBackend(path, traceLatency=True)
+    try:
+        backend.applyBatch([("add", shortcutName(i), f"echo {i}", "", {}) for i in range(size)])
+        hotkeys = {s: backend.normalize_shortcut(s) for s in backend.shortcuts}
+        backend.registry.sync(hotkeys)
+        backend.dispatcher.start()
+        launched = backend.launcher.launched
+        rng = random.Random(size)
+        for _ in range(presses):
+            launched.clear()
+            for event in pressEvents(rng.randrange(size)):
+                backend.registry.onKeyEvent(event)
+            if not launched.wait(5):
+                raise RuntimeError("触发超时")
+            # 等待工作线程记录完延迟再按下一次
+            time.sleep(0.001)
+        stages = backend.latency.overall()
+    finally:
+        backend.shutdown()
+    results = {}
+    for stage, summary in stages.items():
+        results[f"trigger.{stage}.p50"] = (summary["p50Us"], "us")
+        results[f"trigger.{stage}.p99"] = (summary["p99Us"], "us")
+    return results
+
+
+def benchRpc(directory, size, clients, calls=20):
+    #JSON-RPC 控制接口负载测试：clients 个本地客户端并发调用的延迟，以及触发事件推送到订阅者的延迟（微秒）#
+    # 服务端与后端运行在独立线程的事件循环上（后端使用 DirectNotifier，调用在该线程中执行），
+    # 客户端全部在主线程的事件循环中，使用 rpc.RpcClient
+    from rpc import RpcServer, RpcClient
+    path = os.path.join(directory, f"rpc-{size}.json")
+    socketPath = os.path.join(directory, "rpc.sock")
+    # 队列容量足够容纳所有并发触发，测量的是控制接口而不是溢出策略
+    backend = makeBackend(path, maxQueue=clients * calls)
+    backend.applyBatch([("add", shortcutName(i), f"echo {i}", "", {}) for i in range(size)])
+    backend.dispatcher.start()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = RpcServer(backend, socketPath)
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+
+    async def client(index, latencies):
+        connection = await RpcClient.connect(socketPath)
+        try:
+            for i in range(calls):
+                shortcut = shortcutName((index * calls + i) % size)
+                start = time.perf_counter()
+                await connection.call("trigger" if i % 2 else "get", shortcut)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            await connection.close()
+
+    async def watch(connection, expected, lags):
+        received = 0
+        while received < expected:
+            message = await connection.notifications.get()
+            if message["method"] != "event":
+                raise RuntimeError(f"事件推送丢失: {message['params']}")
+            lags.append(time.time() - message["params"]["time"])
+            received += 1
+
+    async def load():
+        watchers = [await RpcClient.connect(socketPath) for _ in range(4)]
+        for connection in watchers:
+            await connection.call("subscribe", kinds=["trigger"])
+        # 并发调用：所有客户端同时连接并交替调用 get 和 trigger，订阅者必须收到全部触发事件
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(client(index, latencies) for index in range(clients)))
+        elapsed = time.perf_counter() - start
+        await asyncio.wait_for(asyncio.gather(*(watch(connection, clients * (calls // 2), [])
+                                                for connection in watchers)), 30)
+        # 推送延迟：逐个触发，测量从发布事件到订阅者收到的时间（客户端与服务端同一进程，不与负载叠加）
+        lags = []
+        trigger = await RpcClient.connect(socketPath)
+        for i in range(200):
+            await trigger.call("trigger", shortcutName(i % size))
+            await asyncio.wait_for(asyncio.gather(*(watch(connection, 1, lags)
+                                                    for connection in watchers)), 5)
+        for connection in watchers + [trigger]:
+            await connection.close()
+        return latencies, lags, elapsed
+
+    try:
+        latencies, lags, elapsed = asyncio.run(load())
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        backend.shutdown()
+    latencies.sort()
+    lags.sort()
+    return {
+        f"rpc.call.{clients}.p50": (latencies[len(latencies) // 2] * 1e6, "us"),
+        f"rpc.call.{clients}.p99": (latencies[int(len(latencies) * 0.99)] * 1e6, "us"),
+        f"rpc.call.{clients}.perCall": (elapsed / len(latencies) * 1e6, "us"),
+        f"rpc.stream.{clients}.p50": (lags[len(lags) // 2] * 1e6, "us"),
+        f"rpc.stream.{clients}.p99": (lags[int(len(lags) * 0.99)] * 1e6, "us"),
+    }
+
+
+def benchLaunch(runs=50):
+    #比较 shell 启动、预解析直接启动与进程内动作的触发耗时（微秒）#
+    command = "true" if shutil.which("true") else f'"{sys.executable}" -c pass'
+    launcher = CommandLauncher()
+    launcher.prepare(command)
+    launcher.prepare(command, shell=True)
+    results = {}
+    for label, shell in (("shell", True), ("direct", False)):
+        spawn = []
+        total = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            process = launcher.launch(command, shell)
+            spawn.append(time.perf_counter() - start)
+            process.wait()
+            total.append(time.perf_counter() - start)
+        results[f"launch.{label}.spawn"] = (median(spawn) * 1e6, "us")
+        results[f"launch.{label}.exit"] = (median(total) * 1e6, "us")
+    # 进程内动作（actions.py）：同样的"做一件事"不创建进程，计入注册表查找和函数调用
+    actions = ActionRegistry()
+    data = {"action": "python", "command": "os:getpid"}
+    actions.run("python", data["command"], data)
+    inprocess = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        actions.run("python", data["command"], data)
+        inprocess.append(time.perf_counter() - start)
+    results["launch.inprocess.run"] = (median(inprocess) * 1e6, "us")
+    return results
+
+
+def benchUi(repeat):
+    #界面控件创建、样式计算与绘制耗时，使用离屏平台，不显示窗口#
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    import theme
+    import frontend
+    theme.install(app)
+
+    def sample(function, count):
+        function()
+        samples = []
+        for _ in range(repeat):
+            samples.append(timed(lambda: [function() for _ in range(count)]) / count)
+        return median(samples)
+
+    def widgets():
+        created = [frontend.TechLineEdit() for _ in range(20)]
+        created += [frontend.TechCheckBox("x") for _ in range(20)]
+        created += [frontend.TechTableView() for _ in range(5)]
+        for widget in created:
+            widget.ensurePolished()
+            widget.deleteLater()
+
+    def dialog():
+        frontend.AddShortcutDialog().grab()
+
+    dialogWidget = frontend.AddShortcutDialog()
+    label = dialogWidget.statusLabel
+
+    def toggle():
+        theme.set_state(label, "capturing")
+        label.grab()
+        theme.set_state(label, "idle")
+        label.grab()
+
+    def message():
+        box = frontend.tech_message_box(dialogWidget, "标题", "消息", "警告")
+        box.grab()
+        box.deleteLater()
+
+    button = frontend.TechButton("保存快捷键")
+    button.resize(120, 35)
+    results = {
+        "ui.widgets45": (sample(widgets, 5) * 1e3, "ms"),
+        "ui.dialog": (sample(dialog, 10) * 1e3, "ms"),
+        "ui.messageBox": (sample(message, 20) * 1e3, "ms"),
+        "ui.captureToggle": (sample(toggle, 100) * 1e6, "us"),
+        "ui.buttonPaint": (sample(button.grab, 500) * 1e6, "us"),
+    }
+    app.processEvents()
+    return results
+
+
+def runSuite(sizes, repeat, presses, clients):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="shortcut-bench-") as directory:
+        results.update(benchConfig(directory, sizes, repeat))
+        results.update(benchRegister(sizes, repeat))
+        results.update(benchDispatch(sizes))
+        results.update(benchTrigger(directory, sizes[-1], presses))
+        if hasattr(socket, "AF_UNIX"):
+            results.update(benchRpc(directory, sizes[0], clients))
+    results.update(benchLaunch())
+    return results
+
+
+def compare(results, baseline, threshold):
+    #与基线比较（所有指标越小越好），返回变慢超过 threshold 比例的指标#
+    regressions = []
+    for name in sorted(results):
+        value = results[name]["value"]
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<36s} {value:12.3f} {results[name]['unit']:<3s}   （基线中没有）")
+            continue
+        ratio = value / base["value"] if base["value"] else float('inf')
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  <-- 变慢"
+            regressions.append(name)
+        print(f"{name:<36s} {value:12.3f} {results[name]['unit']:<3s} 基线 {base['value']:12.3f}  "
+              f"{ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="快捷键管理器后端基准测试")
+    parser.add_argument("--quick", action="store_true", help="使用较小的表规模")
+    parser.add_argument("--sizes", type=lambda text: tuple(int(n) for n in text.split(',')),
+                        help="逗号分隔的表规模，例如 1000,10000")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数，取中位数")
+    parser.add_argument("--presses", type=int, default=200, help="触发延迟测量的按键次数")
+    parser.add_argument("--clients", type=int, help="JSON-RPC 负载测试的并发客户端数，默认 200（--quick 时 50）")
+    parser.add_argument("--ui", action="store_true", help="同时运行界面基准（需要 PyQt5）")
+    parser.add_argument("--output", metavar="FILE", help="把结果写入 JSON 文件")
+    parser.add_argument("--baseline", metavar="FILE", help="与之前保存的 JSON 结果比较")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="比基线慢超过该比例视为退化，默认 0.25")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    clients = args.clients or (50 if args.quick else 200)
+    measured = runSuite(sizes, args.repeat, args.presses, clients)
+    if args.ui:
+        measured.update(benchUi(args.repeat))
+    results = {name: {"value": value, "unit": unit} for name, (value, unit) in measured.items()}
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "repeat": args.repeat,
+            "presses": args.presses,
+            "clients": clients,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if not args.baseline:
+        for name in sorted(results):
+            print(f"{name:<36s} {results[name]['value']:12.3f} {results[name]['unit']}")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} 项比基线慢超过 {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#快捷键组合解析：修饰键位掩码 + 主键#
+
+import functools
+
+CTRL = 1
+ALT = 2
+SHIFT = 4
+WINDOWS = 8
+
+MODIFIER_ORDER = ['ctrl', 'alt', 'shift', 'windows']
+
+MODIFIER_BITS = {
+    'ctrl': CTRL, 'control': CTRL, 'left ctrl': CTRL, 'right ctrl': CTRL,
+    'alt': ALT, 'left alt': ALT, 'right alt': ALT, 'alt gr': ALT,
+    'shift': SHIFT, 'left shift': SHIFT, 'right shift': SHIFT,
+    'win': WINDOWS, 'windows': WINDOWS, 'left windows': WINDOWS,
+    'right windows': WINDOWS, 'super': WINDOWS, 'command': WINDOWS,
+}
+
+MODIFIER_NAMES = {CTRL: 'ctrl', ALT: 'alt', SHIFT: 'shift', WINDOWS: 'windows'}
+
+# 主键的常见别名统一为 keyboard 库使用的名称
+KEY_ALIASES = {
+    'esc': 'escape', 'return': 'enter', 'del': 'delete', 'ins': 'insert',
+    'pgup': 'page up', 'pageup': 'page up', 'pgdn': 'page down', 'pagedown': 'page down',
+    'spacebar': 'space', 'caps': 'caps lock', 'capslock': 'caps lock',
+}
+
+# 已创建的组合键，相同的 (掩码, 主键) 共享同一对象
+INTERNED = {}
+
+
+class Chord:
+    #规范化的组合键：修饰键掩码 + 主键名#
+    # 相同的 (掩码, 主键) 只创建一个对象，因此按对象身份比较和哈希即可，
+    # 规范文本在创建时生成一次。可以像 (mask, key) 二元组一样解包。
+    __slots__ = ('mask', 'key', 'text')
+
+    def __new__(cls, mask, key):
+        chord = INTERNED.get((mask, key))
+        if chord is None:
+            chord = object.__new__(cls)
+            chord.mask = mask
+            chord.key = key
+            # 修饰键按 ctrl、alt、shift、windows 的固定顺序排列
+            names = [MODIFIER_NAMES[bit] for bit in (CTRL, ALT, SHIFT, WINDOWS) if mask & bit]
+            names.append(key)
+            chord.text = '+'.join(names)
+            chord = INTERNED.setdefault((mask, key), chord)
+        return chord
+
+    def __iter__(self):
+        return iter((self.mask, self.key))
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"Chord({self.text!r})"
+
+
+def modifierBit(name):
+    #返回修饰键对应的位，非修饰键返回 0#
+    if not name:
+        return 0
+    return MODIFIER_BITS.get(name.lower(), 0)
+
+
+@functools.lru_cache(maxsize=1 << 18)
+def parseChord(text):
+    #将 "ctrl+alt+a" 解析为 Chord(修饰键掩码, 主键名)，结果按文本缓存#
+    mask = 0
+    key = None
+    for part in text.split('+'):
+        name = part.strip().lower()
+        if not name:
+            continue
+        bit = MODIFIER_BITS.get(name, 0)
+        if bit:
+            mask |= bit
+        elif key is None:
+            key = name
+        else:
+            raise ValueError(f"快捷键只能包含一个主键: {text}")
+    if key is None:
+        raise ValueError(f"快捷键缺少主键: {text}")
+    return Chord(mask, KEY_ALIASES.get(key, key))
+
+
+def dispatchKey(mask, code):
+    #修饰键掩码与键码合成单个整数索引键，避免每次按键分配元组#
+    return (code << 4) | mask
+
+
+def splitSequence(text):
+    #把 "ctrl+k, ctrl+c" 拆分为各步组合键文本#
+    steps = [step.strip() for step in text.split(',')]
+    if not all(steps):
+        raise ValueError(f"快捷键序列格式错误: {text}")
+    return steps
+
+
+@functools.lru_cache(maxsize=1 << 18)
+def parseSequence(text):
+    #将多步快捷键解析为 (Chord, ...) 元组，可直接作为字典键#
+    return tuple(parseChord(step) for step in splitSequence(text))
+
+
+def formatSequence(sequence):
+    #把解析结果格式化为规范文本，例如 "ctrl+alt+a, ctrl+c"#
+    return ', '.join([chord.text for chord in sequence])
+
+
+@functools.lru_cache(maxsize=1 << 18)
+def canonicalShortcut(text):
+    #快捷键文本的规范形式：修饰键顺序固定、主键小写，无效时抛出 ValueError#
+    return formatSequence(parseSequence(text))
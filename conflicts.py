@@ -0,0 +1,136 @@
+from chords import parseChord, formatSequence
+
+# 被操作系统占用、注册后无法可靠触发或会破坏系统功能的组合键
+RESERVED = {
+    'ctrl+alt+delete': "系统安全选项",
+    'ctrl+shift+escape': "任务管理器",
+    'ctrl+escape': "开始菜单",
+    'alt+tab': "切换窗口",
+    'alt+escape': "切换窗口",
+    'alt+f4': "关闭窗口",
+    'windows+l': "锁定计算机",
+    'windows+d': "显示桌面",
+    'windows+r': "运行",
+    'windows+e': "文件资源管理器",
+    'windows+tab': "任务视图",
+}
+RESERVED_CHORDS = {parseChord(text): reason for text, reason in RESERVED.items()}
+
+DUPLICATE = 'duplicate'
+PREFIX = 'prefix'
+RESERVED_CHORD = 'reserved'
+
+
+class Conflict:
+    #一条冲突：kind 为 duplicate / prefix / reserved，other 为冲突的快捷键#
+    __slots__ = ('kind', 'other', 'message')
+
+    def __init__(self, kind, other, message):
+        self.kind = kind
+        self.other = other
+        self.message = message
+
+    @property
+    def blocking(self):
+        # 重复和前缀冲突会让其中一个快捷键永远无法触发；系统组合键只做提示
+        return self.kind != RESERVED_CHORD
+
+    def __str__(self):
+        return self.message
+
+
+class ConflictIndex:
+    #快捷键冲突索引#
+    # 以解析后的 (Chord, ...) 序列为键，维护完全相同的序列和所有真前缀，
+    # 每次检查只做与序列步数成正比的字典查找，与快捷键总数无关。
+
+    def __init__(self):
+        self.exact = {}       # 序列 -> {快捷键: None}
+        self.prefixes = {}    # 真前缀 -> {以其开头的快捷键: None}
+        self.sequences = {}   # 快捷键 -> 序列
+
+    def __len__(self):
+        return len(self.sequences)
+
+    def add(self, shortcut, sequence):
+        #登记快捷键，已登记时先移除旧序列#
+        if shortcut in self.sequences:
+            self.remove(shortcut)
+        self.sequences[shortcut] = sequence
+        self.exact.setdefault(sequence, {})[shortcut] = None
+        for i in range(1, len(sequence)):
+            self.prefixes.setdefault(sequence[:i], {})[shortcut] = None
+
+    def remove(self, shortcut):
+        sequence = self.sequences.pop(shortcut, None)
+        if sequence is None:
+            return False
+        self.discard(self.exact, sequence, shortcut)
+        for i in range(1, len(sequence)):
+            self.discard(self.prefixes, sequence[:i], shortcut)
+        return True
+
+    def discard(self, table, key, shortcut):
+        owners = table.get(key)
+        if owners is not None:
+            owners.pop(shortcut, None)
+            if not owners:
+                del table[key]
+
+    def clear(self):
+        self.exact.clear()
+        self.prefixes.clear()
+        self.sequences.clear()
+
+    def check(self, sequence, ignore=None):
+        #返回序列与已登记快捷键的冲突列表，ignore 为正在编辑的快捷键本身#
+        conflicts = []
+        other = self.firstOwner(self.exact.get(sequence), ignore)
+        if other is not None:
+            conflicts.append(Conflict(DUPLICATE, other, f"与已有快捷键 {other} 相同"))
+        other = self.firstOwner(self.prefixes.get(sequence), ignore)
+        if other is not None:
+            conflicts.append(Conflict(PREFIX, other, f"{formatSequence(sequence)} 是多步快捷键 {other} "
+                                                     f"的前缀，会使其无法触发"))
+        for i in range(1, len(sequence)):
+            other = self.firstOwner(self.exact.get(sequence[:i]), ignore)
+            if other is not None:
+                conflicts.append(Conflict(PREFIX, other, f"已有快捷键 {other} 是 {formatSequence(sequence)} "
+                                                         f"的前缀，会使其无法触发"))
+                break
+        for chord in sequence:
+            reason = RESERVED_CHORDS.get(chord)
+            if reason is not None:
+                conflicts.append(Conflict(RESERVED_CHORD, str(chord), f"{chord} 是系统保留组合键（{reason}）"))
+        return conflicts
+
+    def firstOwner(self, owners, ignore):
+        if not owners:
+            return None
+        for owner in owners:
+            if owner != ignore:
+                return owner
+        return None
+
+    def trial(self, updates):
+        #试应用 {快捷键: 新序列或 None}，返回 {快捷键: 冲突列表}，索引保持不变#
+        previous = {shortcut: self.sequences.get(shortcut) for shortcut in updates}
+        try:
+            for shortcut, sequence in updates.items():
+                if sequence is None:
+                    self.remove(shortcut)
+                else:
+                    self.add(shortcut, sequence)
+            results = {}
+            for shortcut, sequence in updates.items():
+                if sequence is not None:
+                    conflicts = self.check(sequence, ignore=shortcut)
+                    if conflicts:
+                        results[shortcut] = conflicts
+            return results
+        finally:
+            for shortcut, sequence in previous.items():
+                if sequence is None:
+                    self.remove(shortcut)
+                else:
+                    self.add(shortcut, sequence)
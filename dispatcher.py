@@ -0,0 +1,254 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+OVERFLOW_POLICIES = ('drop', 'drop_oldest', 'coalesce')
+
+FIRE = 0
+DROP = 1
+DEFER = 2
+
+
+class Throttle:
+    #单个快捷键的触发节流策略#
+    # 配置项（shortcuts.json 中的 "throttle"）：
+    #   minInterval  两次执行之间的最短间隔（秒），间隔内的触发被丢弃
+    #   debounce     防抖静默时间（秒）
+    #   edge         防抖边沿：leading 立即执行并忽略静默期内的触发，
+    #                trailing（默认）在最后一次触发后静默 debounce 秒再执行
+    #   maxRate      每秒最多执行次数（令牌桶）
+    # 对象在加载配置时创建，触发时只更新字段，不为每次触发分配对象。
+    __slots__ = ('shortcut', 'minInterval', 'debounce', 'edge', 'maxRate',
+                 'lastFire', 'lastEvent', 'tokens', 'tokenStamp', 'due')
+
+    def __init__(self, shortcut, policy):
+        if not isinstance(policy, dict):
+            raise ValueError(f"节流策略必须是对象，例如 {{\"minInterval\": 1}}: {policy!r}")
+        self.shortcut = shortcut
+        try:
+            self.minInterval = float(policy.get("minInterval", 0) or 0)
+            self.debounce = float(policy.get("debounce", 0) or 0)
+            self.maxRate = float(policy.get("maxRate", 0) or 0)
+        except (TypeError, ValueError):
+            raise ValueError("节流参数必须是数字")
+        self.edge = policy.get("edge", "trailing")
+        if self.edge not in ("leading", "trailing"):
+            raise ValueError(f"未知的防抖边沿: {self.edge}")
+        if min(self.minInterval, self.debounce, self.maxRate) < 0:
+            raise ValueError("节流参数不能为负数")
+        self.lastFire = float('-inf')
+        self.lastEvent = float('-inf')
+        self.tokens = self.maxRate
+        self.tokenStamp = 0.0
+        self.due = None
+
+    def admit(self, now):
+        #判断一次触发：FIRE 立即执行，DROP 丢弃，DEFER 延后到 due 时执行#
+        if self.debounce:
+            quiet = now - self.lastEvent >= self.debounce
+            self.lastEvent = now
+            if self.edge == "trailing":
+                self.due = now + self.debounce
+                return DEFER
+            if not quiet:
+                return DROP
+        return FIRE if self.allow(now) else DROP
+
+    def release(self, now):
+        #到期的延后触发：仍需满足最短间隔和速率限制#
+        self.due = None
+        return self.allow(now)
+
+    def allow(self, now):
+        if self.minInterval and now - self.lastFire < self.minInterval:
+            return False
+        if self.maxRate:
+            self.tokens = min(self.maxRate, self.tokens + (now - self.tokenStamp) * self.maxRate)
+            self.tokenStamp = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+        self.lastFire = now
+        return True
+
+
+class TriggerDispatcher:
+    #快捷键触发分派器#
+    # 键盘钩子回调只把触发记录放入有界队列后立即返回，
+    # 由独立的分派线程把队列中的记录交给有界工作线程池执行。
+    # 队列满时的策略：
+    #   drop        丢弃新的触发
+    #   drop_oldest 丢弃最早的触发
+    #   coalesce    与队列中同一快捷键的触发合并，没有可合并的则丢弃
+    # 记录延迟时 submit 传入 (钩子时间戳, 入队时间戳)，与队列平行保存，
+    # 出队执行时补上开始执行的时间戳后以 handler(快捷键, trace) 调用；
+    # 不记录时 trace 为 None。防抖延后的触发不带时间戳。
+
+    def __init__(self, handler, concurrency=4, maxQueue=64, overflow='coalesce'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"未知的队列溢出策略: {overflow}")
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.maxQueue = max(1, maxQueue)
+        self.overflow = overflow
+        self.queue = deque()
+        self.stamps = deque()
+        self.queued = {}
+        self.deferred = set()
+        self.condition = threading.Condition()
+        self.slots = threading.Semaphore(self.concurrency)
+        self.executor = None
+        self.thread = None
+        self.running = False
+        self.submitted = 0
+        self.executed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.failed = 0
+        self.maxDepth = 0
+
+    def start(self):
+        #启动分派线程和工作线程池#
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                           thread_name_prefix="shortcut-worker")
+        self.thread = threading.Thread(target=self.run, name="shortcut-dispatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        #停止分派，丢弃尚未执行的触发，并等待线程退出#
+        with self.condition:
+            if not self.running:
+                return
+            self.running = False
+            self.queue.clear()
+            self.stamps.clear()
+            self.queued.clear()
+            self.deferred.clear()
+            self.condition.notify_all()
+        # 唤醒可能正在等待空闲工作线程的分派线程
+        self.slots.release()
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+        self.executor.shutdown(wait=True)
+        self.slots = threading.Semaphore(self.concurrency)
+        self.thread = None
+        self.executor = None
+
+    def submit(self, shortcut, throttle=None, stamp=None):
+        #在钩子回调中调用：入队并立即返回，被丢弃时返回 False#
+        with self.condition:
+            if not self.running:
+                return False
+            self.submitted += 1
+            if throttle is not None:
+                decision = throttle.admit(time.monotonic())
+                if decision == DROP:
+                    self.throttled += 1
+                    return True
+                if decision == DEFER:
+                    self.deferred.add(throttle)
+                    self.condition.notify()
+                    return True
+            return self.enqueue(shortcut, stamp)
+
+    def enqueue(self, shortcut, stamp=None):
+        #持有锁时调用：按溢出策略放入队列#
+        queue = self.queue
+        if len(queue) >= self.maxQueue:
+            if self.overflow == 'drop_oldest':
+                self.forget(queue.popleft())
+                self.stamps.popleft()
+                self.dropped += 1
+            elif self.overflow == 'coalesce' and shortcut in self.queued:
+                self.coalesced += 1
+                return True
+            else:
+                self.dropped += 1
+                return False
+        queue.append(shortcut)
+        self.stamps.append(stamp)
+        self.queued[shortcut] = self.queued.get(shortcut, 0) + 1
+        if len(queue) > self.maxDepth:
+            self.maxDepth = len(queue)
+        self.condition.notify()
+        return True
+
+    def forget(self, shortcut):
+        count = self.queued.get(shortcut, 0) - 1
+        if count > 0:
+            self.queued[shortcut] = count
+        else:
+            self.queued.pop(shortcut, None)
+
+    def run(self):
+        #分派线程：有空闲工作线程时才出队，队列长度即真实积压量#
+        while True:
+            self.slots.acquire()
+            with self.condition:
+                while self.running and not self.queue:
+                    if self.deferred:
+                        # 等到最早一个延后触发到期
+                        timeout = self.releaseDeferred(time.monotonic())
+                        if self.queue:
+                            break
+                        self.condition.wait(timeout)
+                    else:
+                        self.condition.wait()
+                if not self.running:
+                    return
+                shortcut = self.queue.popleft()
+                stamp = self.stamps.popleft()
+                self.forget(shortcut)
+            self.executor.submit(self.execute, shortcut, stamp)
+
+    def releaseDeferred(self, now):
+        #持有锁时调用：把到期的延后触发放入队列，返回距下一个到期的秒数#
+        timeout = None
+        for throttle in list(self.deferred):
+            if throttle.due is None:
+                self.deferred.discard(throttle)
+            elif throttle.due <= now:
+                self.deferred.discard(throttle)
+                if throttle.release(now):
+                    self.enqueue(throttle.shortcut)
+                else:
+                    self.throttled += 1
+            elif timeout is None or throttle.due - now < timeout:
+                timeout = throttle.due - now
+        return timeout
+
+    def execute(self, shortcut, stamp=None):
+        try:
+            if stamp is not None:
+                stamp += (time.perf_counter_ns(),)
+            self.handler(shortcut, stamp)
+            failed = False
+        except Exception:
+            failed = True
+        finally:
+            self.slots.release()
+        with self.condition:
+            if failed:
+                self.failed += 1
+            else:
+                self.executed += 1
+
+    def metrics(self):
+        #返回队列相关指标#
+        with self.condition:
+            return {
+                "queueDepth": len(self.queue),
+                "maxQueueDepth": self.maxDepth,
+                "submitted": self.submitted,
+                "executed": self.executed,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "throttled": self.throttled,
+                "failed": self.failed,
+            }
@@ -0,0 +1,101 @@
+import time
+import threading
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "调试", INFO: "信息", WARNING: "警告", ERROR: "错误"}
+
+# 事件类型：普通状态消息的 kind 为 None；快捷键触发、启动进程、进程退出带有类型，
+# 供订阅者（如 rpc.RpcServer 的事件流）按类型过滤而不必解析消息文本
+TRIGGER = "trigger"
+EXEC = "exec"
+EXIT = "exit"
+
+
+class Event:
+    #一条事件记录，seq 为全局递增序号，data 为 kind 对应的附加字段#
+    __slots__ = ('seq', 'level', 'timestamp', 'shortcut', 'message', 'kind', 'data')
+
+    def __init__(self, seq, level, timestamp, shortcut, message, kind=None, data=None):
+        self.seq = seq
+        self.level = level
+        self.timestamp = timestamp
+        self.shortcut = shortcut
+        self.message = message
+        self.kind = kind
+        self.data = data
+
+    @property
+    def levelName(self):
+        return LEVEL_NAMES.get(self.level, str(self.level))
+
+
+class EventBus:
+    #事件总线：固定容量的环形缓冲区#
+    # publish() 可在任意线程调用，只写入缓冲区，不发出跨线程信号；
+    # 界面按固定频率用 since() 取出新事件的汇总，日志窗口用 get() 按行读取，
+    # 都不复制缓冲区。超出容量时覆盖最旧的事件。
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.buffer = [None] * capacity
+        self.total = 0
+        self.lock = threading.Lock()
+        self.listeners = []
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def firstSeq(self):
+        #缓冲区中最旧事件的序号#
+        return max(0, self.total - self.capacity)
+
+    def publish(self, level, message, shortcut=None, kind=None, data=None):
+        with self.lock:
+            event = Event(self.total, level, time.time(), shortcut, message, kind, data)
+            self.buffer[self.total % self.capacity] = event
+            self.total += 1
+        for listener in self.listeners:
+            listener(event)
+        return event
+
+    def subscribe(self, listener):
+        #注册 listener(event)，在发布事件的线程中同步调用#
+        self.listeners = self.listeners + [listener]
+
+    def unsubscribe(self, listener):
+        self.listeners = [l for l in self.listeners if l is not listener]
+
+    def get(self, index):
+        #按从旧到新的位置读取事件，0 为最旧#
+        with self.lock:
+            if not 0 <= index < min(self.total, self.capacity):
+                raise IndexError(index)
+            return self.buffer[(self.firstSeq + index) % self.capacity]
+
+    def read(self, seq, limit=256):
+        #读取序号 >= seq 的事件（最多 limit 条），返回 (事件列表, 下一个序号, 已被覆盖而跳过的条数)#
+        # 读取慢于发布的订阅者不会阻塞发布方，只会跳过被覆盖的事件
+        with self.lock:
+            start = max(seq, self.total - self.capacity)
+            end = min(self.total, start + limit)
+            events = [self.buffer[current % self.capacity] for current in range(start, end)]
+        return events, end, start - seq
+
+    def since(self, seq, minLevel=INFO):
+        #汇总序号 >= seq 的事件：返回 (下一个序号, 最新的达到 minLevel 的事件, 达到 minLevel 的条数)#
+        with self.lock:
+            total = self.total
+            start = max(seq, total - self.capacity)
+            latest = None
+            count = 0
+            for current in range(start, total):
+                event = self.buffer[current % self.capacity]
+                if event.level >= minLevel:
+                    latest = event
+                    count += 1
+        return total, latest, count
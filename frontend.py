@@ -1,19 +1,27 @@
 import os
 import sys
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-    QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLineEdit, 
+import time
+import bisect
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, 
+    QHBoxLayout, QTableView, QAbstractItemView, QPushButton, QLineEdit, 
     QLabel, QMessageBox, QFormLayout, QCheckBox, QHeaderView,
-    QAction, QMenu, QDialog, QSystemTrayIcon, QStyle, QFrame)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal
-from PyQt5.QtGui import (QIcon, QColor, QFont, QPainter, 
-                         QLinearGradient, QPen)
+    QDialog, QFrame, QFileDialog)
+from PyQt5.QtCore import (Qt, QTimer, pyqtSignal, QAbstractTableModel, QAbstractProxyModel,
+                          QModelIndex)
+from PyQt5.QtGui import QColor, QFont, QPainter
+
+import theme
 
 import warnings
 warnings.filterwarnings('ignore', message='sipPyTypeDict() is deprecated')
 
 # 导入后端
 try:
-    from backend import ShortcutBackend
+    from backend import ShortcutBackend, BatchError
+    from transfer import ShortcutImporter, exportShortcuts
+    from search import SearchIndex
+    from events import WARNING, LEVEL_NAMES
+    from latency import STAGES, STAGE_NAMES
 except ImportError as e:
     print(f"导入后端模块失败: {e}")
     ShortcutBackend = None
@@ -26,6 +34,18 @@ def resource_path(relative_path):
     # 开发环境的当前目录
     return os.path.join(os.path.abspath("."), relative_path)
 
+def tech_message_box(parent, title, message, icon="信息"):
+    #创建科技风格消息框，样式来自应用级主题"""
+    msg_box = QMessageBox(parent)
+    msg_box.setObjectName("techMessageBox")
+    msg_box.setWindowTitle(title)
+    msg_box.setText(message)
+    if icon == "警告":
+        msg_box.setIcon(QMessageBox.Warning)
+    else:
+        msg_box.setIcon(QMessageBox.Information)
+    return msg_box
+
 class TechButton(QPushButton):
     #科技风格按钮"""
     def __init__(self, text="", parent=None):
@@ -34,32 +54,16 @@ class TechButton(QPushButton):
         self.setCursor(Qt.PointingHandCursor)
         
     def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        # 创建渐变
-        gradient = QLinearGradient(0, 0, 0, self.height())
+        # 背景按尺寸和状态缓存为位图，重绘时只需贴图和绘制文字
         if self.isDown():
-            gradient.setColorAt(0, QColor(0, 150, 255))
-            gradient.setColorAt(1, QColor(0, 100, 200))
+            state = "down"
         elif self.underMouse():
-            gradient.setColorAt(0, QColor(0, 180, 255))
-            gradient.setColorAt(1, QColor(0, 120, 220))
+            state = "hover"
         else:
-            gradient.setColorAt(0, QColor(0, 120, 220))
-            gradient.setColorAt(1, QColor(0, 80, 180))
-        
-        # 绘制圆角矩形背景
-        painter.setBrush(gradient)
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(0, 0, self.width(), self.height(), 5, 5)
-        
-        # 绘制边框
-        painter.setPen(QPen(QColor(100, 180, 255), 1))
-        painter.setBrush(Qt.NoBrush)
-        painter.drawRoundedRect(0, 0, self.width()-1, self.height()-1, 5, 5)
-        
-        # 绘制文字
+            state = "normal"
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, theme.button_background(self.width(), self.height(), state,
+                                                         self.devicePixelRatioF()))
         painter.setPen(QColor(255, 255, 255))
         painter.setFont(self.font())
         painter.drawText(self.rect(), Qt.AlignCenter, self.text())
@@ -69,113 +73,432 @@ class TechLineEdit(QLineEdit):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedHeight(35)
-        self.setStyleSheet("""
-            QLineEdit {
-                background-color: rgba(30, 30, 40, 200);
-                border: 2px solid rgba(100, 150, 255, 100);
-                border-radius: 8px;
-                padding: 5px 10px;
-                color: #ffffff;
-                font-size: 12px;
-                selection-background-color: rgba(0, 150, 255, 150);
-            }
-            QLineEdit:focus {
-                border: 2px solid rgba(0, 150, 255, 200);
-                background-color: rgba(35, 35, 45, 200);
-            }
-            QLineEdit:hover {
-                border: 2px solid rgba(100, 180, 255, 150);
-            }
-        """)
-
-class TechTableWidget(QTableWidget):
+
+class ShortcutTableModel(QAbstractTableModel):
+    #快捷键表格模型，直接读取后端的快捷键表"""
+    # 只保存快捷键顺序；命令和描述在视图绘制可见行时才读取。
+    # 修改通过 apply_changes 转换为行插入、删除和 dataChanged 信号。
+    HEADERS = ["快捷键", "命令", "描述"]
+
+    def __init__(self, backend, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.keys = []
+        self.rows = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        shortcut = self.keys[index.row()]
+        column = index.column()
+        if column == 0:
+            return shortcut
+        data = self.backend.shortcuts.get(shortcut)
+        if data is None:
+            return None
+        return data.get("command", "") if column == 1 else data.get("description", "")
+
+    def shortcut_at(self, row):
+        #返回第 row 行的快捷键"""
+        return self.keys[row]
+
+    def reset(self):
+        #重新读取全部快捷键"""
+        self.beginResetModel()
+        self.keys = list(self.backend.shortcuts)
+        self.rows = {shortcut: row for row, shortcut in enumerate(self.keys)}
+        self.endResetModel()
+
+    def apply_changes(self, changes):
+        #把 {快捷键: 新数据或 None} 转换为细粒度的模型信号"""
+        removed = sorted((self.rows[s] for s, data in changes.items() if data is None and s in self.rows),
+                         reverse=True)
+        if removed:
+            # 连续的行合并为一次删除
+            start = end = removed[0]
+            for row in removed[1:] + [None]:
+                if row is not None and row == start - 1:
+                    start = row
+                    continue
+                self.beginRemoveRows(QModelIndex(), start, end)
+                del self.keys[start:end + 1]
+                self.endRemoveRows()
+                if row is not None:
+                    start = end = row
+            self.rows = {shortcut: row for row, shortcut in enumerate(self.keys)}
+
+        added = []
+        for shortcut, data in changes.items():
+            if data is None:
+                continue
+            row = self.rows.get(shortcut)
+            if row is None:
+                added.append(shortcut)
+            else:
+                self.dataChanged.emit(self.index(row, 1), self.index(row, 2))
+        if added:
+            first = len(self.keys)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for row, shortcut in enumerate(added, first):
+                self.keys.append(shortcut)
+                self.rows[shortcut] = row
+            self.endInsertRows()
+
+
+class ShortcutFilterModel(QAbstractProxyModel):
+    #按搜索结果过滤表格行的代理模型"""
+    # 未搜索时与源模型一一对应并逐条转发行变化信号；
+    # 搜索时只保存匹配的源行号列表，过滤条件或源数据变化时按匹配集合重新映射。
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.matches = None
+        self.source_rows = None
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.rowsAboutToBeInserted.connect(self.on_rows_about_to_be_inserted)
+        model.rowsInserted.connect(self.on_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self.on_rows_about_to_be_removed)
+        model.rowsRemoved.connect(self.on_rows_removed)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self.on_model_reset)
+        model.dataChanged.connect(self.on_data_changed)
+
+    def set_matches(self, matches):
+        #设置匹配的快捷键集合，None 表示显示全部"""
+        self.beginResetModel()
+        self.matches = matches
+        self.remap()
+        self.endResetModel()
+
+    def remap(self):
+        if self.matches is None:
+            self.source_rows = None
+            return
+        # 源行号递增，反向映射用二分查找，不另建字典。
+        # 匹配集合较小时只遍历匹配集合，经源模型的 快捷键 -> 行号 映射取得行号再排序；
+        # 匹配大部分行时按顺序扫描整表更快（排序的常数开销更大）
+        matches = self.matches
+        model = self.sourceModel()
+        if len(matches) * 4 < len(model.keys):
+            rows = model.rows
+            self.source_rows = sorted([rows[shortcut] for shortcut in matches if shortcut in rows])
+        else:
+            self.source_rows = [row for row, shortcut in enumerate(model.keys) if shortcut in matches]
+
+    def on_rows_about_to_be_inserted(self, parent, first, last):
+        if self.matches is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+        else:
+            self.beginResetModel()
+
+    def on_rows_inserted(self, parent, first, last):
+        if self.matches is None:
+            self.endInsertRows()
+        else:
+            self.remap()
+            self.endResetModel()
+
+    def on_rows_about_to_be_removed(self, parent, first, last):
+        if self.matches is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+        else:
+            self.beginResetModel()
+
+    def on_rows_removed(self, parent, first, last):
+        if self.matches is None:
+            self.endRemoveRows()
+        else:
+            self.remap()
+            self.endResetModel()
+
+    def on_model_reset(self):
+        self.remap()
+        self.endResetModel()
+
+    def on_data_changed(self, top_left, bottom_right, roles=()):
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            proxy_row = self.proxy_row(row)
+            if proxy_row is not None:
+                self.dataChanged.emit(self.index(proxy_row, top_left.column()),
+                                      self.index(proxy_row, bottom_right.column()))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        if self.source_rows is None:
+            return self.sourceModel().rowCount()
+        return len(self.source_rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or row < 0 or column < 0:
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        row = proxy_index.row()
+        if self.source_rows is not None:
+            if row >= len(self.source_rows):
+                return QModelIndex()
+            row = self.source_rows[row]
+        return self.sourceModel().index(row, proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = self.proxy_row(source_index.row())
+        if row is None:
+            return QModelIndex()
+        return self.index(row, source_index.column())
+
+    def proxy_row(self, source_row):
+        #源行号对应的代理行号，被过滤掉时返回 None"""
+        if self.source_rows is None:
+            return source_row
+        row = bisect.bisect_left(self.source_rows, source_row)
+        if row < len(self.source_rows) and self.source_rows[row] == source_row:
+            return row
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal:
+            return self.sourceModel().headerData(section, orientation, role)
+        if role == Qt.DisplayRole:
+            return section + 1
+        return None
+
+    def shortcut_at(self, row):
+        #返回第 row 行（代理行号）的快捷键"""
+        return self.sourceModel().shortcut_at(self.mapToSource(self.index(row, 0)).row())
+
+
+class EventLogModel(QAbstractTableModel):
+    #事件日志模型，按行直接读取事件总线的环形缓冲区"""
+    HEADERS = ["时间", "级别", "快捷键", "消息"]
+
+    def __init__(self, bus, parent=None):
+        super().__init__(parent)
+        self.bus = bus
+        self.first_seq = bus.firstSeq
+        self.count = len(bus)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        try:
+            event = self.bus.get(index.row() + self.first_seq - self.bus.firstSeq)
+        except IndexError:
+            return None
+        if role == Qt.ForegroundRole:
+            return QColor("#ff8060") if event.level >= WARNING else None
+        if role != Qt.DisplayRole:
+            return None
+        column = index.column()
+        if column == 0:
+            return time.strftime("%H:%M:%S", time.localtime(event.timestamp))
+        if column == 1:
+            return LEVEL_NAMES.get(event.level, str(event.level))
+        if column == 2:
+            return event.shortcut or ""
+        return event.message
+
+    def refresh(self):
+        #缓冲区有新事件时更新行数：未覆盖旧事件时追加行，否则重置"""
+        first_seq, count = self.bus.firstSeq, len(self.bus)
+        if first_seq == self.first_seq:
+            if count > self.count:
+                self.beginInsertRows(QModelIndex(), self.count, count - 1)
+                self.count = count
+                self.endInsertRows()
+            return
+        self.beginResetModel()
+        self.first_seq, self.count = first_seq, count
+        self.endResetModel()
+
+
+class EventLogDialog(QDialog):
+    #事件日志窗口"""
+    def __init__(self, bus, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("事件日志")
+        self.resize(800, 450)
+        layout = QVBoxLayout(self)
+        self.model = EventLogModel(bus, self)
+        self.view = TechTableView()
+        self.view.setModel(self.model)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.view.verticalHeader().setVisible(False)
+        layout.addWidget(self.view)
+
+    def refresh(self):
+        #追加新事件，停留在底部时自动滚动"""
+        bar = self.view.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum()
+        self.model.refresh()
+        if at_bottom:
+            self.view.scrollToBottom()
+
+
+class LatencyTableModel(QAbstractTableModel):
+    #触发延迟表：每个快捷键每个阶段一行"""
+    HEADERS = ["快捷键", "阶段", "次数", "p50 (ms)", "p99 (ms)", "最大 (ms)"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole and index.column() >= 2:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+        value = self.rows[index.row()][index.column()]
+        if isinstance(value, float):
+            return f"{value / 1e3:.3f}"
+        return str(value)
+
+    def set_stats(self, stats):
+        #用后端的 latencyStats() 结果替换全部行"""
+        self.beginResetModel()
+        self.rows = [
+            (shortcut, STAGE_NAMES[stage], stages[stage]["count"],
+             stages[stage]["p50Us"], stages[stage]["p99Us"], stages[stage]["maxUs"])
+            for shortcut, stages in sorted(stats.items())
+            for stage in STAGES
+        ]
+        self.endResetModel()
+
+
+class DiagnosticsDialog(QDialog):
+    #诊断窗口：触发延迟直方图和运行指标，打开时每秒刷新"""
+    def __init__(self, backend, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.setWindowTitle("诊断")
+        self.resize(760, 450)
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.trace_checkbox = TechCheckBox("记录触发延迟")
+        self.trace_checkbox.setChecked(backend.latency.enabled)
+        self.trace_checkbox.stateChanged.connect(self.toggle_tracing)
+        self.reset_button = TechButton("清空")
+        self.reset_button.clicked.connect(self.reset_stats)
+        controls.addWidget(self.trace_checkbox)
+        controls.addWidget(self.reset_button)
+        controls.addStretch()
+        layout.addLayout(controls)
+
+        self.metrics_label = QLabel()
+        self.metrics_label.setWordWrap(True)
+        layout.addWidget(self.metrics_label)
+
+        self.model = LatencyTableModel(self)
+        self.view = TechTableView()
+        self.view.setModel(self.model)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.view.verticalHeader().setVisible(False)
+        layout.addWidget(self.view)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start(1000)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def toggle_tracing(self, state):
+        self.backend.setLatencyTracing(state == Qt.Checked)
+
+    def reset_stats(self):
+        self.backend.latency.reset()
+        self.refresh()
+
+    def refresh(self):
+        #刷新运行指标和延迟表"""
+        metrics = self.backend.metrics()
+        self.metrics_label.setText(
+            f"钩子回调 {metrics['hookCalls']:,} 次，平均 {metrics['hookAvgUs']:.1f} µs，"
+            f"最长 {metrics['hookMaxUs']:.1f} µs | 触发 {metrics['submitted']:,} 次，"
+            f"执行 {metrics['executed']:,}，丢弃 {metrics['dropped']:,}，"
+            f"节流 {metrics['throttled']:,}，队列 {metrics['queueDepth']}/{metrics['maxQueueDepth']}")
+        self.model.set_stats(self.backend.latencyStats())
+
+
+class TechTableView(QTableView):
     #科技风格表格"""
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QTableWidget {
-                background-color: rgba(25, 25, 35, 180);
-                border: 1px solid rgba(100, 150, 255, 80);
-                border-radius: 8px;
-                gridline-color: rgba(100, 150, 255, 50);
-                color: #e0e0e0;
-                font-size: 11px;
-                outline: none;
-            }
-            QTableWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid rgba(100, 150, 255, 30);
-            }
-            QTableWidget::item:selected {
-                background-color: rgba(0, 150, 255, 150);
-                color: white;
-            }
-            QTableWidget::item:hover {
-                background-color: rgba(100, 150, 255, 50);
-            }
-            QHeaderView::section {
-                background-color: rgba(20, 20, 30, 220);
-                color: #00a8ff;
-                padding: 8px;
-                border: none;
-                font-weight: bold;
-                font-size: 11px;
-                border-bottom: 2px solid rgba(0, 168, 255, 100);
-            }
-            QScrollBar:vertical {
-                background-color: rgba(30, 30, 40, 150);
-                width: 12px;
-                border-radius: 6px;
-            }
-            QScrollBar::handle:vertical {
-                background-color: rgba(100, 150, 255, 120);
-                border-radius: 6px;
-                min-height: 20px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background-color: rgba(100, 180, 255, 180);
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                border: none;
-                background: none;
-            }
-        """)
+        # 固定行高，视图无需逐行计算尺寸
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(32)
+        self.setWordWrap(False)
 
 class TechCheckBox(QCheckBox):
     #科技风格复选框"""
     def __init__(self, text="", parent=None):
         super().__init__(text, parent)
-        self.setStyleSheet("""
-            QCheckBox {
-                color: #b0b0b0;
-                font-size: 11px;
-                spacing: 8px;
-            }
-            QCheckBox::indicator {
-                width: 16px;
-                height: 16px;
-                border: 2px solid rgba(100, 150, 255, 150);
-                border-radius: 3px;
-                background-color: rgba(30, 30, 40, 200);
-            }
-            QCheckBox::indicator:hover {
-                border: 2px solid rgba(100, 180, 255, 200);
-            }
-            QCheckBox::indicator:checked {
-                background-color: rgba(0, 150, 255, 200);
-                border: 2px solid rgba(0, 150, 255, 200);
-            }
-            QCheckBox::indicator:checked:hover {
-                background-color: rgba(0, 180, 255, 200);
-                border: 2px solid rgba(0, 180, 255, 200);
-            }
-        """)
 
 class AddShortcutDialog(QDialog):
     shortcutCaptured = pyqtSignal(str)
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, backend=None, editing=None):
         super().__init__(parent)
+        # backend 用于在保存前检查冲突，editing 为正在编辑的快捷键（不与自身比较）
+        self.backend = backend
+        self.editing = editing
         self.setupUi()
         self.is_capturing = False
         self.captured_keys = set()
@@ -187,14 +510,6 @@ class AddShortcutDialog(QDialog):
         self.setWindowTitle("添加快捷键")
         self.setFixedSize(450, 300)
         self.setModal(True)
-        self.setStyleSheet("""
-            QDialog {
-                background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
-                    stop: 0 #1a1a2a, stop: 0.5 #16213e, stop: 1 #0f3460);
-                border: 1px solid rgba(100, 150, 255, 100);
-                border-radius: 10px;
-            }
-        """)
 
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
@@ -203,33 +518,14 @@ class AddShortcutDialog(QDialog):
         # 标题
         title_label = QLabel("添加快捷键")
         title_label.setAlignment(Qt.AlignCenter)
-        title_label.setStyleSheet("""
-            QLabel {
-                color: #00a8ff;
-                font-size: 18px;
-                font-weight: bold;
-                padding: 10px;
-                background-color: rgba(20, 20, 30, 150);
-                border-radius: 8px;
-                border: 1px solid rgba(100, 150, 255, 80);
-            }
-        """)
+        title_label.setObjectName("dialogTitle")
         layout.addWidget(title_label)
         
         # 状态标签
         self.statusLabel = QLabel("点击'捕获快捷键'按钮开始捕获组合键")
         self.statusLabel.setAlignment(Qt.AlignCenter)
-        self.statusLabel.setStyleSheet("""
-            QLabel {
-                color: #00d4ff;
-                background-color: rgba(20, 25, 40, 180);
-                padding: 12px;
-                border-radius: 8px;
-                border: 1px solid rgba(0, 212, 255, 80);
-                font-size: 12px;
-                font-weight: bold;
-            }
-        """)
+        self.statusLabel.setObjectName("captureStatus")
+        theme.set_state(self.statusLabel, "idle")
         layout.addWidget(self.statusLabel)
         
         # 表单布局
@@ -241,7 +537,7 @@ class AddShortcutDialog(QDialog):
         
         # 快捷键输入
         shortcut_label = QLabel("快捷键:")
-        shortcut_label.setStyleSheet("color: #b0b0ff; font-weight: bold; font-size: 12px;")
+        shortcut_label.setObjectName("fieldLabel")
         self.shortcutInput = TechLineEdit()
         self.shortcutInput.setPlaceholderText("捕获后自动填充快捷键")
         self.shortcutInput.setReadOnly(True)
@@ -249,14 +545,14 @@ class AddShortcutDialog(QDialog):
         
         # 命令输入
         command_label = QLabel("命令:")
-        command_label.setStyleSheet("color: #b0b0ff; font-weight: bold; font-size: 12px;")
+        command_label.setObjectName("fieldLabel")
         self.commandInput = TechLineEdit()
         self.commandInput.setPlaceholderText("程序路径或URL")
         layout_form.addRow(command_label, self.commandInput)
         
         # 描述输入
         description_label = QLabel("描述:")
-        description_label.setStyleSheet("color: #b0b0ff; font-weight: bold; font-size: 12px;")
+        description_label.setObjectName("fieldLabel")
         self.descriptionInput = TechLineEdit()
         self.descriptionInput.setPlaceholderText("可选描述")
         layout_form.addRow(description_label, self.descriptionInput)
@@ -308,17 +604,7 @@ class AddShortcutDialog(QDialog):
         self.is_capturing = True
         self.captured_keys.clear()
         self.statusLabel.setText("请按下快捷键组合... (按ESC取消)")
-        self.statusLabel.setStyleSheet("""
-            QLabel {
-                color: #ffaa00;
-                background-color: rgba(40, 30, 20, 180);
-                padding: 12px;
-                border-radius: 8px;
-                border: 1px solid rgba(255, 170, 0, 100);
-                font-size: 12px;
-                font-weight: bold;
-            }
-        """)
+        theme.set_state(self.statusLabel, "capturing")
         self.testButton.setText("停止捕获")
         self.shortcutInput.setText("")
         self.shortcutInput.setPlaceholderText("正在捕获...")
@@ -338,19 +624,29 @@ class AddShortcutDialog(QDialog):
             self.hook = None
             
         self.statusLabel.setText("点击'捕获快捷键'按钮开始捕获组合键")
-        self.statusLabel.setStyleSheet("""
-            QLabel {
-                color: #00d4ff;
-                background-color: rgba(20, 25, 40, 180);
-                padding: 12px;
-                border-radius: 8px;
-                border: 1px solid rgba(0, 212, 255, 80);
-                font-size: 12px;
-                font-weight: bold;
-            }
-        """)
+        theme.set_state(self.statusLabel, "idle")
         self.testButton.setText("捕获快捷键")
         self.shortcutInput.setPlaceholderText("测试后自动填充快捷键")
+        self.show_conflicts()
+
+    def show_conflicts(self):
+        #在状态标签中显示与现有快捷键的冲突，返回冲突列表"""
+        shortcut = self.shortcutInput.text().strip()
+        if self.backend is None or not shortcut:
+            return []
+        conflicts = self.backend.findConflicts(shortcut, self.editing)
+        if conflicts:
+            self.statusLabel.setText("\n".join(str(conflict) for conflict in conflicts))
+            theme.set_state(self.statusLabel, "conflict")
+        return conflicts
+
+    def accept(self):
+        #保存前检查冲突，重复或前缀冲突时不关闭对话框"""
+        blocking = [conflict for conflict in self.show_conflicts() if conflict.blocking]
+        if blocking:
+            self.show_message("快捷键冲突", "\n".join(str(conflict) for conflict in blocking), "警告")
+            return
+        super().accept()
 
     def on_key_press(self, event):
         #键盘按下事件处理"""
@@ -420,44 +716,7 @@ class AddShortcutDialog(QDialog):
 
     def show_message(self, title, message, icon="信息"):
         #显示消息提示窗口"""
-        msg_box = QMessageBox(self)
-        msg_box.setWindowTitle(title)
-        msg_box.setText(message)
-        
-        # 设置消息框样式
-        msg_box.setStyleSheet("""
-            QMessageBox {
-                background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
-                    stop: 0 #1a1a2a, stop: 0.5 #16213e, stop: 1 #0f3460);
-                border: 1px solid rgba(100, 150, 255, 100);
-                border-radius: 10px;
-            }
-            QMessageBox QLabel {
-                color: #e0e0e0;
-                font-size: 12px;
-            }
-            QMessageBox QPushButton {
-                background-color: rgba(0, 120, 220, 180);
-                color: white;
-                border: none;
-                padding: 8px 15px;
-                border-radius: 5px;
-                font-weight: bold;
-                min-width: 80px;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: rgba(0, 150, 255, 200);
-            }
-        """)
-        
-        if icon == "信息":
-            msg_box.setIcon(QMessageBox.Information)
-        elif icon == "警告":
-            msg_box.setIcon(QMessageBox.Warning)
-        else:
-            msg_box.setIcon(QMessageBox.Information)
-            
-        msg_box.exec_()
+        tech_message_box(self, title, message, icon).exec_()
     
     def getData(self):
         return {
@@ -468,86 +727,82 @@ class AddShortcutDialog(QDialog):
 
 
 class ShortcutManagerFrontend(QMainWindow):
-    def __init__(self):
+    def __init__(self, config_file="shortcuts.json", trace_latency=False, controller=None):
         super().__init__()
         if ShortcutBackend is None:
             QMessageBox.critical(self, "错误", "无法初始化后端模块")
             sys.exit(1)
             
-        self.backend = ShortcutBackend()
+        # 后端、监听和托盘由 TrayController 持有；单独创建窗口时同时创建控制器
+        if controller is None:
+            from tray import TrayController
+            controller = TrayController(config_file, trace_latency=trace_latency)
+            controller.window = self
+        self.controller = controller
+        self.backend = controller.backend
+        self.diagnostics_dialog = None
+        self.importer = None
         self.setup_ui()
         self.setup_backend_connections()
-        self.setup_tray_icon()
         self.load_settings()
         
     def setup_backend_connections(self):
         #设置后端信号连接#
-        self.backend.statusUpdate.connect(self.update_status)
-        self.backend.shortcutTriggered.connect(self.on_shortcut_triggered)
+        self.backend.shortcutsChanged.connect(self.apply_table_changes)
+        # 状态消息不逐条发送信号，而是在窗口可见时每 100 ms 从事件总线汇总一次；
+        # 窗口隐藏到托盘时定时器停止，不产生空闲唤醒
+        self.event_seq = 0
+        self.log_dialog = None
+        self.event_timer = QTimer(self)
+        self.event_timer.setInterval(100)
+        self.event_timer.timeout.connect(self.pump_events)
         
     def update_status(self, message):
         #更新状态栏#
         self.statusLabel.setText(message)
+
+    def pump_events(self):
+        #显示自上次以来最新的状态消息，并更新日志窗口"""
+        seq, latest, count = self.backend.events.since(self.event_seq)
+        if seq == self.event_seq:
+            return
+        self.event_seq = seq
+        if latest is not None:
+            message = latest.message
+            if count > 1:
+                message += f"（另有 {count - 1} 条消息）"
+            self.statusLabel.setText(message)
+        if self.log_dialog is not None and self.log_dialog.isVisible():
+            self.log_dialog.refresh()
+
+    def show_event_log(self):
+        #打开事件日志窗口"""
+        if self.log_dialog is None:
+            self.log_dialog = EventLogDialog(self.backend.events, self)
+        self.log_dialog.refresh()
+        self.log_dialog.show()
+        self.log_dialog.raise_()
         
-    def on_shortcut_triggered(self, message):
-        #处理快捷键触发#
-        self.statusLabel.setText(message)
-        
+    def show_diagnostics(self):
+        #打开诊断窗口"""
+        if self.diagnostics_dialog is None:
+            self.diagnostics_dialog = DiagnosticsDialog(self.backend, self)
+        self.diagnostics_dialog.show()
+        self.diagnostics_dialog.raise_()
+
     def show_message(self, title, message, icon="信息"):
         #显示消息提示窗口#
-        msg_box = QMessageBox(self)
-        msg_box.setWindowTitle(title)
-        msg_box.setText(message)
-        
-        # 设置消息框样式
-        msg_box.setStyleSheet("""
-            QMessageBox {
-                background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
-                    stop: 0 #1a1a2a, stop: 0.5 #16213e, stop: 1 #0f3460);
-                border: 1px solid rgba(100, 150, 255, 100);
-                border-radius: 10px;
-            }
-            QMessageBox QLabel {
-                color: #e0e0e0;
-                font-size: 12px;
-            }
-            QMessageBox QPushButton {
-                background-color: rgba(0, 120, 220, 180);
-                color: white;
-                border: none;
-                padding: 8px 15px;
-                border-radius: 5px;
-                font-weight: bold;
-                min-width: 80px;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: rgba(0, 150, 255, 200);
-            }
-        """)
-        
-        if icon == "信息":
-            msg_box.setIcon(QMessageBox.Information)
-        elif icon == "警告":
-            msg_box.setIcon(QMessageBox.Warning)
-        else:
-            msg_box.setIcon(QMessageBox.Information)
-            
-        msg_box.exec_()
+        tech_message_box(self, title, message, icon).exec_()
         
     def setup_ui(self):
         #设置主窗口界面"""
         self.setWindowTitle("快捷键管理软件")
         self.setFixedSize(900, 650)
         
-        # 设置主窗口图标
-        try:
-            icon_path = resource_path("icon.ico")
-            if os.path.exists(icon_path):
-                self.setWindowIcon(QIcon(icon_path))
-        except Exception as e:
-            print(f"设置窗口图标失败: {e}")
+        # 设置主窗口图标（与托盘共用启动时加载的图标）
+        if self.controller.icon is not None:
+            self.setWindowIcon(self.controller.icon)
         
-        self.set_dark_tech_theme()
         
         central_widget = QWidget()
         layout = QVBoxLayout()
@@ -557,24 +812,29 @@ class ShortcutManagerFrontend(QMainWindow):
         # 标题标签
         self.titleLabel = QLabel("快捷键管理器")
         self.titleLabel.setAlignment(Qt.AlignCenter)
-        self.titleLabel.setStyleSheet("""
-            QLabel {
-                color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #00a8ff, stop:0.5 #00d4ff, stop:1 #00a8ff);
-                background-color: rgba(20, 20, 30, 180);
-                padding: 15px;
-                border-radius: 10px;
-                border: 2px solid rgba(0, 168, 255, 100);
-            }
-        """)
+        self.titleLabel.setObjectName("titleLabel")
         layout.addWidget(self.titleLabel)
         
         # 快捷键表格
-        self.tableWidget = TechTableWidget()
-        self.tableWidget.setColumnCount(3)
-        self.tableWidget.setHorizontalHeaderLabels(["快捷键", "命令", "描述"])
-        self.tableWidget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        layout.addWidget(self.tableWidget)
+        # 搜索框：按快捷键、命令和描述即时过滤
+        self.searchInput = TechLineEdit()
+        self.searchInput.setPlaceholderText("搜索快捷键、命令或描述")
+        self.searchInput.setClearButtonEnabled(True)
+        self.searchInput.textChanged.connect(self.apply_search)
+        layout.addWidget(self.searchInput)
+        
+        self.search_index = SearchIndex()
+        self.index_pending = None
+        self.table_model = ShortcutTableModel(self.backend, self)
+        self.table_proxy = ShortcutFilterModel(self)
+        self.table_proxy.setSourceModel(self.table_model)
+        self.tableView = TechTableView()
+        self.tableView.setModel(self.table_proxy)
+        self.tableView.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tableView.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableView.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.tableView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.tableView)
         
         # 按钮区域
         buttonLayout = QHBoxLayout()
@@ -589,12 +849,28 @@ class ShortcutManagerFrontend(QMainWindow):
         self.remove_shortcut = TechButton("删除")
         self.remove_shortcut.clicked.connect(self.remove_selected_shortcut)
         
+        self.import_shortcuts = TechButton("导入")
+        self.import_shortcuts.clicked.connect(self.import_shortcuts_dialog)
+        
+        self.export_shortcuts = TechButton("导出")
+        self.export_shortcuts.clicked.connect(self.export_shortcuts_dialog)
+        
+        self.show_log = TechButton("日志")
+        self.show_log.clicked.connect(self.show_event_log)
+        
+        self.show_diagnostics_button = TechButton("诊断")
+        self.show_diagnostics_button.clicked.connect(self.show_diagnostics)
+        
         self.startup_checkbox = TechCheckBox("开机自启动")
         self.startup_checkbox.stateChanged.connect(self.toggle_startup)
         
         buttonLayout.addWidget(self.add_shortcut)
         buttonLayout.addWidget(self.edit_shortcut)
         buttonLayout.addWidget(self.remove_shortcut)
+        buttonLayout.addWidget(self.import_shortcuts)
+        buttonLayout.addWidget(self.export_shortcuts)
+        buttonLayout.addWidget(self.show_log)
+        buttonLayout.addWidget(self.show_diagnostics_button)
         buttonLayout.addWidget(self.startup_checkbox)
         buttonLayout.addStretch()
         
@@ -602,17 +878,10 @@ class ShortcutManagerFrontend(QMainWindow):
         
         # 状态栏
         status_frame = QFrame()
-        status_frame.setStyleSheet("""
-            QFrame {
-                background-color: rgba(20, 25, 40, 180);
-                border: 1px solid rgba(100, 150, 255, 80);
-                border-radius: 8px;
-                padding: 5px;
-            }
-        """)
+        status_frame.setObjectName("statusFrame")
         status_layout = QHBoxLayout(status_frame)
         self.statusLabel = QLabel("系统就绪")
-        self.statusLabel.setStyleSheet("color: #00d4ff; font-size: 11px; font-weight: bold;")
+        self.statusLabel.setObjectName("statusLabel")
         status_layout.addWidget(self.statusLabel)
         layout.addWidget(status_frame)
         
@@ -620,76 +889,19 @@ class ShortcutManagerFrontend(QMainWindow):
         self.setCentralWidget(central_widget)
         self.refresh_table()
 
-    def setup_tray_icon(self):
-        #"设置系统托盘图标"""
-        if not QSystemTrayIcon.isSystemTrayAvailable():
-            return
-            
-        self.tray_icon = QSystemTrayIcon(self)
-        
-        # 使用自定义图标而不是系统图标
-        try:
-            # 尝试加载自定义图标
-            icon_path = resource_path("icon.ico")
-            if os.path.exists(icon_path):
-                self.tray_icon.setIcon(QIcon(icon_path))
-            else:
-                # 如果图标文件不存在，使用系统图标作为备用
-                self.tray_icon.setIcon(self.style().standardIcon(QStyle.SP_ComputerIcon))
-        except Exception as e:
-            print(f"加载托盘图标失败: {e}")
-            # 备用方案：使用系统图标
-            self.tray_icon.setIcon(self.style().standardIcon(QStyle.SP_ComputerIcon))
-        
-        # 创建托盘菜单
-        tray_menu = QMenu()
-        tray_menu.setStyleSheet("""
-            QMenu {
-                background-color: rgba(30, 30, 45, 220);
-                border: 1px solid rgba(100, 150, 255, 100);
-                border-radius: 5px;
-                padding: 5px;
-            }
-            QMenu::item {
-                color: #e0e0e0;
-                padding: 5px 15px;
-                border-radius: 3px;
-            }
-            QMenu::item:selected {
-                background-color: rgba(0, 150, 255, 150);
-            }
-        """)
-        
-        show_action = QAction("显示", self)
-        show_action.triggered.connect(self.show)
-        tray_menu.addAction(show_action)
-        
-        hide_action = QAction("隐藏", self)
-        hide_action.triggered.connect(self.hide)
-        tray_menu.addAction(hide_action)
-        
-        tray_menu.addSeparator()
-        
-        quit_action = QAction("退出", self)
-        quit_action.triggered.connect(self.quit_application)
-        tray_menu.addAction(quit_action)
-        
-        self.tray_icon.setContextMenu(tray_menu)
-        self.tray_icon.activated.connect(self.tray_icon_activated)
-        self.tray_icon.show()
-        
-    def tray_icon_activated(self, reason):
-        #托盘图标激活处理"""
-        if reason == QSystemTrayIcon.DoubleClick:
-            if self.isVisible():
-                self.hide()
-            else:
-                self.show()
-                self.activateWindow()
-                
+    def showEvent(self, event):
+        #窗口显示时先汇总一次隐藏期间的消息，再开始定时汇总"""
+        self.pump_events()
+        self.event_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.event_timer.stop()
+        super().hideEvent(event)
+
     def closeEvent(self, event):
         #关闭事件处理"""
-        if hasattr(self, 'tray_icon') and self.tray_icon.isVisible():
+        if self.controller.has_tray():
             self.hide()
             event.ignore()
         else:
@@ -697,83 +909,195 @@ class ShortcutManagerFrontend(QMainWindow):
             
     def quit_application(self):
         #退出应用程序"""
-        self.backend.stopListener()
-        QApplication.quit()
-
-    def set_dark_tech_theme(self):
-        #设置深色科技主题"""
-        self.setStyleSheet("""
-            QMainWindow {
-                background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
-                    stop: 0 #0c0c1a, stop: 0.3 #1a1a2a, stop: 0.7 #16213e, stop: 1 #0f3460);
-                color: #e0e0e0;
-            }
-            QWidget {
-                background: transparent;
-            }
-        """)
-    
+        self.controller.quit()
+
     def add_shortcut_dialog(self):
         #显示添加快捷键对话框"""
-        dialog = AddShortcutDialog(self)
+        dialog = AddShortcutDialog(self, self.backend)
         if dialog.exec_() == QDialog.Accepted:
             data = dialog.getData()
             if all([data["shortcut"], data["command"]]):
                 # 使用后端添加快捷键
-                self.backend.addShortcut(data["shortcut"], data["command"], data["description"])
-                self.refresh_table()
+                try:
+                    with self.backend.batch() as batch:
+                        batch.add(data["shortcut"], data["command"], data["description"])
+                except BatchError as e:
+                    self.show_message("错误", f"添加快捷键失败: {e}", "警告")
             else:
                 self.show_message("错误", "请填写完整的快捷键和命令", "警告")
     
     def refresh_table(self):
         #刷新表格显示"""
-        self.tableWidget.setRowCount(len(self.backend.shortcuts))
-        for row, (shortcut, data) in enumerate(self.backend.shortcuts.items()):
-            self.tableWidget.setItem(row, 0, QTableWidgetItem(shortcut))
-            self.tableWidget.setItem(row, 1, QTableWidgetItem(data["command"]))
-            self.tableWidget.setItem(row, 2, QTableWidgetItem(data.get("description", "")))
+        self.table_model.reset()
+        self.start_search_index()
+        self.apply_search()
+
+    def start_search_index(self):
+        #在事件循环空闲时分批建立搜索索引，之后随修改增量更新"""
+        self.search_index = SearchIndex()
+        self.index_pending = self.backend.store.iterItems()
+        QTimer.singleShot(0, self.build_search_index)
+
+    def build_search_index(self, limit=500):
+        #为一批快捷键建立索引，limit 为 None 时处理全部剩余条目"""
+        if self.index_pending is None:
+            return
+        shortcuts = self.backend.shortcuts
+        batch = []
+        for shortcut, data in self.index_pending:
+            # 建立索引期间已增量更新或已删除的条目跳过
+            if shortcut not in self.search_index and shortcut in shortcuts:
+                batch.append((shortcut, data))
+            if limit is not None and len(batch) >= limit:
+                self.search_index.updateMany(batch)
+                QTimer.singleShot(0, self.build_search_index)
+                return
+        self.search_index.updateMany(batch)
+        self.index_pending = None
+
+    def apply_table_changes(self, changes):
+        #只更新发生变化的行（添加、编辑、删除及配置文件热重载）"""
+        self.search_index.apply(changes)
+        self.table_model.apply_changes(changes)
+        if self.table_proxy.matches is not None:
+            # 修改可能改变哪些行匹配当前搜索
+            self.apply_search()
+
+    def apply_search(self, text=None):
+        #按搜索框内容过滤表格"""
+        query = self.searchInput.text() if text is None else text
+        if not query.strip():
+            if self.table_proxy.matches is not None:
+                self.table_proxy.set_matches(None)
+            return
+        if self.index_pending is not None:
+            # 索引尚未建完时立即补齐
+            self.build_search_index(limit=None)
+        self.table_proxy.set_matches(self.search_index.search(query))
     
     def remove_selected_shortcut(self):
-        #删除选中的快捷键"""
-        current_row = self.tableWidget.currentRow()
-        if current_row >= 0:
-            shortcut = self.tableWidget.item(current_row, 0).text()
-            reply = QMessageBox.question(
-                self, "确认删除",
-                f"确定要删除快捷键 '{shortcut}' 吗？",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.No
-            )
-            if reply == QMessageBox.Yes:
-                self.backend.removeShortcut(shortcut)
-                self.refresh_table()
+        #删除选中的快捷键（支持多选批量删除）"""
+        rows = sorted({index.row() for index in self.tableView.selectionModel().selectedRows()})
+        if not rows and self.tableView.currentIndex().isValid():
+            rows = [self.tableView.currentIndex().row()]
+        if not rows:
+            return
+        shortcuts = [self.table_proxy.shortcut_at(row) for row in rows]
+        if len(shortcuts) == 1:
+            question = f"确定要删除快捷键 '{shortcuts[0]}' 吗？"
+        else:
+            question = f"确定要删除选中的 {len(shortcuts)} 个快捷键吗？"
+        reply = QMessageBox.question(
+            self, "确认删除",
+            question,
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            try:
+                with self.backend.batch() as batch:
+                    for shortcut in shortcuts:
+                        batch.remove(shortcut)
+            except BatchError as e:
+                self.show_message("错误", f"删除快捷键失败: {e}", "警告")
     
     def edit_selected_shortcut(self):
         #编辑选中的快捷键"""
-        current_row = self.tableWidget.currentRow()
-        if current_row < 0:
+        current = self.tableView.currentIndex()
+        if not current.isValid():
             self.show_message("错误", "请选择一个快捷键进行编辑", "警告")
             return
-        shortcut = self.tableWidget.item(current_row, 0).text()
+        shortcut = self.table_proxy.shortcut_at(current.row())
         data = self.backend.shortcuts.get(shortcut)
         if not data:
             self.show_message("错误", "未找到快捷键数据", "警告")
             return
-        dialog = AddShortcutDialog(self)
+        dialog = AddShortcutDialog(self, self.backend, editing=shortcut)
         dialog.shortcutInput.setText(shortcut)
         dialog.commandInput.setText(data["command"])
         dialog.descriptionInput.setText(data.get("description", ""))
         dialog.statusLabel.setText("编辑现有快捷键")
+        dialog.show_conflicts()
         if dialog.exec_() == QDialog.Accepted:
             new_data = dialog.getData()
             if new_data["shortcut"] and new_data["command"]:
-                # 先删除旧的，再添加新的
-                self.backend.removeShortcut(shortcut)
-                self.backend.addShortcut(new_data["shortcut"], new_data["command"], new_data["description"])
-                self.refresh_table()
+                # 删除旧的、添加新的在同一批次中完成，只保存一次
+                # 保留配置文件中的其他选项（shell、maxInstances 等）
+                options = {k: v for k, v in data.items() if k not in ("command", "description")}
+                try:
+                    with self.backend.batch() as batch:
+                        batch.remove(shortcut)
+                        batch.add(new_data["shortcut"], new_data["command"], new_data["description"],
+                                  **options)
+                except BatchError as e:
+                    self.show_message("错误", f"编辑快捷键失败: {e}", "警告")
             else:
                 self.show_message("错误", "请填写完整的快捷键和命令", "警告")
     
+    def import_shortcuts_dialog(self):
+        #从 JSONL/CSV 文件批量导入快捷键"""
+        path, _ = QFileDialog.getOpenFileName(self, "导入快捷键", "",
+                                              "快捷键文件 (*.jsonl *.ndjson *.csv);;所有文件 (*)")
+        if not path:
+            return
+        # 导入在事件循环空闲时分批进行，每批约 250 条（十几毫秒），窗口在批次之间保持响应
+        self.importer = ShortcutImporter(self.backend, path, chunkSize=250)
+        self.import_shortcuts.setEnabled(False)
+        self.update_status(f"正在导入 {path}")
+        QTimer.singleShot(0, self.import_step)
+
+    def import_step(self):
+        #导入一批记录，状态栏显示进度，全部完成后显示导入报告"""
+        importer = self.importer
+        if importer is None:
+            return
+        try:
+            done = importer.step()
+        except Exception as e:
+            # 读取文件失败等无法继续的错误：结束导入，恢复导入按钮
+            self.finish_import()
+            self.show_message("错误", f"导入失败: {e}", "警告")
+            return
+        # 先汇总本批产生的状态消息，避免定时汇总覆盖进度
+        self.pump_events()
+        if not done:
+            report = importer.report
+            self.update_status(f"正在导入: 已读取 {importer.lineNo:,} 行，成功 {report.imported:,} 条，"
+                               f"失败 {report.failed:,} 条")
+            QTimer.singleShot(0, self.import_step)
+            return
+        report = importer.report
+        self.finish_import()
+        self.update_status(report.summary())
+        message = report.summary()
+        if report.errors:
+            details = "\n".join(f"第 {line} 行 {shortcut}: {error}"
+                                for line, shortcut, error in report.errors[:20])
+            if report.failed > 20:
+                details += f"\n……另有 {report.failed - 20} 条错误"
+            message = f"{message}\n\n{details}"
+        self.show_message("导入快捷键", message, "警告" if report.failed else "信息")
+
+    def finish_import(self):
+        #结束（或放弃）正在进行的导入"""
+        if self.importer is not None:
+            self.importer.close()
+            self.importer = None
+        self.import_shortcuts.setEnabled(True)
+
+    def export_shortcuts_dialog(self):
+        #把快捷键导出为 JSONL/CSV 文件"""
+        path, _ = QFileDialog.getSaveFileName(self, "导出快捷键", "shortcuts.jsonl",
+                                              "JSON Lines (*.jsonl);;CSV (*.csv)")
+        if not path:
+            return
+        try:
+            count = exportShortcuts(self.backend, path)
+        except OSError as e:
+            self.show_message("错误", f"导出失败: {e}", "警告")
+            return
+        self.update_status(f"已导出 {count} 个快捷键到 {path}")
+
     def toggle_startup(self, state):
         #切换开机自启动"""
         self.backend.setStartup(state == Qt.Checked)
@@ -782,7 +1106,4 @@ class ShortcutManagerFrontend(QMainWindow):
         #加载设置"""
         # 检查自启动状态
         if self.backend.checkStartup():
-            self.startup_checkbox.setChecked(True)
-        
-        # 启动快捷键监听
-        self.backend.startListener()
\ No newline at end of file
+            self.startup_checkbox.setChecked(True)
\ No newline at end of file
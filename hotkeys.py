@@ -0,0 +1,238 @@
+import time
+import itertools
+import threading
+
+from chords import modifierBit, parseSequence, dispatchKey
+
+
+# 未匹配的按键放行；多步快捷键前缀上的按键吞掉
+PASS = (None, True)
+CONSUME = (None, False)
+
+
+def defaultKeyResolver(key):
+    #通过 keyboard 库把键名解析为扫描码#
+    import keyboard
+    return keyboard.key_to_scan_codes(key)
+
+
+class ChordNode:
+    #前缀树节点：shortcut 为在此结束的快捷键，children 为后续组合键#
+    __slots__ = ('shortcut', 'children')
+
+    def __init__(self):
+        self.shortcut = None
+        self.children = {}
+
+
+class HotkeyRegistry:
+    #快捷键注册管理器#
+    # 整张快捷键表编译成以 (修饰键掩码, 扫描码) 为键的前缀树，
+    # 由单个底层键盘钩子服务，每次按键的开销与快捷键数量无关。
+    # 多步快捷键（如 "ctrl+k, ctrl+c"）在前缀树上逐步匹配，
+    # 超时通过比较时间戳判断，不为每次按键创建定时器。
+    # 按住按键时系统自动重复产生的按下事件不会再次匹配，
+    # 回调以 callback(快捷键, 是否为自动重复) 的形式调用。
+    # 锁屏、UAC 切换桌面或焦点进入提权窗口时可能收不到松开事件；
+    # 距上次按下超过 repeatGap 秒的"重复"按下视为新的按下，避免快捷键一直被当作自动重复。
+
+    # 大于系统自动重复的初始延迟（Windows 最长 1 秒）和重复间隔
+    repeatGap = 1.0
+
+    def __init__(self, callback, resolveKey=None, sequenceTimeout=1.0):
+        self.callback = callback
+        self.resolveKey = resolveKey or defaultKeyResolver
+        self.sequenceTimeout = sequenceTimeout
+        self.entries = {}
+        self.index = {}
+        self.pending = None
+        self.deadline = 0.0
+        self.heldModifiers = {}
+        self.heldKeys = {}
+        self.modifierMask = 0
+        self.hook = None
+        self.lock = threading.RLock()
+        self.hookCalls = 0
+        self.hookTime = 0
+        self.hookMaxTime = 0
+        # 当前按键事件进入钩子时的 perf_counter_ns，供回调记录触发延迟
+        self.eventStamp = 0
+
+    def install(self):
+        #安装唯一的底层键盘钩子#
+        # suppress=True 时回调返回 False 会吞掉该按键，用于多步快捷键
+        import keyboard
+        with self.lock:
+            if self.hook is None:
+                self.hook = keyboard.hook(self.onKeyEvent, suppress=True)
+
+    def uninstall(self):
+        #移除键盘钩子#
+        with self.lock:
+            if self.hook is None:
+                return
+            import keyboard
+            try:
+                keyboard.unhook(self.hook)
+            except (KeyError, ValueError):
+                pass
+            self.hook = None
+            self.heldModifiers.clear()
+            self.heldKeys.clear()
+            self.modifierMask = 0
+            self.pending = None
+
+    def compile(self, hotkey):
+        #把组合键（或组合键序列）编译为前缀树路径列表#
+        steps = []
+        for mask, key in parseSequence(hotkey):
+            steps.append([dispatchKey(mask, code) for code in self.resolveKey(key)])
+        return tuple(itertools.product(*steps))
+
+    def register(self, shortcut, hotkey):
+        #注册单个快捷键，已注册且组合键相同则直接返回#
+        paths = self.compile(hotkey)
+        with self.lock:
+            current = self.entries.get(shortcut)
+            if current is not None:
+                if current[0] == hotkey:
+                    return
+                self.unregister(shortcut)
+            for path in paths:
+                children = self.index
+                node = None
+                for key in path:
+                    node = children.get(key)
+                    if node is None:
+                        node = children[key] = ChordNode()
+                    children = node.children
+                node.shortcut = shortcut
+            self.entries[shortcut] = (hotkey, paths)
+
+    def unregister(self, shortcut):
+        #注销单个快捷键并剪除空节点#
+        with self.lock:
+            current = self.entries.pop(shortcut, None)
+            if current is None:
+                return False
+            for path in current[1]:
+                trail = []
+                children = self.index
+                for key in path:
+                    node = children.get(key)
+                    if node is None:
+                        break
+                    trail.append((children, key, node))
+                    children = node.children
+                else:
+                    if node.shortcut == shortcut:
+                        node.shortcut = None
+                    for parent, key, node in reversed(trail):
+                        if node.shortcut is not None or node.children:
+                            break
+                        del parent[key]
+            self.pending = None
+            return True
+
+    def sync(self, hotkeys):
+        #将当前注册表与目标 {快捷键: 组合键} 对齐，返回失败列表#
+        failures = []
+        with self.lock:
+            for shortcut in [s for s in self.entries if s not in hotkeys]:
+                self.unregister(shortcut)
+            for shortcut, hotkey in hotkeys.items():
+                try:
+                    self.register(shortcut, hotkey)
+                except ImportError:
+                    raise
+                except Exception as e:
+                    failures.append((shortcut, e))
+        return failures
+
+    def clear(self):
+        #注销全部快捷键#
+        with self.lock:
+            self.entries.clear()
+            self.index.clear()
+            self.pending = None
+
+    def isRegistered(self, shortcut):
+        return shortcut in self.entries
+
+    def onKeyEvent(self, event):
+        #底层键盘钩子回调，记录回调耗时#
+        self.eventStamp = start = time.perf_counter_ns()
+        result = self.dispatchEvent(event)
+        elapsed = time.perf_counter_ns() - start
+        self.hookCalls += 1
+        self.hookTime += elapsed
+        if elapsed > self.hookMaxTime:
+            self.hookMaxTime = elapsed
+        return result
+
+    def metrics(self):
+        #返回钩子回调耗时指标（微秒）#
+        calls = self.hookCalls
+        return {
+            "hookCalls": calls,
+            "hookAvgUs": self.hookTime / calls / 1e3 if calls else 0.0,
+            "hookMaxUs": self.hookMaxTime / 1e3,
+        }
+
+    def dispatchEvent(self, event):
+        #O(1) 查表分派，返回 False 表示吞掉该按键#
+        code = event.scan_code
+        bit = modifierBit(event.name)
+        if bit:
+            if event.event_type == 'down':
+                self.heldModifiers[code] = bit
+            else:
+                self.heldModifiers.pop(code, None)
+            mask = 0
+            for held in self.heldModifiers.values():
+                mask |= held
+            self.modifierMask = mask
+            return True
+        if event.event_type != 'down':
+            self.heldKeys.pop(code, None)
+            return True
+
+        now = time.monotonic()
+        held = self.heldKeys.get(code)
+        if held is not None and now - held[1] <= self.repeatGap:
+            # 自动重复：沿用首次按下时的处理结果
+            result = held[0]
+            self.heldKeys[code] = (result, now)
+            if result[0] is not None:
+                self.callback(result[0], True)
+            return result[1]
+        result = self.matchKey(code)
+        self.heldKeys[code] = (result, now)
+        return result[1]
+
+    def matchKey(self, code):
+        #在前缀树上匹配一次物理按下，返回 (触发的快捷键, 是否放行)#
+        key = dispatchKey(self.modifierMask, code)
+        node = None
+        inSequence = False
+        pending = self.pending
+        if pending is not None:
+            self.pending = None
+            if time.monotonic() <= self.deadline:
+                node = pending.children.get(key)
+                inSequence = node is not None
+        if node is None:
+            node = self.index.get(key)
+            if node is None:
+                return PASS
+
+        if node.children:
+            # 处于多步快捷键的前缀上，等待下一步；较长的序列优先
+            self.pending = node
+            self.deadline = time.monotonic() + self.sequenceTimeout
+            return CONSUME
+        shortcut = node.shortcut
+        if shortcut is None:
+            return PASS
+        self.callback(shortcut, False)
+        return (shortcut, not inSequence)
@@ -0,0 +1,261 @@
+import os
+import sys
+import json
+import queue
+import socket
+import hashlib
+import threading
+
+# 单实例：正在运行的实例在本地套接字（Linux 等为 Unix 域套接字，Windows 为命名管道）上监听，
+# 再次启动的进程连接后转发命令（--trigger/--reload/--show）并立即退出。
+# 每个请求和回复都是一行 JSON：{"command": 名称, "args": [...]} -> {"ok": 布尔, "message": 文本}。
+# 本模块只依赖标准库，转发命令的进程不会导入 Qt 和后端。
+
+APP_NAME = "ShortcutManager"
+# 等待运行中的实例处理命令的最长时间（秒）
+REPLY_TIMEOUT = 5.0
+MAX_REQUEST = 64 * 1024
+
+
+def instanceAddress(configFile):
+    #每个用户、每个配置文件一个实例；返回套接字路径或命名管道名#
+    key = hashlib.sha1(os.path.abspath(configFile).encode('utf-8')).hexdigest()[:12]
+    if sys.platform == 'win32':
+        user = os.environ.get("USERNAME", "")
+        return rf"\\.\pipe\{APP_NAME}-{user}-{key}"
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(base, f"{APP_NAME.lower()}-{os.getuid()}-{key}.sock")
+
+
+def encode(message):
+    return json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n"
+
+
+def decode(data):
+    return json.loads(data.decode('utf-8'))
+
+
+def readLine(sock):
+    #读取一行（不含换行符），对方关闭连接时返回已读到的内容#
+    chunks = []
+    size = 0
+    while size <= MAX_REQUEST:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks).strip()
+
+
+def connect(address, timeout):
+    #连接运行中的实例，没有实例（或只剩崩溃后遗留的套接字文件）时返回 None#
+    if sys.platform == 'win32':
+        from multiprocessing.connection import Client
+        try:
+            return PipeConnection(Client(address, family='AF_PIPE'))
+        except (FileNotFoundError, OSError):
+            return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    except OSError:
+        sock.close()
+        raise
+    return SocketConnection(sock)
+
+
+def sendCommand(address, command, *args, timeout=REPLY_TIMEOUT):
+    #把命令转发给运行中的实例，返回回复 {"ok", "message"}；没有运行中的实例时返回 None#
+    connection = connect(address, timeout)
+    if connection is None:
+        return None
+    try:
+        connection.send({"command": command, "args": list(args)})
+        return connection.receive()
+    finally:
+        connection.close()
+
+
+class SocketConnection:
+    def __init__(self, sock):
+        self.sock = sock
+
+    def send(self, message):
+        self.sock.sendall(encode(message))
+
+    def receive(self):
+        data = readLine(self.sock)
+        if not data:
+            raise ConnectionError("实例没有回复")
+        return decode(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class PipeConnection:
+    #Windows 命名管道连接（multiprocessing.connection），只收发字节，不使用 pickle#
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def send(self, message):
+        self.connection.send_bytes(encode(message))
+
+    def receive(self):
+        try:
+            return decode(self.connection.recv_bytes(MAX_REQUEST))
+        except EOFError:
+            raise ConnectionError("实例没有回复")
+
+    def close(self):
+        self.connection.close()
+
+
+class InstanceServer:
+    #在运行中的实例里接收其他进程转发的命令#
+    # listen() 在启动最开始占用地址，后端创建完成后再 start()；在此之间到达的连接在队列中等待。
+    # 命令在监听线程中读取，经 notifier 投递到后端所属线程执行，执行结果再写回给请求方。
+
+    def __init__(self, address):
+        self.address = address
+        self.commands = {}
+        self.notifier = None
+        self.listener = None
+        self.inode = None
+        self.thread = None
+        self.stopping = False
+
+    def listen(self):
+        #占用实例地址，已有实例在运行时返回 False#
+        if sys.platform == 'win32':
+            from multiprocessing.connection import Listener
+            try:
+                # 命名管道以"第一个实例"方式创建，名称已被占用时失败；进程退出后管道自动消失
+                self.listener = Listener(self.address, family='AF_PIPE')
+            except PermissionError:
+                return False
+        else:
+            listener = self.bindSocket()
+            if listener is None:
+                return False
+            self.listener = listener
+        return True
+
+    def start(self, commands, notifier):
+        #开始处理命令；commands: {命令名: 函数(*参数)}，函数返回回复文本，抛出异常时回复失败#
+        self.commands = commands
+        self.notifier = notifier
+        self.thread = threading.Thread(target=self.serve, name="instance-server", daemon=True)
+        self.thread.start()
+
+    def bindSocket(self):
+        #绑定 Unix 域套接字；套接字文件已存在但无人监听时视为上次崩溃遗留，删除后重新绑定#
+        # 整个过程持有套接字旁锁文件的排他锁：两个同时启动的实例不会把对方刚绑定、
+        # 尚未开始监听的套接字误当作遗留文件删除，进而各自监听一个套接字
+        import fcntl
+        lockFd = os.open(self.address + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(lockFd, fcntl.LOCK_EX)
+            return self.bindLocked()
+        finally:
+            # 关闭描述符即释放锁
+            os.close(lockFd)
+
+    def bindLocked(self):
+        for _ in range(2):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.bind(self.address)
+            except OSError:
+                sock.close()
+                probe = connect(self.address, 1.0)
+                if probe is not None:
+                    probe.close()
+                    return None
+                try:
+                    os.unlink(self.address)
+                except FileNotFoundError:
+                    pass
+                continue
+            # 绑定后立即监听，不给探测留下拒绝连接的间隙
+            sock.listen(8)
+            os.chmod(self.address, 0o600)
+            self.inode = os.stat(self.address).st_ino
+            return sock
+        return None
+
+    def accept(self):
+        if sys.platform == 'win32':
+            return PipeConnection(self.listener.accept())
+        sock, _ = self.listener.accept()
+        sock.settimeout(REPLY_TIMEOUT)
+        return SocketConnection(sock)
+
+    def serve(self):
+        #监听线程：逐个处理连接，每个连接一条命令#
+        while not self.stopping:
+            try:
+                connection = self.accept()
+            except OSError:
+                if self.stopping:
+                    return
+                continue
+            try:
+                if not self.stopping:
+                    connection.send(self.handle(connection.receive()))
+            except (OSError, ValueError, EOFError):
+                pass
+            finally:
+                connection.close()
+
+    def handle(self, request):
+        #把命令投递到所属线程执行并等待结果#
+        command = request.get("command") if isinstance(request, dict) else None
+        function = self.commands.get(command)
+        if function is None:
+            return {"ok": False, "message": f"未知命令: {command}"}
+        args = request.get("args") or []
+        result = queue.SimpleQueue()
+
+        def run():
+            try:
+                result.put({"ok": True, "message": function(*args) or ""})
+            except Exception as e:
+                result.put({"ok": False, "message": str(e)})
+
+        self.notifier.post(run)
+        try:
+            return result.get(timeout=REPLY_TIMEOUT)
+        except queue.Empty:
+            return {"ok": False, "message": "实例繁忙，命令未在时限内完成"}
+
+    def close(self):
+        #停止监听；Unix 域套接字文件只在仍属于本实例时删除#
+        if self.listener is None:
+            return
+        self.stopping = True
+        # 连接一次自身，唤醒阻塞在 accept 中的监听线程
+        try:
+            probe = connect(self.address, 1.0)
+            if probe is not None:
+                probe.close()
+        except OSError:
+            pass
+        if self.thread is not None:
+            self.thread.join(1.0)
+        self.listener.close()
+        self.listener = None
+        if sys.platform != 'win32':
+            try:
+                if os.stat(self.address).st_ino == self.inode:
+                    os.unlink(self.address)
+            except FileNotFoundError:
+                pass
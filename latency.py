@@ -0,0 +1,178 @@
+import math
+import time
+import threading
+from array import array
+
+# 对数线性分桶（HDR 直方图的做法）：小于 SUB_BUCKETS 纳秒的值每纳秒一个桶，
+# 更大的值在每个 2 的幂区间内分成 SUB_BUCKETS/2 个等宽桶，相对误差不超过 2/SUB_BUCKETS（约 3%）。
+# 超过 MAX_VALUE（约 68 秒）的值记入最后一个桶。
+SUB_BITS = 6
+SUB_BUCKETS = 1 << SUB_BITS
+HALF_BUCKETS = SUB_BUCKETS >> 1
+MAX_BITS = 36
+MAX_VALUE = (1 << MAX_BITS) - 1
+BUCKETS = (MAX_BITS - SUB_BITS) * HALF_BUCKETS + SUB_BUCKETS
+
+# 一次触发的各个阶段（纳秒）：
+#   hook   键盘钩子回调开始 -> 交给分派器
+#   queue  交给分派器 -> 工作线程开始执行
+#   spawn  工作线程开始执行 -> 启动进程的调用返回
+#   total  键盘钩子回调开始 -> 启动进程的调用返回
+STAGES = ("hook", "queue", "spawn", "total")
+STAGE_NAMES = {"hook": "钩子→入队", "queue": "排队", "spawn": "启动进程", "total": "总计"}
+
+
+def bucketIndex(value):
+    if value < SUB_BUCKETS:
+        return value if value > 0 else 0
+    if value > MAX_VALUE:
+        value = MAX_VALUE
+    shift = value.bit_length() - SUB_BITS
+    return shift * HALF_BUCKETS + (value >> shift)
+
+
+def bucketRange(index):
+    #桶覆盖的取值范围 [low, high)#
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = index // HALF_BUCKETS - 1
+    low = (index - shift * HALF_BUCKETS) << shift
+    return low, low + (1 << shift)
+
+
+class LatencyHistogram:
+    #固定桶数的延迟直方图（纳秒），记录一次只做一次下标计算和计数加一#
+    __slots__ = ('counts', 'total', 'maxValue')
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * BUCKETS))
+        self.total = 0
+        self.maxValue = 0
+
+    def record(self, value):
+        self.counts[bucketIndex(value)] += 1
+        self.total += 1
+        if value > self.maxValue:
+            self.maxValue = value
+
+    def copy(self):
+        other = LatencyHistogram()
+        other.counts = array('Q', self.counts)
+        other.total = self.total
+        other.maxValue = self.maxValue
+        return other
+
+    def merge(self, other):
+        #把另一个直方图的计数累加进来#
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total += other.total
+        if other.maxValue > self.maxValue:
+            self.maxValue = other.maxValue
+
+    def summary(self):
+        #{"count", "p50Us", "p99Us", "maxUs"}#
+        return {
+            "count": self.total,
+            "p50Us": self.percentile(50) / 1e3,
+            "p99Us": self.percentile(99) / 1e3,
+            "maxUs": self.maxValue / 1e3,
+        }
+
+    def percentile(self, q):
+        #第 q 百分位的近似值（桶中点，不超过最大值）#
+        if not self.total:
+            return 0
+        target = max(1, math.ceil(self.total * q / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= target:
+                    low, high = bucketRange(index)
+                    return min((low + high - 1) // 2, self.maxValue)
+        return self.maxValue
+
+
+class LatencyRecorder:
+    #按快捷键记录触发各阶段的延迟#
+    # enabled 为 False 时调用方不取时间戳、不构造记录，热路径上只多一次属性判断。
+    # 直方图在快捷键第一次被记录时创建，每个阶段固定占用 BUCKETS 个计数。
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}   # 快捷键 -> 与 STAGES 对应的直方图元组
+        self.lock = threading.Lock()
+
+    def record(self, shortcut, trace, spawnStamp):
+        #trace 为 (钩子时间戳, 入队时间戳, 开始执行时间戳)，均为 perf_counter_ns#
+        hookStamp, submitStamp, startStamp = trace
+        with self.lock:
+            histograms = self.histograms.get(shortcut)
+            if histograms is None:
+                histograms = self.histograms[shortcut] = tuple(LatencyHistogram() for _ in STAGES)
+            histograms[0].record(submitStamp - hookStamp)
+            histograms[1].record(startStamp - submitStamp)
+            histograms[2].record(spawnStamp - startStamp)
+            histograms[3].record(spawnStamp - hookStamp)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def summary(self):
+        #返回 {快捷键: {阶段: {"count", "p50Us", "p99Us", "maxUs"}}}#
+        with self.lock:
+            copies = {shortcut: [histogram.copy() for histogram in histograms]
+                      for shortcut, histograms in self.histograms.items()}
+        return {shortcut: {stage: histogram.summary() for stage, histogram in zip(STAGES, histograms)}
+                for shortcut, histograms in copies.items()}
+
+    def overall(self):
+        #合并全部快捷键，返回 {阶段: {"count", "p50Us", "p99Us", "maxUs"}}#
+        merged = [LatencyHistogram() for _ in STAGES]
+        with self.lock:
+            for histograms in self.histograms.values():
+                for target, histogram in zip(merged, histograms):
+                    target.merge(histogram)
+        return {stage: histogram.summary() for stage, histogram in zip(STAGES, merged)}
+
+
+class StartupTimer:
+    #启动阶段计时：mark() 记录各阶段完成的时刻，summary() 给出逐段耗时#
+    NAMES = {
+        "qt": "Qt 初始化", "icon": "图标", "font": "字体", "config": "加载配置",
+        "listener": "启动监听", "armed": "快捷键就绪", "tray": "托盘", "window": "主窗口",
+    }
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}
+
+    def mark(self, stage, stamp=None):
+        #记录阶段完成时刻，同一阶段只记录第一次#
+        if stage not in self.marks:
+            self.marks[stage] = time.perf_counter() if stamp is None else stamp
+
+    def elapsedMs(self, stage):
+        stamp = self.marks.get(stage)
+        return None if stamp is None else (stamp - self.start) * 1e3
+
+    def breakdown(self):
+        #按时间顺序返回 [(阶段, 本段毫秒, 累计毫秒)]#
+        result = []
+        previous = self.start
+        for stage, stamp in sorted(self.marks.items(), key=lambda item: item[1]):
+            result.append((stage, (stamp - previous) * 1e3, (stamp - self.start) * 1e3))
+            previous = stamp
+        return result
+
+    def summary(self):
+        parts = [f"{self.NAMES.get(stage, stage)} {delta:.0f} ms" for stage, delta, _ in self.breakdown()]
+        text = "启动耗时: " + "，".join(parts)
+        armed = self.elapsedMs("armed")
+        if armed is not None:
+            text += f"（{armed:.0f} ms 后快捷键可用）"
+        return text
@@ -0,0 +1,123 @@
+import os
+import shlex
+import shutil
+import threading
+import subprocess
+
+# 出现这些字符说明命令依赖 shell 语法（管道、重定向、变量展开等）
+if os.name == 'nt':
+    SHELL_CHARACTERS = set('|&<>%^\n')
+else:
+    SHELL_CHARACTERS = set('|&;<>()$`*?~\n')
+
+
+class LaunchSpec:
+    #预编译的启动参数：argv 与解析后的可执行文件绝对路径#
+    __slots__ = ('command', 'argv', 'executable', 'shell', 'path', 'mtime')
+
+    def __init__(self, command, argv, executable, shell, path, mtime):
+        self.command = command
+        self.argv = argv
+        self.executable = executable
+        self.shell = shell
+        self.path = path
+        self.mtime = mtime
+
+
+class CommandLauncher:
+    #命令启动器#
+    # 命令在加载或添加时解析一次，缓存 argv 和可执行文件路径，
+    # PATH 或可执行文件修改时间变化时缓存失效。
+    # 触发时直接 exec，不再经过 shell 和 PATH 搜索；
+    # 配置中标记 "shell": true 的命令仍通过 shell 执行。
+
+    def __init__(self):
+        self.cache = {}
+        # 不含目录的程序名 -> 搜索结果，按 PATH 区分；批量导入时大量命令共用少数程序
+        self.programs = {}
+        self.lock = threading.Lock()
+
+    def parse(self, command):
+        #把命令行拆分为 argv，无法安全拆分时返回 None#
+        if any(c in SHELL_CHARACTERS for c in command):
+            return None
+        try:
+            if os.name == 'nt':
+                argv = [arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] == '"' else arg
+                        for arg in shlex.split(command, posix=False)]
+            else:
+                argv = shlex.split(command)
+        except ValueError:
+            return None
+        return argv or None
+
+    def resolve(self, program):
+        #解析可执行文件的绝对路径#
+        if os.path.dirname(program):
+            path = os.path.abspath(program)
+            path = path if os.path.isfile(path) else None
+        else:
+            key = (program, os.environ.get('PATH', ''))
+            try:
+                path = self.programs[key]
+            except KeyError:
+                path = self.programs[key] = shutil.which(program)
+        if path and os.name == 'nt':
+            # 文档、快捷方式等需要由 shell 按文件关联打开
+            extensions = os.environ.get('PATHEXT', '.COM;.EXE;.BAT;.CMD').lower().split(';')
+            if os.path.splitext(path)[1].lower() not in extensions:
+                return None
+        return path
+
+    def prepare(self, command, shell=False):
+        #解析命令并放入缓存，返回 LaunchSpec#
+        path = os.environ.get('PATH', '')
+        argv = None if shell else self.parse(command)
+        executable = self.resolve(argv[0]) if argv else None
+        mtime = None
+        if executable is not None:
+            try:
+                mtime = os.stat(executable).st_mtime_ns
+            except OSError:
+                executable = None
+        spec = LaunchSpec(command, argv, executable, executable is None, path, mtime)
+        with self.lock:
+            self.cache[(command, shell)] = spec
+        return spec
+
+    def lookup(self, command, shell=False):
+        #取出缓存的启动参数，PATH 或文件修改时间变化时重新解析#
+        spec = self.cache.get((command, shell))
+        if spec is None:
+            return self.prepare(command, shell)
+        if spec.shell:
+            if not shell and spec.path != os.environ.get('PATH', ''):
+                return self.prepare(command, shell)
+            return spec
+        try:
+            stale = (spec.path != os.environ.get('PATH', '')
+                     or os.stat(spec.executable).st_mtime_ns != spec.mtime)
+        except OSError:
+            stale = True
+        if stale:
+            # 可执行文件被替换或删除时重新搜索 PATH
+            self.programs.pop((spec.argv[0], spec.path), None)
+            return self.prepare(command, shell)
+        return spec
+
+    def launch(self, command, shell=False):
+        #启动命令，返回 Popen 对象#
+        spec = self.lookup(command, shell)
+        if spec.shell:
+            return subprocess.Popen(command, shell=True,
+                                    stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL)
+        return subprocess.Popen(spec.argv, executable=spec.executable,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+
+    def forget(self, command):
+        #删除命令的缓存#
+        with self.lock:
+            self.cache.pop((command, False), None)
+            self.cache.pop((command, True), None)
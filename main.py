@@ -1,8 +1,11 @@
+import time
+# 启动计时从导入主模块开始
+START = time.perf_counter()
+
 import sys
 import os
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QFontDatabase, QFont, QIcon
-from frontend import ShortcutManagerFrontend  # 添加这行导入语句
+import argparse
+# PyQt5 只在启动界面时导入，--headless 与命令行导入导出不依赖 Qt
 
 def resource_path(relative_path):
     """获取资源的绝对路径，适用于开发环境和打包后环境"""
@@ -14,6 +17,7 @@ def resource_path(relative_path):
 
 def load_custom_font(app):
     """加载自定义字体"""
+    from PyQt5.QtGui import QFontDatabase, QFont
     try:
         # 方法1：从文件加载字体
         font_path = "MiSans-Light.ttf"  # 替换为您的字体文件路径
@@ -40,7 +44,8 @@ def load_custom_font(app):
         return False
 
 def set_app_icon(app):
-    """设置应用程序图标"""
+    """设置应用程序图标，返回加载的 QIcon 供托盘和窗口共用"""
+    from PyQt5.QtGui import QIcon
     try:
         icon_path = resource_path("icon.ico")
         if os.path.exists(icon_path):
@@ -48,41 +53,195 @@ def set_app_icon(app):
             app_icon = QIcon(icon_path)
             app.setWindowIcon(app_icon)
             print(f"已设置应用程序图标: {icon_path}")
-            return True
+            return app_icon
         else:
             print(f"图标文件不存在: {icon_path}")
-            return False
+            return None
     except Exception as e:
         print(f"设置应用程序图标失败: {e}")
-        return False
+        return None
 
-def main():
-    # 确保程序只运行一个实例
+def run_transfer(args):
+    """命令行导入导出，不启动界面和键盘监听"""
+    from backend import ShortcutBackend
+    from transfer import importShortcuts, exportShortcuts
+
+    backend = ShortcutBackend(args.config, watchConfig=False)
     try:
-        from win32event import CreateMutex
-        from win32api import GetLastError
-        from winerror import ERROR_ALREADY_EXISTS
-        
-        mutex = CreateMutex(None, False, "ShortcutManagerMutex")
-        if GetLastError() == ERROR_ALREADY_EXISTS:
-            sys.exit(0)
-    except ImportError:
-        pass  # 如果pywin32不可用，跳过单实例检查
+        if args.import_file:
+            report = importShortcuts(
+                backend, args.import_file, args.format,
+                onError=lambda line, shortcut, message: print(f"第 {line} 行 {shortcut}: {message}",
+                                                              file=sys.stderr))
+            print(report.summary())
+            return 1 if report.failed else 0
+        count = exportShortcuts(backend, args.export_file, args.format)
+        print(f"已导出 {count} 个快捷键到 {args.export_file}")
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"导入导出失败: {e}", file=sys.stderr)
+        return 2
+    finally:
+        backend.shutdown()
+
+def instance_commands(backend, show_window=None):
+    """其他进程转发的 --trigger/--reload/--show，在后端所属线程中执行"""
+    def trigger(shortcut):
+        if not backend.triggerShortcut(shortcut):
+            raise ValueError(f"未找到快捷键或触发队列已满: {shortcut}")
+        return f"已触发快捷键: {shortcut}"
+
+    def reload():
+        if not backend.reloadConfig():
+            raise ValueError("配置文件无效，保留当前配置")
+        return f"已重新加载配置，共 {len(backend.shortcuts)} 个快捷键"
+
+    def show():
+        if show_window is None:
+            raise RuntimeError("实例以无界面模式运行，没有主窗口")
+        show_window()
+        return "已显示主窗口"
+
+    return {"trigger": trigger, "reload": reload, "show": show}
+
+def forward_command(args, address):
+    """把命令转发给运行中的实例并输出回复，没有运行中的实例时返回 None"""
+    from instance import sendCommand
+    if args.trigger:
+        command = ("trigger", args.trigger)
+    elif args.reload:
+        command = ("reload",)
+    else:
+        command = ("show",)
+    try:
+        reply = sendCommand(address, *command)
+    except (OSError, ValueError) as e:
+        print(f"转发命令失败: {e}", file=sys.stderr)
+        return 2
+    if reply is None:
+        return None
+    print(reply.get("message", ""), file=sys.stdout if reply.get("ok") else sys.stderr)
+    return 0 if reply.get("ok") else 1
+
+def run_headless(args, server):
+    """无界面运行快捷键引擎，收到 SIGINT/SIGTERM 后退出"""
+    import signal
+    from backend import ShortcutBackend
+    from events import INFO, WARNING
+    from notifier import LoopNotifier
+    from latency import StartupTimer
+
+    startup = StartupTimer(START)
+    notifier = LoopNotifier()
+    backend = ShortcutBackend(args.config, traceLatency=args.trace_latency, notifier=notifier,
+                              rpcSocket=args.rpc)
+    startup.mark("config")
+
+    def log(event):
+        if event.level >= INFO:
+            print(f"[{event.levelName}] {event.message}",
+                  file=sys.stderr if event.level >= WARNING else sys.stdout, flush=True)
+
+    # 先输出创建后端时已产生的事件，之后的事件在发布时输出
+    for index in range(len(backend.events)):
+        log(backend.events.get(index))
+    backend.events.subscribe(log)
+    server.start(instance_commands(backend), notifier)
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: notifier.stop())
+    backend.startListener()
+    startup.mark("listener")
+    if backend.armed.wait(5):
+        startup.mark("armed", backend.armedAt)
+    print(startup.summary(), flush=True)
+    try:
+        notifier.run(onError=lambda e: print(f"处理失败: {e}", file=sys.stderr, flush=True))
+    finally:
+        server.close()
+        backend.shutdown()
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="快捷键管理器")
+    # 以 .db/.sqlite 结尾时使用 SQLite 存储，适合数量很大的快捷键表
+    parser.add_argument("--config", default="shortcuts.json", help="配置文件路径")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="从 JSONL/CSV 文件批量导入快捷键后退出")
+    parser.add_argument("--export", dest="export_file", metavar="FILE",
+                        help="把快捷键导出为 JSONL/CSV 文件后退出")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="导入导出格式，默认按扩展名判断")
+    parser.add_argument("--headless", action="store_true",
+                        help="不启动界面，只在后台运行快捷键引擎（不需要 PyQt5）")
+    parser.add_argument("--minimized", action="store_true",
+                        help="启动后只显示托盘图标，主窗口在第一次打开时才创建（用于开机自启动）")
+    parser.add_argument("--trace-latency", action="store_true",
+                        help="启动时即记录触发延迟（也可在诊断窗口中开启）")
+    parser.add_argument("--rpc", metavar="SOCKET",
+                        help="在该 Unix 域套接字上提供 JSON-RPC 控制接口（见 rpc.py）")
+    # 以下三个选项转发给使用同一配置文件、正在运行的实例后立即退出
+    parser.add_argument("--trigger", metavar="SHORTCUT", help="让运行中的实例触发指定快捷键")
+    parser.add_argument("--reload", action="store_true", help="让运行中的实例重新加载配置文件")
+    parser.add_argument("--show", action="store_true",
+                        help="显示运行中实例的主窗口；没有运行中的实例时正常启动")
+    args, qt_args = parser.parse_known_args()
+
+    if args.import_file or args.export_file:
+        sys.exit(run_transfer(args))
+
+    from instance import InstanceServer, instanceAddress
+    address = instanceAddress(args.config)
+    if args.trigger or args.reload or args.show:
+        code = forward_command(args, address)
+        if code is not None:
+            sys.exit(code)
+        if not args.show:
+            print("没有正在运行的快捷键管理器实例", file=sys.stderr)
+            sys.exit(1)
+
+    # 确保每个配置文件只运行一个实例；再次启动时让已运行的实例显示主窗口
+    server = InstanceServer(address)
+    if not server.listen():
+        if args.headless:
+            print("快捷键管理器已在运行", file=sys.stderr)
+            sys.exit(1)
+        args.show = True
+        sys.exit(forward_command(args, address) or 0)
+    if args.headless:
+        sys.exit(run_headless(args, server))
+
+    from PyQt5.QtWidgets import QApplication
+    from latency import StartupTimer
 
-    app = QApplication(sys.argv)
+    # 分阶段启动：先加载配置并开始监听，再创建托盘，主窗口最后创建或推迟到第一次打开
+    startup = StartupTimer(START)
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setQuitOnLastWindowClosed(False)
+    startup.mark("qt")
     
-    # 设置应用程序图标（这会影响任务栏图标）
-    set_app_icon(app)
+    # 设置应用程序图标（这会影响任务栏图标），托盘和窗口共用同一个 QIcon
+    icon = set_app_icon(app)
+    startup.mark("icon")
     
     # 加载自定义字体
     load_custom_font(app)
+    startup.mark("font")
     
-    # 创建前端界面
-    window = ShortcutManagerFrontend()
-    window.show()
+    from tray import TrayController
+    controller = TrayController(args.config, trace_latency=args.trace_latency,
+                                icon=icon, startup=startup, rpc_socket=args.rpc)
+    # 没有托盘时无法从托盘打开窗口，仍然直接显示
+    if not args.minimized or not controller.has_tray():
+        controller.show_window()
+    server.start(instance_commands(controller.backend, controller.show_window),
+                 controller.backend.notifier)
+    # 注销会话或其他途径调用 QApplication.quit 时也停止监听并写入合并窗口内尚未保存的修改
+    # （shutdown 可重复调用，托盘"退出"已调用过时无副作用）
+    app.aboutToQuit.connect(controller.backend.shutdown)
     
-    sys.exit(app.exec_())
+    code = app.exec_()
+    server.close()
+    sys.exit(code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import queue
+import threading
+
+
+class Signal:
+    #不依赖 Qt 的信号：emit 在调用线程中依次同步调用已连接的函数#
+    # 连接列表整体替换，emit 期间连接或断开不影响本次调用。
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots = self.slots + [slot]
+
+    def disconnect(self, slot):
+        self.slots = [s for s in self.slots if s != slot]
+
+    def emit(self, *args):
+        for slot in self.slots:
+            slot(*args)
+
+
+class DirectNotifier:
+    #在调用线程中立即执行投递的函数，用于命令行导入导出等没有主循环的场景#
+
+    def post(self, function, *args):
+        function(*args)
+
+
+class LoopNotifier:
+    #把其他线程投递的函数排队，由主线程在 run() 中依次执行#
+    # 无界面运行时后端的全部修改都在主线程完成，与 Qt 界面下由事件循环执行的语义相同。
+
+    def __init__(self):
+        self.calls = queue.SimpleQueue()
+        self.stopped = threading.Event()
+
+    def post(self, function, *args):
+        #可在任意线程调用#
+        self.calls.put((function, args))
+
+    def run(self, onError=None):
+        #在主线程中执行投递的函数，直到 stop() 被调用#
+        while not self.stopped.is_set():
+            function, args = self.calls.get()
+            if function is None:
+                continue
+            try:
+                function(*args)
+            except Exception as e:
+                if onError is None:
+                    raise
+                onError(e)
+
+    def stop(self):
+        #可在任意线程或信号处理函数中调用#
+        self.stopped.set()
+        self.calls.put((None, ()))
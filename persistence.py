@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import deque
+
+
+def fileDigest(data):
+    #配置文件内容的哈希，用于区分自身写入与外部修改#
+    return hashlib.sha1(data).hexdigest()
+
+
+def atomicWrite(path, data):
+    #写入临时文件、fsync 后原子替换目标文件#
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmpPath = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        # mkstemp 创建的文件权限为 0600，沿用原文件权限
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmpPath, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmpPath, path)
+    except BaseException:
+        try:
+            os.unlink(tmpPath)
+        except OSError:
+            pass
+        raise
+    if os.name != 'nt':
+        # 确保重命名本身落盘
+        dirFd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dirFd)
+        finally:
+            os.close(dirFd)
+
+
+class ConfigWriter:
+    #延迟合并写入的配置持久化#
+    # schedule() 只做标记并立即返回；后台线程在 delay 秒的窗口内
+    # 合并所有修改，只序列化并写入一次。写入采用临时文件 + fsync + 原子重命名，
+    # 中途崩溃不会损坏原有配置。
+
+    def __init__(self, path, snapshot, delay=0.2, onSaved=None, onError=None):
+        self.path = path
+        self.snapshot = snapshot
+        self.delay = delay
+        self.onSaved = onSaved
+        self.onError = onError
+        self.condition = threading.Condition()
+        self.dirty = False
+        self.dirtySince = 0.0
+        self.writing = False
+        self.closed = False
+        self.thread = None
+        self.saves = 0
+        self.errors = 0
+        self.bytesWritten = 0
+        self.lastBytes = 0
+        self.lastLatency = 0.0
+        self.maxLatency = 0.0
+        self.lastDigest = None
+        # 最近几次写入的哈希：监视器读到的可能是已被后一次写入取代的较早版本
+        self.recentDigests = deque(maxlen=16)
+
+    def schedule(self):
+        #标记配置已修改，由后台线程稍后写入#
+        with self.condition:
+            if not self.dirty:
+                self.dirty = True
+                self.dirtySince = time.monotonic()
+            if self.closed:
+                # 已关闭时直接同步写入
+                if not self.writing:
+                    self.writeLocked()
+                return
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="config-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def run(self):
+        with self.condition:
+            while not self.closed:
+                if not self.dirty or self.writing:
+                    self.condition.wait()
+                    continue
+                remaining = self.dirtySince + self.delay - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+                self.writeLocked()
+
+    def writeLocked(self):
+        #持有锁时调用：取快照后释放锁写盘#
+        self.dirty = False
+        self.writing = True
+        self.condition.release()
+        try:
+            self.write()
+        finally:
+            self.condition.acquire()
+            self.writing = False
+            self.condition.notify_all()
+
+    def write(self):
+        start = time.perf_counter()
+        try:
+            data = json.dumps(self.snapshot(), ensure_ascii=False, indent=2).encode('utf-8')
+            # 先记录哈希再替换文件，文件监视器据此忽略自身写入
+            self.lastDigest = fileDigest(data)
+            self.recentDigests.append(self.lastDigest)
+            atomicWrite(self.path, data)
+        except Exception as e:
+            self.errors += 1
+            if self.onError:
+                self.onError(e)
+            return
+        latency = time.perf_counter() - start
+        self.saves += 1
+        self.lastBytes = len(data)
+        self.bytesWritten += len(data)
+        self.lastLatency = latency
+        self.maxLatency = max(self.maxLatency, latency)
+        if self.onSaved:
+            self.onSaved(latency, len(data))
+
+    def isOwnWrite(self, digest):
+        #内容哈希是否来自本进程最近的写入#
+        return digest in self.recentDigests
+
+    def flush(self):
+        #立即写入尚未保存的修改，并等待正在进行的写入完成#
+        with self.condition:
+            while self.writing:
+                self.condition.wait()
+            if self.dirty:
+                self.writeLocked()
+
+    def close(self):
+        #写入剩余修改并停止后台线程#
+        self.flush()
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+            thread, self.thread = self.thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def metrics(self):
+        return {
+            "saves": self.saves,
+            "saveErrors": self.errors,
+            "saveLatencyMs": self.lastLatency * 1000,
+            "saveMaxLatencyMs": self.maxLatency * 1000,
+            "lastSaveBytes": self.lastBytes,
+            "bytesWritten": self.bytesWritten,
+        }
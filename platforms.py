@@ -0,0 +1,74 @@
+import os
+import sys
+import shlex
+
+APP_NAME = "ShortcutManager"
+
+
+class WindowsPlatform:
+    #Windows：注册表 Run 键实现开机自启动#
+    RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
+
+    def setStartup(self, enable, command):
+        #启用或禁用开机自启动，返回 False 表示本来就没有设置#
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.RUN_KEY, 0, winreg.KEY_SET_VALUE) as key:
+            if enable:
+                winreg.SetValueEx(key, APP_NAME, 0, winreg.REG_SZ, command)
+                return True
+            try:
+                winreg.DeleteValue(key, APP_NAME)
+                return True
+            except FileNotFoundError:
+                return False
+
+    def isStartupEnabled(self):
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.RUN_KEY, 0, winreg.KEY_READ) as key:
+            try:
+                winreg.QueryValueEx(key, APP_NAME)
+                return True
+            except FileNotFoundError:
+                return False
+
+
+class PosixPlatform:
+    #Linux 等：XDG autostart 目录中的 .desktop 文件实现开机自启动#
+
+    def autostartFile(self):
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+        return os.path.join(base, "autostart", f"{APP_NAME}.desktop")
+
+    def setStartup(self, enable, command):
+        path = self.autostartFile()
+        if not enable:
+            try:
+                os.remove(path)
+                return True
+            except FileNotFoundError:
+                return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("[Desktop Entry]\n"
+                    "Type=Application\n"
+                    f"Name={APP_NAME}\n"
+                    f"Exec={command}\n"
+                    "X-GNOME-Autostart-enabled=true\n")
+        return True
+
+    def isStartupEnabled(self):
+        return os.path.exists(self.autostartFile())
+
+
+def startupCommand():
+    #开机自启动时执行的命令：打包后的可执行文件，或用当前解释器运行入口脚本；只启动到托盘#
+    target = os.path.abspath(sys.argv[0])
+    if sys.platform == 'win32':
+        return f'"{target}" --minimized'
+    if getattr(sys, 'frozen', False):
+        return f"{shlex.quote(target)} --minimized"
+    return f"{shlex.quote(sys.executable)} {shlex.quote(target)} --minimized"
+
+
+def currentPlatform():
+    return WindowsPlatform() if sys.platform == 'win32' else PosixPlatform()
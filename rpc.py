@@ -0,0 +1,458 @@
+import os
+import json
+import shutil
+import asyncio
+import tempfile
+import inspect
+import itertools
+
+from backend import BatchError
+from events import TRIGGER, EXEC, EXIT
+
+# 本地 JSON-RPC 2.0 控制接口：Unix 域套接字，每行一个 JSON 消息。
+# 服务端运行在 ShortcutBackend 监听线程的 asyncio 事件循环上；
+# 读写快捷键表的方法经 notifier 投递到后端所属线程执行，与界面和配置文件监视的修改走同一条路径。
+#
+#   {"jsonrpc": "2.0", "id": 1, "method": "add", "params": {"shortcut": "ctrl+alt+t", "command": "..."}}
+#   {"jsonrpc": "2.0", "id": 1, "result": ["ctrl+alt+t"]}
+#
+# subscribe 之后服务端以通知推送事件：{"method": "event", "params": {...}}。
+# 每个订阅按序号跟随事件总线（环形缓冲区）读取，客户端读得慢时只阻塞它自己的推送，
+# 被覆盖的事件以 {"method": "missed", "params": {"subscription": id, "count": n}} 告知。
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# 应用错误：批量修改被拒绝（data.index 为出错操作的序号）、快捷键不存在
+BATCH_FAILED = 1
+NOT_FOUND = 2
+
+STREAM_KINDS = (TRIGGER, EXEC, EXIT)
+MAX_LINE = 1 << 20
+# 监听队列长度：数百个客户端同时连接时不被拒绝
+BACKLOG = 1024
+# 每个订阅一次从事件总线取出的最多事件数
+STREAM_BATCH = 256
+
+
+class RpcError(Exception):
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+    def toDict(self):
+        error = {"code": self.code, "message": str(self)}
+        if self.data is not None:
+            error["data"] = self.data
+        return error
+
+
+def encode(message):
+    return json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n"
+
+
+def eventToDict(event):
+    message = {"seq": event.seq, "kind": event.kind, "shortcut": event.shortcut,
+               "level": event.level, "time": event.timestamp, "message": event.message}
+    if event.data:
+        message.update(event.data)
+    return message
+
+
+class Subscription:
+    __slots__ = ('id', 'kinds', 'shortcut', 'seq', 'wake', 'task')
+
+    def __init__(self, subscriptionId, kinds, shortcut, seq):
+        self.id = subscriptionId
+        self.kinds = kinds
+        self.shortcut = shortcut
+        self.seq = seq
+        self.wake = asyncio.Event()
+        self.task = None
+
+    def matches(self, event):
+        return event.kind in self.kinds and (self.shortcut is None or event.shortcut == self.shortcut)
+
+
+class RpcConnection:
+    #一个客户端连接：按顺序处理请求，每个订阅由独立任务推送事件#
+
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.subscriptions = {}
+        self.task = asyncio.current_task()
+
+    async def run(self):
+        try:
+            while True:
+                try:
+                    line = await self.reader.readline()
+                except ValueError:
+                    # 单行超过 MAX_LINE
+                    await self.send({"jsonrpc": "2.0", "id": None,
+                                     "error": {"code": INVALID_REQUEST, "message": "请求过长"}})
+                    return
+                if not line:
+                    return
+                line = line.strip()
+                if line:
+                    response = await self.handle(line)
+                    if response is not None:
+                        await self.send(response)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # 服务端关闭时取消；正常结束，避免 asyncio 在连接回调中报告被取消的任务
+            pass
+        finally:
+            self.close()
+
+    async def send(self, message):
+        self.writer.write(encode(message))
+        await self.writer.drain()
+
+    async def handle(self, line):
+        #处理一条请求，返回响应；没有 id 的通知不返回响应#
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": str(e)}}
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return {"jsonrpc": "2.0", "id": None,
+                    "error": {"code": INVALID_REQUEST, "message": "无效的请求"}}
+        requestId = request.get("id")
+        try:
+            result = await self.call(request["method"], request.get("params"))
+        except RpcError as e:
+            response = {"jsonrpc": "2.0", "id": requestId, "error": e.toDict()}
+        except Exception as e:
+            response = {"jsonrpc": "2.0", "id": requestId,
+                        "error": {"code": INTERNAL_ERROR, "message": str(e)}}
+        else:
+            response = {"jsonrpc": "2.0", "id": requestId, "result": result}
+        return response if "id" in request else None
+
+    async def call(self, method, params):
+        if method == "subscribe":
+            function = self.subscribe
+        elif method == "unsubscribe":
+            function = self.unsubscribe
+        else:
+            function = self.server.methods.get(method)
+            if function is None:
+                raise RpcError(METHOD_NOT_FOUND, f"未知方法: {method}")
+        args, kwargs = bindParams(self.server.signature(method, function), params)
+        if method in ("subscribe", "unsubscribe"):
+            return function(*args, **kwargs)
+        return await self.server.callOwner(function, *args, **kwargs)
+
+    def subscribe(self, kinds=None, shortcut=None):
+        #订阅事件流，kinds 默认为 trigger/exec/exit，shortcut 为 None 时不按快捷键过滤#
+        kinds = frozenset(kinds or STREAM_KINDS)
+        unknown = kinds.difference(STREAM_KINDS)
+        if unknown:
+            raise RpcError(INVALID_PARAMS, f"未知的事件类型: {', '.join(sorted(unknown))}")
+        subscription = Subscription(next(self.server.ids), kinds, shortcut, self.server.backend.events.total)
+        subscription.task = asyncio.create_task(self.stream(subscription))
+        self.subscriptions[subscription.id] = subscription
+        self.server.subscriptions.add(subscription)
+        return {"subscription": subscription.id, "seq": subscription.seq}
+
+    def unsubscribe(self, subscription):
+        found = self.subscriptions.pop(subscription, None)
+        if found is None:
+            return False
+        self.server.subscriptions.discard(found)
+        found.task.cancel()
+        return True
+
+    async def stream(self, subscription):
+        #按序号跟随事件总线推送事件；写缓冲区满时等待客户端读取#
+        bus = self.server.backend.events
+        try:
+            while True:
+                await subscription.wake.wait()
+                subscription.wake.clear()
+                while True:
+                    events, subscription.seq, missed = bus.read(subscription.seq, STREAM_BATCH)
+                    if missed:
+                        self.writer.write(encode({"jsonrpc": "2.0", "method": "missed", "params": {
+                            "subscription": subscription.id, "count": missed}}))
+                    for event in events:
+                        if subscription.matches(event):
+                            params = eventToDict(event)
+                            params["subscription"] = subscription.id
+                            self.writer.write(encode({"jsonrpc": "2.0", "method": "event", "params": params}))
+                    await self.writer.drain()
+                    if len(events) < STREAM_BATCH:
+                        break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    def close(self):
+        for subscription in self.subscriptions.values():
+            self.server.subscriptions.discard(subscription)
+            subscription.task.cancel()
+        self.subscriptions.clear()
+        self.server.connections.discard(self)
+        self.writer.close()
+
+
+def bindParams(signature, params):
+    #把 JSON-RPC 的 params（数组或对象）转换为调用参数，不匹配时抛出 INVALID_PARAMS#
+    if params is None:
+        args, kwargs = (), {}
+    elif isinstance(params, list):
+        args, kwargs = params, {}
+    elif isinstance(params, dict):
+        args, kwargs = (), params
+    else:
+        raise RpcError(INVALID_PARAMS, "params 必须是数组或对象")
+    try:
+        signature.bind(*args, **kwargs)
+    except TypeError as e:
+        raise RpcError(INVALID_PARAMS, str(e))
+    return args, kwargs
+
+
+class RpcServer:
+    #JSON-RPC 控制接口服务端，在 ShortcutBackend 监听线程的事件循环中启动和关闭#
+
+    def __init__(self, backend, path):
+        self.backend = backend
+        self.path = path
+        self.loop = None
+        self.server = None
+        self.inode = None
+        self.connections = set()
+        self.subscriptions = set()
+        self.ids = itertools.count(1)
+        self.wakePending = False
+        self.signatures = {}
+        # 以下方法在后端所属线程中执行
+        self.methods = {
+            "ping": lambda: "pong",
+            "list": self.listShortcuts,
+            "get": self.getShortcut,
+            "add": self.addShortcut,
+            "remove": self.removeShortcut,
+            "batch": self.applyBatch,
+            "trigger": self.triggerShortcut,
+            "reload": self.reloadConfig,
+            "conflicts": self.findConflicts,
+            "metrics": backend.metrics,
+            "processStats": backend.processStats,
+            "latencyStats": backend.latencyStats,
+        }
+
+    def signature(self, method, function):
+        signature = self.signatures.get(method)
+        if signature is None:
+            signature = self.signatures[method] = inspect.signature(function)
+        return signature
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        # 先在只有本用户可进入的临时目录（0700）中绑定并收紧权限，再改名到目标路径，
+        # 套接字在任何时刻都不会以默认权限出现在公共路径上（不修改进程级的 umask）
+        private = tempfile.mkdtemp(prefix=".rpc-", dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            bound = os.path.join(private, "socket")
+            self.server = await asyncio.start_unix_server(self.accept, path=bound, limit=MAX_LINE,
+                                                          backlog=BACKLOG)
+            os.chmod(bound, 0o600)
+            os.replace(bound, self.path)
+        except BaseException:
+            if self.server is not None:
+                self.server.close()
+            raise
+        finally:
+            shutil.rmtree(private, ignore_errors=True)
+        self.inode = os.stat(self.path).st_ino
+        self.backend.events.subscribe(self.onEvent)
+
+    async def close(self):
+        #停止接受连接并断开所有客户端；不等待仍在后端所属线程中排队的调用#
+        self.backend.events.unsubscribe(self.onEvent)
+        self.server.close()
+        for connection in list(self.connections):
+            connection.task.cancel()
+            connection.close()
+        try:
+            await asyncio.wait_for(self.server.wait_closed(), 1.0)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            if os.stat(self.path).st_ino == self.inode:
+                os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def accept(self, reader, writer):
+        connection = RpcConnection(self, reader, writer)
+        self.connections.add(connection)
+        await connection.run()
+
+    def onEvent(self, event):
+        #事件总线回调（发布事件的任意线程）：合并唤醒，一轮事件循环只唤醒一次所有订阅#
+        if event.kind is None or not self.subscriptions or self.wakePending:
+            return
+        self.wakePending = True
+        try:
+            self.loop.call_soon_threadsafe(self.wakeSubscribers)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    def wakeSubscribers(self):
+        self.wakePending = False
+        for subscription in self.subscriptions:
+            subscription.wake.set()
+
+    async def callOwner(self, function, *args, **kwargs):
+        #在后端所属线程中执行 function 并等待结果#
+        future = self.loop.create_future()
+
+        def settle(result, error):
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        def run():
+            try:
+                result, error = function(*args, **kwargs), None
+            except Exception as e:
+                result, error = None, e
+            try:
+                self.loop.call_soon_threadsafe(settle, result, error)
+            except RuntimeError:
+                pass
+
+        self.backend.notifier.post(run)
+        return await future
+
+    # 以下方法在后端所属线程中执行
+
+    def listShortcuts(self, prefix=None):
+        #返回 {快捷键: 配置}，prefix 只返回以其开头的快捷键#
+        return {shortcut: dict(data) for shortcut, data in self.backend.shortcuts.items()
+                if prefix is None or shortcut.startswith(prefix)}
+
+    def getShortcut(self, shortcut):
+        key = shortcut if shortcut in self.backend.shortcuts else self.backend.normalize_shortcut(shortcut)
+        if key not in self.backend.shortcuts:
+            raise RpcError(NOT_FOUND, f"快捷键不存在: {shortcut}")
+        return dict(self.backend.shortcuts[key], shortcut=key)
+
+    def applyOperations(self, operations):
+        try:
+            changes = self.backend.applyBatch(operations)
+        except BatchError as e:
+            raise RpcError(BATCH_FAILED, str(e), {"index": e.index})
+        return sorted(changes)
+
+    def addShortcut(self, shortcut, command, description="", options=None):
+        #添加或更新一个快捷键，返回变化的快捷键列表#
+        return self.applyOperations([("add", shortcut, command, description, options or {})])
+
+    def removeShortcut(self, shortcut):
+        return self.applyOperations([("remove", shortcut)])
+
+    def applyBatch(self, operations):
+        #原子地应用一组 {"op": "add"|"remove", "shortcut", "command", "description", "options"}#
+        converted = []
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict):
+                raise RpcError(INVALID_PARAMS, "操作必须是对象", {"index": index})
+            op = operation.get("op")
+            shortcut = operation.get("shortcut", "")
+            if op == "add":
+                converted.append(("add", shortcut, operation.get("command", ""),
+                                  operation.get("description", ""), operation.get("options") or {}))
+            else:
+                converted.append((op, shortcut))
+        return self.applyOperations(converted)
+
+    def triggerShortcut(self, shortcut):
+        if not self.backend.triggerShortcut(shortcut):
+            raise RpcError(NOT_FOUND, f"未找到快捷键或触发队列已满: {shortcut}")
+        return True
+
+    def reloadConfig(self):
+        return self.backend.reloadConfig()
+
+    def findConflicts(self, shortcut, ignore=None):
+        return [{"message": str(conflict), "blocking": conflict.blocking}
+                for conflict in self.backend.findConflicts(shortcut, ignore)]
+
+
+class RpcClient:
+    #本地 JSON-RPC 客户端，用于脚本和负载测试#
+    #   client = await RpcClient.connect(path)
+    #   await client.call("add", "ctrl+alt+t", "notepad")
+    #   await client.call("subscribe"); event = await client.notifications.get()
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.notifications = asyncio.Queue()
+        self.task = asyncio.create_task(self.readResponses())
+
+    @classmethod
+    async def connect(cls, path):
+        reader, writer = await asyncio.open_unix_connection(path, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def call(self, method, *args, **kwargs):
+        #调用方法并返回结果，服务端返回错误时抛出 RpcError#
+        requestId = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[requestId] = future
+        request = {"jsonrpc": "2.0", "id": requestId, "method": method}
+        if args or kwargs:
+            request["params"] = kwargs if kwargs else list(args)
+        self.writer.write(encode(request))
+        await self.writer.drain()
+        return await future
+
+    async def readResponses(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if "id" not in message:
+                    await self.notifications.put(message)
+                    continue
+                future = self.pending.pop(message["id"], None)
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    error = message["error"]
+                    future.set_exception(RpcError(error["code"], error["message"], error.get("data")))
+                else:
+                    future.set_result(message.get("result"))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("连接已关闭"))
+            self.pending.clear()
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.task.cancel()
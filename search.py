@@ -0,0 +1,162 @@
+import re
+import bisect
+
+# 英文单词和数字按连续字母数字切分，中文等非 ASCII 字符逐字作为词元
+TOKEN = re.compile(r'[a-z0-9]+|[^\x00-\x7f]')
+
+# 匹配得分：完全相同的词元 > 词元前缀 > 子序列模糊匹配
+EXACT_SCORE = 3
+PREFIX_SCORE = 2
+FUZZY_SCORE = 1
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+class SearchIndex:
+    #快捷键搜索索引#
+    # 对快捷键、命令和描述切分词元，维护 词元 -> 快捷键集合 的倒排表
+    # 和有序词表。添加、修改、删除只更新受影响的词元，不重建索引。
+    # 查询的每个词都要匹配：先在有序词表上二分查找前缀，
+    # 前缀没有结果时再按子序列模糊匹配词表；结果按集合求交，得分只在排序时计算。
+
+    def __init__(self):
+        self.documents = {}    # 快捷键 -> 词元集合
+        self.postings = {}     # 词元 -> 快捷键集合
+        self.vocabulary = []   # 有序词表
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __contains__(self, shortcut):
+        return shortcut in self.documents
+
+    def update(self, shortcut, data, newTokens=None):
+        #添加或更新一条快捷键，data 为后端的快捷键数据#
+        # 传入 newTokens 列表时新词元只追加到该列表，由调用方统一排序并入词表
+        tokens = set(tokenize(f'{shortcut}\n{data.get("command", "")}\n{data.get("description", "") or ""}'))
+        old = self.documents.get(shortcut)
+        if old == tokens:
+            return
+        if old is not None:
+            for token in old - tokens:
+                self.unpost(token, shortcut)
+            added = tokens - old
+        else:
+            added = tokens
+        for token in added:
+            owners = self.postings.get(token)
+            if owners is None:
+                owners = self.postings[token] = set()
+                if newTokens is None:
+                    bisect.insort(self.vocabulary, token)
+                else:
+                    newTokens.append(token)
+            owners.add(shortcut)
+        self.documents[shortcut] = tokens
+
+    def remove(self, shortcut):
+        tokens = self.documents.pop(shortcut, None)
+        if tokens is None:
+            return False
+        for token in tokens:
+            self.unpost(token, shortcut)
+        return True
+
+    def unpost(self, token, shortcut):
+        owners = self.postings.get(token)
+        if owners is None:
+            return
+        owners.discard(shortcut)
+        if not owners:
+            del self.postings[token]
+            index = bisect.bisect_left(self.vocabulary, token)
+            if index < len(self.vocabulary) and self.vocabulary[index] == token:
+                del self.vocabulary[index]
+
+    def updateMany(self, items):
+        #批量添加 (快捷键, 数据)，新词元最后一次性并入词表#
+        newTokens = []
+        for shortcut, data in items:
+            self.update(shortcut, data, newTokens)
+        if newTokens:
+            # 有序词表后接新词元，Timsort 对两段有序序列的合并接近线性
+            newTokens.sort()
+            self.vocabulary.extend(newTokens)
+            self.vocabulary.sort()
+
+    def apply(self, changes):
+        #应用 {快捷键: 新数据或 None}#
+        for shortcut, data in changes.items():
+            if data is None:
+                self.remove(shortcut)
+            else:
+                self.update(shortcut, data)
+
+    def clear(self):
+        self.documents.clear()
+        self.postings.clear()
+        self.vocabulary.clear()
+
+    def prefixTokens(self, term):
+        #有序词表中以 term 开头的词元#
+        start = bisect.bisect_left(self.vocabulary, term)
+        end = bisect.bisect_left(self.vocabulary, term + '\uffff', start)
+        return self.vocabulary[start:end]
+
+    def fuzzyTokens(self, term):
+        #首字符相同、并按顺序包含 term 全部字符的词元（如 "chrm" 匹配 "chrome"）#
+        # 逐个词元做线性的子序列检查：共享迭代器的 in 只向前消耗，每个词元最多扫描一遍
+        rest = term[1:]
+        matches = []
+        for token in self.prefixTokens(term[0]):
+            it = iter(token[1:])
+            if all(c in it for c in rest):
+                matches.append(token)
+        return matches
+
+    def matchTerm(self, term):
+        #返回 (匹配 term 的快捷键集合, 是否为倒排表中的共享集合)#
+        tokens = self.prefixTokens(term)
+        if not tokens and len(term) > 1:
+            tokens = self.fuzzyTokens(term)
+        if not tokens:
+            return set(), False
+        if len(tokens) == 1:
+            return self.postings[tokens[0]], True
+        return set().union(*[self.postings[token] for token in tokens]), False
+
+    def search(self, query):
+        #返回匹配全部查询词的快捷键集合（新集合）；查询为空时返回 None 表示不过滤#
+        terms = tokenize(query)
+        if not terms:
+            return None
+        matched = [self.matchTerm(term) for term in set(terms)]
+        if len(matched) == 1:
+            result, shared = matched[0]
+            return set(result) if shared else result
+        # 从最小的集合开始求交集
+        sets = sorted((result for result, _ in matched), key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def score(self, shortcut, query):
+        #匹配得分：每个查询词取完全相同 3 分、前缀 2 分、模糊 1 分之和#
+        tokens = self.documents.get(shortcut, ())
+        total = 0
+        for term in set(tokenize(query)):
+            if term in tokens:
+                total += EXACT_SCORE
+            elif any(token.startswith(term) for token in tokens):
+                total += PREFIX_SCORE
+            else:
+                total += FUZZY_SCORE
+        return total
+
+    def ranked(self, query, limit=None):
+        #按得分从高到低返回匹配的快捷键列表#
+        results = self.search(query)
+        if not results:
+            return []
+        ordered = sorted(results, key=lambda shortcut: self.score(shortcut, query), reverse=True)
+        return ordered[:limit] if limit is not None else ordered
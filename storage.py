@@ -0,0 +1,390 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from persistence import ConfigWriter
+from chords import canonicalShortcut
+
+# 除 command/description/profile 外的字段（shell、throttle 等）统一存为 options
+CORE_FIELDS = ("command", "description", "profile")
+
+
+def openStore(path, onSaved=None, onError=None):
+    #按扩展名选择存储：.db/.sqlite/.sqlite3 使用 SQLite，其他使用 JSON 文件#
+    if os.path.splitext(path)[1].lower() in ('.db', '.sqlite', '.sqlite3'):
+        store = SqliteStore(path, onSaved=onSaved, onError=onError)
+        # 首次使用 SQLite 时自动迁移同目录下已有的 shortcuts.json；
+        # 迁移与完成标记在同一事务中提交，失败时报告错误并在下次启动时重试
+        legacy = os.path.join(os.path.dirname(os.path.abspath(path)), "shortcuts.json")
+        if not store.isMigrated():
+            try:
+                store.importJson(legacy if os.path.exists(legacy) else None)
+            except (OSError, ValueError, sqlite3.Error) as e:
+                if onError:
+                    onError(MigrationError(f"迁移 {legacy} 失败，下次启动时重试: {str(e)}"))
+        return store
+    return JsonStore(path, onSaved=onSaved, onError=onError)
+
+
+class MigrationError(Exception):
+    #旧配置文件迁移失败#
+    pass
+
+
+class ShortcutStore:
+    #快捷键存储接口#
+    # load()        返回作为 ShortcutBackend.shortcuts 使用的映射
+    # iterOptions() 启动时逐条给出分派索引与节流需要的 (快捷键, 数据)
+    # commit()      持久化 {快捷键: 新数据或 None} 形式的修改
+    # readAll()     从存储重新读取完整的快捷键表（用于重新加载）
+    # iterItems()   流式遍历全部 (快捷键, 数据)，不构建完整字典
+    # reset()       加载失败时换成空表，返回新的映射
+    watchable = False
+
+    def load(self):
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def iterOptions(self):
+        raise NotImplementedError
+
+    def commit(self, changes):
+        raise NotImplementedError
+
+    def readAll(self):
+        raise NotImplementedError
+
+    def iterItems(self):
+        raise NotImplementedError
+
+    def isOwnWrite(self, digest):
+        return False
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def metrics(self):
+        return {}
+
+
+class JsonStore(ShortcutStore):
+    #JSON 文件存储：整表常驻内存，修改后台合并写入#
+    watchable = True
+
+    def __init__(self, path, onSaved=None, onError=None):
+        self.path = path
+        self.table = {}
+        # dict() 复制在 GIL 下是原子的
+        self.writer = ConfigWriter(path, lambda: dict(self.table), onError=onError,
+                                   onSaved=(lambda latency, size: onSaved(latency, f"{size} 字节"))
+                                   if onSaved else None)
+
+    def load(self):
+        self.table = self.readAll()
+        return self.table
+
+    def reset(self):
+        self.table = {}
+        return self.table
+
+    def readAll(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def iterOptions(self):
+        return self.iterItems()
+
+    def iterItems(self):
+        # 整表本就常驻内存：dict() 浅复制只复制引用（GIL 下原子），不为每项创建元组，
+        # 遍历可以跨越多个事件循环片段，期间的修改不影响本次遍历
+        return iter(dict(self.table).items())
+
+    def commit(self, changes):
+        # 只做标记并立即返回，短时间内的多次修改合并为一次原子写入
+        self.writer.schedule()
+
+    def isOwnWrite(self, digest):
+        return self.writer.isOwnWrite(digest)
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+    def metrics(self):
+        return self.writer.metrics()
+
+
+def rowToData(command, description, profile, options):
+    data = {"command": command, "description": description}
+    if profile:
+        data["profile"] = profile
+    if options:
+        data.update(json.loads(options))
+    return data
+
+
+def dataToRow(chord, data):
+    options = {k: v for k, v in data.items() if k not in CORE_FIELDS}
+    return (chord, data.get("profile", "") or "", data.get("command", ""),
+            data.get("description", "") or "",
+            json.dumps(options, ensure_ascii=False) if options else None)
+
+
+class SqliteTable:
+    #SQLite 快捷键表的映射视图#
+    # 启动时只加载快捷键和 options（分派索引、节流、自动重复需要的信息），
+    # 命令和描述在首次访问时按行读取并放入有界缓存。
+    cacheSize = 4096
+
+    def __init__(self, store):
+        self.store = store
+        self.chords = {}
+        self.cache = OrderedDict()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.chords)
+
+    def __contains__(self, chord):
+        return chord in self.chords
+
+    def __iter__(self):
+        return iter(list(self.chords))
+
+    def keys(self):
+        return list(self.chords)
+
+    def __getitem__(self, chord):
+        with self.lock:
+            if chord not in self.chords:
+                raise KeyError(chord)
+            data = self.cache.get(chord)
+            if data is not None:
+                self.cache.move_to_end(chord)
+                return data
+            data = self.store.fetch(chord)
+            if data is None:
+                raise KeyError(chord)
+            self.remember(chord, data)
+            return data
+
+    def get(self, chord, default=None):
+        try:
+            return self[chord]
+        except KeyError:
+            return default
+
+    def __setitem__(self, chord, data):
+        with self.lock:
+            self.chords[chord] = True
+            self.remember(chord, data)
+
+    def pop(self, chord, default=None):
+        with self.lock:
+            if chord not in self.chords:
+                return default
+            data = self.get(chord, default)
+            del self.chords[chord]
+            self.cache.pop(chord, None)
+            return data
+
+    def __delitem__(self, chord):
+        if self.pop(chord, KeyError) is KeyError:
+            raise KeyError(chord)
+
+    def remember(self, chord, data):
+        self.cache[chord] = data
+        self.cache.move_to_end(chord)
+        while len(self.cache) > self.cacheSize:
+            self.cache.popitem(last=False)
+
+    def items(self):
+        #流式遍历，不填充缓存#
+        return self.store.iterItems()
+
+    def values(self):
+        return (data for _, data in self.store.iterItems())
+
+
+class SqliteStore(ShortcutStore):
+    #SQLite 存储：按规范快捷键、配置组和描述建立索引，修改按行 upsert#
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS shortcuts (
+            chord TEXT PRIMARY KEY,
+            profile TEXT NOT NULL DEFAULT '',
+            command TEXT NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            options TEXT
+        );
+        CREATE INDEX IF NOT EXISTS shortcuts_profile ON shortcuts(profile);
+        CREATE INDEX IF NOT EXISTS shortcuts_description ON shortcuts(description);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    # 先 UPDATE 再 INSERT，兼容不支持 ON CONFLICT 的旧版 SQLite，并保持行顺序
+    UPDATE = "UPDATE shortcuts SET profile = ?, command = ?, description = ?, options = ? WHERE chord = ?"
+    INSERT = "INSERT INTO shortcuts (chord, profile, command, description, options) VALUES (?, ?, ?, ?, ?)"
+
+    def __init__(self, path, onSaved=None, onError=None):
+        self.path = path
+        self.onSaved = onSaved
+        self.onError = onError
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        self.table = SqliteTable(self)
+        self.saves = 0
+        self.rowsWritten = 0
+        self.lastLatency = 0.0
+        self.maxLatency = 0.0
+        self.errors = 0
+
+    def load(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT chord FROM shortcuts ORDER BY rowid")
+            self.table.chords = {chord: True for chord, in rows}
+        return self.table
+
+    def reset(self):
+        with self.table.lock:
+            self.table.chords = {}
+            self.table.cache.clear()
+        return self.table
+
+    def iterOptions(self):
+        #只读取带有 options 的行（节流、自动重复等）#
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT chord, options FROM shortcuts WHERE options IS NOT NULL").fetchall()
+        return ((chord, json.loads(options)) for chord, options in rows)
+
+    def fetch(self, chord):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT command, description, profile, options FROM shortcuts WHERE chord = ?",
+                (chord,)).fetchone()
+        if row is None:
+            return None
+        return rowToData(*row)
+
+    def iterItems(self, batchSize=500):
+        #按 rowid 分段读取，内存占用与表大小无关#
+        last = 0
+        while True:
+            with self.lock:
+                rows = self.connection.execute(
+                    "SELECT rowid, chord, command, description, profile, options FROM shortcuts "
+                    "WHERE rowid > ? ORDER BY rowid LIMIT ?", (last, batchSize)).fetchall()
+            if not rows:
+                return
+            for rowid, chord, command, description, profile, options in rows:
+                yield chord, rowToData(command, description, profile, options)
+            last = rows[-1][0]
+
+    def readAll(self):
+        return dict(self.iterItems())
+
+    def commit(self, changes):
+        #在一个事务中按行 upsert / 删除#
+        if not changes:
+            return
+        start = time.perf_counter()
+        try:
+            with self.lock:
+                cursor = self.connection.cursor()
+                cursor.execute("BEGIN")
+                try:
+                    for chord, data in changes.items():
+                        if data is None:
+                            cursor.execute("DELETE FROM shortcuts WHERE chord = ?", (chord,))
+                        else:
+                            self.upsert(cursor, dataToRow(chord, data))
+                    cursor.execute("COMMIT")
+                except BaseException:
+                    cursor.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            self.errors += 1
+            if self.onError:
+                self.onError(e)
+            return
+        latency = time.perf_counter() - start
+        self.saves += 1
+        self.rowsWritten += len(changes)
+        self.lastLatency = latency
+        self.maxLatency = max(self.maxLatency, latency)
+        if self.onSaved:
+            self.onSaved(latency, f"{len(changes)} 行")
+
+    def upsert(self, cursor, row):
+        #单行 upsert#
+        cursor.execute(self.UPDATE, row[1:] + row[:1])
+        if cursor.rowcount == 0:
+            cursor.execute(self.INSERT, row)
+
+    def isMigrated(self):
+        #旧配置是否已经迁移（或无需迁移）#
+        with self.lock:
+            if self.connection.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+                return True
+            # 加入迁移标记之前创建的数据库：已有数据说明当时已经迁移过，补上标记
+            if self.connection.execute("SELECT 1 FROM shortcuts LIMIT 1").fetchone():
+                self.connection.execute("INSERT INTO meta (key, value) VALUES ('migrated', '1')")
+                return True
+        return False
+
+    def importJson(self, jsonPath):
+        #一次性把 shortcuts.json 迁移到数据库，并在同一事务中写入完成标记；jsonPath 为 None 时只写标记#
+        config = {}
+        if jsonPath is not None:
+            with open(jsonPath, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            if not isinstance(config, dict) or not all(isinstance(data, dict) for data in config.values()):
+                raise ValueError("配置文件格式不正确")
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute("BEGIN")
+            try:
+                for chord, data in config.items():
+                    # 表中每个规范快捷键一行；无法解析的快捷键原样保留，由加载时的校验报告
+                    try:
+                        chord = canonicalShortcut(chord)
+                    except ValueError:
+                        pass
+                    self.upsert(cursor, dataToRow(chord, data))
+                cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated', '1')")
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+        return len(config)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def metrics(self):
+        return {
+            "saves": self.saves,
+            "saveErrors": self.errors,
+            "saveLatencyMs": self.lastLatency * 1000,
+            "saveMaxLatencyMs": self.maxLatency * 1000,
+            "rowsWritten": self.rowsWritten,
+        }
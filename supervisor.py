@@ -0,0 +1,330 @@
+import os
+import sys
+import time
+import select
+import threading
+
+
+class ShortcutStats:
+    #单个快捷键启动的子进程统计#
+    # peakRss 只在能可靠取得子进程自身峰值内存的平台（Windows）上有值，其他平台为 None：
+    # Linux 的 wait4 ru_maxrss 会继承 fork 时父进程的峰值，报告的实际是管理器自己的内存
+    __slots__ = ('launches', 'running', 'exits', 'failures', 'lastExitCode',
+                 'lastWall', 'totalWall', 'peakRss', 'rejected')
+
+    def __init__(self):
+        self.launches = 0
+        self.running = 0
+        self.exits = 0
+        self.failures = 0
+        self.lastExitCode = None
+        self.lastWall = 0.0
+        self.totalWall = 0.0
+        self.peakRss = None
+        self.rejected = 0
+
+    def toDict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Child:
+    __slots__ = ('shortcut', 'process', 'started', 'pidfd', 'watched')
+
+    def __init__(self, shortcut, process):
+        self.shortcut = shortcut
+        self.process = process
+        self.started = time.monotonic()
+        self.pidfd = None
+        self.watched = False
+
+
+class HandleWaiter:
+    #Windows：一个线程用 WaitForMultipleObjects 同时等待所有子进程句柄#
+    # 句柄表第一个是唤醒事件，新增子进程或关闭时置位；超过 63 个子进程时分批轮流短时等待
+
+    BATCH = 63
+    ROTATE_MS = 50
+
+    def __init__(self, loop, callback):
+        import _overlapped
+        self.loop = loop
+        self.callback = callback
+        self.event = _overlapped.CreateEvent(None, False, False, None)
+        self.children = []
+        self.closed = False
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, name="process-waiter", daemon=True)
+        self.thread.start()
+
+    def add(self, child):
+        import _overlapped
+        with self.lock:
+            self.children.append(child)
+        _overlapped.SetEvent(self.event)
+
+    def run(self):
+        import _winapi
+        while True:
+            with self.lock:
+                if self.closed:
+                    return
+                children = list(self.children)
+            batches = [children[i:i + self.BATCH] for i in range(0, len(children), self.BATCH)] or [[]]
+            timeout = _winapi.INFINITE if len(batches) == 1 else self.ROTATE_MS
+            for batch in batches:
+                handles = [self.event] + [int(child.process._handle) for child in batch]
+                index = _winapi.WaitForMultipleObjects(handles, False, timeout)
+                if index == _winapi.WAIT_TIMEOUT:
+                    continue
+                if index > 0:
+                    child = batch[index - 1]
+                    with self.lock:
+                        self.children.remove(child)
+                    try:
+                        self.loop.call_soon_threadsafe(self.callback, child)
+                    except RuntimeError:
+                        # 循环已关闭，留给 detach 时的收尾检查
+                        pass
+                break
+
+    def close(self):
+        import _overlapped
+        import _winapi
+        with self.lock:
+            self.closed = True
+        _overlapped.SetEvent(self.event)
+        self.thread.join()
+        _winapi.CloseHandle(self.event)
+
+
+class KqueueWaiter:
+    #macOS/BSD：一个 kqueue 登记所有子进程的 NOTE_EXIT，kqueue 描述符挂在事件循环上#
+
+    def __init__(self, loop, callback):
+        self.loop = loop
+        self.callback = callback
+        self.kqueue = select.kqueue()
+        self.children = {}
+        loop.add_reader(self.kqueue.fileno(), self.drain)
+
+    def add(self, child):
+        pid = child.process.pid
+        event = select.kevent(pid, select.KQ_FILTER_PROC,
+                              select.KQ_EV_ADD | select.KQ_EV_ONESHOT, select.KQ_NOTE_EXIT)
+        try:
+            self.kqueue.control([event], 0)
+        except ProcessLookupError:
+            # 登记前已经退出
+            self.loop.call_soon(self.callback, child)
+            return
+        self.children[pid] = child
+
+    def drain(self):
+        for event in self.kqueue.control(None, 64, 0):
+            child = self.children.pop(event.ident, None)
+            if child is not None:
+                self.callback(child)
+
+    def close(self):
+        self.loop.remove_reader(self.kqueue.fileno())
+        self.kqueue.close()
+
+
+class PollWaiter:
+    #其他平台：事件循环上的一个定时器轮询所有子进程，只在有子进程运行时才调度#
+
+    INTERVAL = 0.5
+
+    def __init__(self, loop, callback):
+        self.loop = loop
+        self.callback = callback
+        self.children = set()
+        self.timer = None
+
+    def add(self, child):
+        self.children.add(child)
+        if self.timer is None:
+            self.timer = self.loop.call_later(self.INTERVAL, self.poll)
+
+    def poll(self):
+        self.timer = None
+        for child in list(self.children):
+            if child.process.poll() is not None:
+                self.children.discard(child)
+                self.callback(child)
+        if self.children:
+            self.timer = self.loop.call_later(self.INTERVAL, self.poll)
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+def createWaiter(loop, callback):
+    #没有 pidfd 时所有子进程共用的等待器#
+    if sys.platform == 'win32':
+        return HandleWaiter(loop, callback)
+    if hasattr(select, 'kqueue'):
+        return KqueueWaiter(loop, callback)
+    return PollWaiter(loop, callback)
+
+
+def peakRssOfHandle(handle):
+    #Windows 下读取进程句柄的峰值工作集（字节）#
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD),
+                    ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t),
+                    ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t),
+                    ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    if ctypes.windll.psapi.GetProcessMemoryInfo(int(handle), ctypes.byref(counters), counters.cb):
+        return counters.PeakWorkingSetSize
+    return None
+
+
+class ProcessSupervisor:
+    #子进程监管器#
+    # 记录每个启动的子进程，在监听线程的 asyncio 事件循环上异步回收：
+    # Linux 使用 pidfd 可读事件；其他平台所有子进程共用一个等待器（见 createWaiter），
+    # 长时间运行的子进程再多也不会占满线程池而使后来的子进程得不到回收。
+    # 按快捷键统计退出码、运行时长和峰值内存，并限制同时运行的实例数。
+
+    def __init__(self, onExit=None):
+        # onExit(快捷键, pid, 退出码, 运行秒数)：子进程被回收后在事件循环线程中调用
+        self.onExit = onExit
+        self.loop = None
+        self.waiter = None
+        self.children = set()
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, shortcut, limit=None):
+        #启动前占用一个实例名额，超过上限返回 False#
+        with self.lock:
+            stats = self.stats.get(shortcut)
+            if stats is None:
+                stats = self.stats[shortcut] = ShortcutStats()
+            if limit is not None and stats.running >= limit:
+                stats.rejected += 1
+                return False
+            stats.running += 1
+            return True
+
+    def release(self, shortcut):
+        #启动失败时归还名额#
+        with self.lock:
+            self.stats[shortcut].running -= 1
+
+    def track(self, shortcut, process):
+        #登记已启动的子进程（可在任意线程调用）#
+        child = Child(shortcut, process)
+        with self.lock:
+            self.stats[shortcut].launches += 1
+            self.children.add(child)
+            loop = self.loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self.watch, child)
+            except RuntimeError:
+                pass
+        return child
+
+    def attach(self, loop):
+        #在事件循环线程内调用：开始在该循环上回收子进程#
+        with self.lock:
+            self.loop = loop
+            children = list(self.children)
+        for child in children:
+            self.watch(child)
+
+    def detach(self):
+        #在事件循环线程内调用：停止监视，未退出的子进程留待下次 attach#
+        with self.lock:
+            loop, self.loop = self.loop, None
+            children = list(self.children)
+        for child in children:
+            if child.pidfd is not None:
+                loop.remove_reader(child.pidfd)
+                os.close(child.pidfd)
+                child.pidfd = None
+            child.watched = False
+        if self.waiter is not None:
+            self.waiter.close()
+            self.waiter = None
+        # 顺带回收已经退出的子进程
+        for child in children:
+            if child.process.poll() is not None:
+                self.exited(child)
+
+    def watch(self, child):
+        loop = self.loop
+        if loop is None or child.watched:
+            return
+        if child not in self.children:
+            return
+        child.watched = True
+        if hasattr(os, 'pidfd_open'):
+            try:
+                child.pidfd = os.pidfd_open(child.process.pid)
+            except OSError:
+                child.pidfd = None
+            if child.pidfd is not None:
+                loop.add_reader(child.pidfd, self.reap, child)
+                return
+        if self.waiter is None:
+            self.waiter = createWaiter(loop, self.exited)
+        self.waiter.add(child)
+
+    def reap(self, child):
+        #pidfd 可读：子进程已退出#
+        self.loop.remove_reader(child.pidfd)
+        os.close(child.pidfd)
+        child.pidfd = None
+        self.exited(child)
+
+    def exited(self, child):
+        #子进程已退出（在事件循环线程中调用）：回收并记录#
+        code = child.process.poll()
+        rss = None
+        if sys.platform == 'win32':
+            try:
+                rss = peakRssOfHandle(child.process._handle)
+            except Exception:
+                rss = None
+        self.finish(child, code, rss)
+
+    def finish(self, child, code, rss):
+        wall = time.monotonic() - child.started
+        with self.lock:
+            if child not in self.children:
+                return
+            self.children.discard(child)
+            stats = self.stats[child.shortcut]
+            stats.running -= 1
+            stats.exits += 1
+            if code:
+                stats.failures += 1
+            stats.lastExitCode = code
+            stats.lastWall = wall
+            stats.totalWall += wall
+            if rss is not None and (stats.peakRss is None or rss > stats.peakRss):
+                stats.peakRss = rss
+        if self.onExit is not None:
+            self.onExit(child.shortcut, child.process.pid, code, wall)
+
+    def snapshot(self):
+        #返回 {快捷键: 统计字典}#
+        with self.lock:
+            return {shortcut: stats.toDict() for shortcut, stats in self.stats.items()}
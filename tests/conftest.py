@@ -0,0 +1,29 @@
+import os
+import sys
+import types
+
+import pytest
+
+# 模块平铺在仓库根目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def fake_keyboard(monkeypatch):
+    #替代 keyboard 库：只记录安装的钩子，不访问真实键盘#
+    module = types.ModuleType("keyboard")
+    module.hooks = []
+    codes = {}
+
+    def hook(callback, suppress=False):
+        module.hooks.append(callback)
+        return callback
+
+    def unhook(callback):
+        module.hooks.remove(callback)
+
+    module.hook = hook
+    module.unhook = unhook
+    module.key_to_scan_codes = lambda key: (codes.setdefault(key, len(codes) + 1),)
+    monkeypatch.setitem(sys.modules, "keyboard", module)
+    return module
@@ -0,0 +1,20 @@
+import json
+
+from backend import ShortcutBackend
+
+
+def test_invalid_entry_does_not_empty_config(tmp_path, fake_keyboard):
+    path = tmp_path / "shortcuts.json"
+    config = {"ctrl+alt+a": {"command": "x", "throttle": 5}, "ctrl+alt+b": {"command": "y"}}
+    path.write_text(json.dumps(config), encoding="utf-8")
+    backend = ShortcutBackend(str(path), watchConfig=False)
+    try:
+        assert sorted(backend.shortcuts) == ["ctrl+alt+a", "ctrl+alt+b"]
+        events, _, _ = backend.events.read(0)
+        assert any("ctrl+alt+a 配置无效" in event.message for event in events)
+        # 保存时仍然写出全部条目
+        backend.addShortcut("ctrl+alt+c", "z")
+        backend.store.flush()
+        assert set(json.loads(path.read_text(encoding="utf-8"))) == {"ctrl+alt+a", "ctrl+alt+b", "ctrl+alt+c"}
+    finally:
+        backend.shutdown()
@@ -0,0 +1,96 @@
+import time
+import threading
+
+import pytest
+
+from dispatcher import Throttle, TriggerDispatcher, FIRE, DROP
+
+
+@pytest.mark.parametrize("policy", [5, "fast", [1], {"minInterval": "soon"}, {"maxRate": [2]},
+                                    {"edge": "middle", "debounce": 1}, {"minInterval": -1}])
+def test_invalid_throttle_raises_value_error(policy):
+    with pytest.raises(ValueError):
+        Throttle("ctrl+alt+t", policy)
+
+
+def test_min_interval_drops_triggers_inside_interval():
+    throttle = Throttle("ctrl+alt+t", {"minInterval": 1})
+    assert throttle.admit(10.0) == FIRE
+    assert throttle.admit(10.5) == DROP
+    assert throttle.admit(11.0) == FIRE
+
+
+class Blocked:
+    #单工作线程被第一个触发占住，之后的触发都留在队列中#
+
+    def __init__(self, overflow, maxQueue=2):
+        self.handled = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.dispatcher = TriggerDispatcher(self.handle, concurrency=1, maxQueue=maxQueue, overflow=overflow)
+        self.dispatcher.start()
+        assert self.dispatcher.submit("busy")
+        assert self.started.wait(5)
+
+    def handle(self, shortcut, trace):
+        self.handled.append(shortcut)
+        self.started.set()
+        self.gate.wait(5)
+
+    def drain(self, executed):
+        self.gate.set()
+        deadline = time.monotonic() + 5
+        while self.dispatcher.metrics()["executed"] < executed:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        metrics = self.dispatcher.metrics()
+        self.queued = dict(self.dispatcher.queued)
+        self.dispatcher.stop()
+        return metrics
+
+
+def test_drop_rejects_new_triggers_when_full():
+    blocked = Blocked('drop')
+    dispatcher = blocked.dispatcher
+    assert dispatcher.submit("a") and dispatcher.submit("b")
+    assert dispatcher.submit("c") is False
+    metrics = blocked.drain(3)
+    assert blocked.handled == ["busy", "a", "b"]
+    assert metrics["dropped"] == 1 and metrics["submitted"] == 4
+
+
+def test_drop_oldest_discards_head_of_queue():
+    blocked = Blocked('drop_oldest')
+    dispatcher = blocked.dispatcher
+    for shortcut in "abc":
+        assert dispatcher.submit(shortcut)
+    assert dispatcher.queued == {"b": 1, "c": 1}
+    metrics = blocked.drain(3)
+    assert blocked.handled == ["busy", "b", "c"]
+    assert metrics["dropped"] == 1
+
+
+def test_coalesce_merges_queued_shortcut_and_drops_others():
+    blocked = Blocked('coalesce')
+    dispatcher = blocked.dispatcher
+    assert dispatcher.submit("a") and dispatcher.submit("b")
+    # 已在队列中的快捷键合并，不在队列中的新触发被丢弃
+    assert dispatcher.submit("a") is True
+    assert dispatcher.submit("c") is False
+    metrics = blocked.drain(3)
+    assert blocked.handled == ["busy", "a", "b"]
+    assert (metrics["coalesced"], metrics["dropped"]) == (1, 1)
+
+
+def test_queue_accounting():
+    blocked = Blocked('coalesce', maxQueue=4)
+    dispatcher = blocked.dispatcher
+    for shortcut in "aab":
+        assert dispatcher.submit(shortcut)
+    metrics = dispatcher.metrics()
+    assert (metrics["queueDepth"], metrics["maxQueueDepth"]) == (3, 3)
+    assert dispatcher.queued == {"a": 2, "b": 1}
+    metrics = blocked.drain(4)
+    assert blocked.handled == ["busy", "a", "a", "b"]
+    assert (metrics["queueDepth"], metrics["maxQueueDepth"]) == (0, 3)
+    assert metrics["executed"] == 4 and blocked.queued == {}
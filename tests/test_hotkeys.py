@@ -0,0 +1,124 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from hotkeys import HotkeyRegistry, PASS, CONSUME
+
+SCAN_CODES = {"ctrl": 29, "alt": 56, "shift": 42, "k": 37, "c": 46, "d": 32, "x": 45, "t": 20}
+
+
+def key(name, event_type="down"):
+    return SimpleNamespace(name=name, scan_code=SCAN_CODES[name], event_type=event_type)
+
+
+class Keyboard:
+    #向注册表发送合成按键事件，记录每个事件的返回值（False 表示被吞掉）#
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def press(self, name):
+        return self.registry.onKeyEvent(key(name))
+
+    def release(self, name):
+        return self.registry.onKeyEvent(key(name, "up"))
+
+    def chord(self, *names):
+        #按下修饰键和主键再依次松开，返回主键按下时的结果#
+        for name in names[:-1]:
+            self.press(name)
+        result = self.press(names[-1])
+        for name in reversed(names):
+            self.release(name)
+        return result
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+def make_registry(fired, shortcuts, timeout=1.0):
+    registry = HotkeyRegistry(lambda shortcut, repeat: fired.append(shortcut),
+                              resolveKey=lambda name: (SCAN_CODES[name],), sequenceTimeout=timeout)
+    for shortcut in shortcuts:
+        registry.register(shortcut, shortcut)
+    return registry, Keyboard(registry)
+
+
+def test_sequence_completes(fired):
+    registry, keyboard = make_registry(fired, ["ctrl+k, ctrl+c"])
+    assert keyboard.chord("ctrl", "k") is CONSUME[1]
+    assert fired == []
+    # 序列的最后一步也被吞掉，不会传给前台程序
+    assert keyboard.chord("ctrl", "c") is False
+    assert fired == ["ctrl+k, ctrl+c"]
+
+
+def test_sequence_times_out(fired):
+    registry, keyboard = make_registry(fired, ["ctrl+k, ctrl+c"], timeout=0.05)
+    keyboard.chord("ctrl", "k")
+    time.sleep(0.1)
+    assert keyboard.chord("ctrl", "c") is PASS[1]
+    assert fired == []
+    # 超时后重新开始匹配
+    keyboard.chord("ctrl", "k")
+    keyboard.chord("ctrl", "c")
+    assert fired == ["ctrl+k, ctrl+c"]
+
+
+def test_only_pending_prefix_keys_are_consumed(fired):
+    registry, keyboard = make_registry(fired, ["ctrl+k, ctrl+c", "ctrl+t"])
+    # 与任何快捷键无关的按键和修饰键放行
+    assert keyboard.press("ctrl") is True
+    assert keyboard.release("ctrl") is True
+    assert keyboard.chord("x") is PASS[1]
+    # 单步快捷键触发但不吞掉按键
+    assert keyboard.chord("ctrl", "t") is True
+    assert fired == ["ctrl+t"]
+    # 前缀之后按下不属于序列的键：前缀被丢弃，该键放行
+    assert keyboard.chord("ctrl", "k") is CONSUME[1]
+    assert keyboard.chord("ctrl", "d") is PASS[1]
+    assert keyboard.chord("ctrl", "c") is PASS[1]
+    assert fired == ["ctrl+t"]
+
+
+def test_single_chord_that_is_also_a_prefix(fired):
+    registry, keyboard = make_registry(fired, ["ctrl+k", "ctrl+k, ctrl+c"])
+    # 较长的序列优先：ctrl+k 作为前缀等待下一步，不单独触发
+    assert keyboard.chord("ctrl", "k") is CONSUME[1]
+    assert fired == []
+    assert keyboard.chord("ctrl", "c") is False
+    assert fired == ["ctrl+k, ctrl+c"]
+    # 删除序列后 ctrl+k 恢复为普通单步快捷键
+    registry.unregister("ctrl+k, ctrl+c")
+    assert keyboard.chord("ctrl", "k") is True
+    assert fired == ["ctrl+k, ctrl+c", "ctrl+k"]
+
+
+
+def test_auto_repeat_reuses_first_result(fired):
+    repeats = []
+    registry = HotkeyRegistry(lambda shortcut, repeat: (repeats if repeat else fired).append(shortcut),
+                              resolveKey=lambda name: (SCAN_CODES[name],))
+    registry.register("ctrl+t", "ctrl+t")
+    keyboard = Keyboard(registry)
+    keyboard.press("ctrl")
+    assert keyboard.press("t") is True
+    assert keyboard.press("t") is True
+    keyboard.release("t")
+    keyboard.release("ctrl")
+    assert fired == ["ctrl+t"] and repeats == ["ctrl+t"]
+
+
+def test_missed_key_up_does_not_block_later_presses(fired):
+    registry, keyboard = make_registry(fired, ["ctrl+t"])
+    registry.repeatGap = 0.05
+    # 锁屏等情况下丢失了 t 的松开事件
+    keyboard.press("ctrl")
+    keyboard.press("t")
+    keyboard.release("ctrl")
+    time.sleep(0.1)
+    keyboard.chord("ctrl", "t")
+    assert fired == ["ctrl+t", "ctrl+t"]
@@ -0,0 +1,78 @@
+import sys
+import time
+import threading
+
+import pytest
+
+from backend import ShortcutBackend
+
+
+@pytest.fixture
+def backend(tmp_path, fake_keyboard):
+    backend = ShortcutBackend(str(tmp_path / "shortcuts.json"), watchConfig=False)
+    backend.addShortcut("ctrl+alt+t", "true")
+    yield backend
+    backend.shutdown()
+
+
+def voluntary_switches(native_id):
+    #Linux 下线程主动让出 CPU（睡眠后被唤醒）的次数，其他平台返回 None#
+    try:
+        with open(f"/proc/self/task/{native_id}/status") as f:
+            for line in f:
+                if line.startswith("voluntary_ctxt_switches:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def test_stop_joins_listener_thread(backend, fake_keyboard):
+    backend.startListener()
+    assert backend.armed.wait(5)
+    thread = backend.thread
+    assert fake_keyboard.hooks
+    backend.stopListener()
+    assert not thread.is_alive()
+    assert backend.thread is None and backend.loop is None
+    assert fake_keyboard.hooks == []
+
+
+def test_no_threads_leak_across_start_stop_cycles(backend):
+    baseline = threading.active_count()
+    for _ in range(1000):
+        backend.startListener()
+        assert backend.armed.wait(5)
+        backend.stopListener()
+    assert threading.active_count() == baseline
+
+
+def test_idle_listener_does_no_work(backend):
+    backend.startListener()
+    assert backend.armed.wait(5)
+    # 等启动时的注册和状态消息处理完
+    time.sleep(0.2)
+    threads = [backend.thread.native_id, backend.dispatcher.thread.native_id]
+    switches = [voluntary_switches(native_id) for native_id in threads]
+    cpu = time.process_time()
+    time.sleep(1.0)
+    assert time.process_time() - cpu < 0.05
+    if sys.platform.startswith("linux"):
+        # 按固定间隔轮询会在这一秒里唤醒约 10 次
+        for native_id, before in zip(threads, switches):
+            assert voluntary_switches(native_id) - before <= 1
+
+
+def test_changes_before_first_sync_are_kept(backend):
+    backend.addShortcut("ctrl+alt+r", "true")
+    # 持有注册表锁，让监听线程停在首次同步之前，期间在所属线程上修改快捷键
+    with backend.registry.lock:
+        backend.startListener()
+        time.sleep(0.1)
+        backend.addShortcut("ctrl+alt+n", "true")
+        backend.removeShortcut("ctrl+alt+r")
+    assert backend.armed.wait(5)
+    assert backend.registry.isRegistered("ctrl+alt+t")
+    assert backend.registry.isRegistered("ctrl+alt+n")
+    assert not backend.registry.isRegistered("ctrl+alt+r")
+    backend.stopListener()
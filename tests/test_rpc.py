@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import stat
+import shutil
+import asyncio
+import tempfile
+
+import pytest
+
+import rpc
+from backend import ShortcutBackend
+from events import INFO, TRIGGER
+
+pytestmark = pytest.mark.skipif(not hasattr(asyncio, "start_unix_server"), reason="需要 Unix 域套接字")
+
+
+@pytest.fixture
+def server(fake_keyboard):
+    # Unix 域套接字路径长度有限（约 108 字节），不使用较深的 tmp_path
+    directory = tempfile.mkdtemp(prefix="rpc")
+    path = os.path.join(directory, "control.sock")
+    backend = ShortcutBackend(os.path.join(directory, "shortcuts.json"), watchConfig=False, rpcSocket=path)
+    backend.startListener()
+    assert backend.armed.wait(5)
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path):
+        assert time.monotonic() < deadline, "控制接口没有启动"
+        time.sleep(0.01)
+    yield backend, path
+    backend.shutdown()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def run(scenario):
+    return asyncio.run(asyncio.wait_for(scenario(), 10))
+
+
+def test_socket_is_private(server):
+    backend, path = server
+    mode = os.stat(path).st_mode
+    assert stat.S_ISSOCK(mode) and stat.S_IMODE(mode) == 0o600
+    # 绑定用的临时目录已删除
+    assert sorted(os.listdir(os.path.dirname(path))) == ["control.sock"]
+
+
+def test_list_add_remove(server):
+    backend, path = server
+
+    async def scenario():
+        client = await rpc.RpcClient.connect(path)
+        try:
+            assert await client.call("ping") == "pong"
+            assert await client.call("list") == {}
+            assert await client.call("add", shortcut="alt+ctrl+T", command="notepad", description="记事本") == ["ctrl+alt+t"]
+            shortcuts = await client.call("list")
+            assert shortcuts["ctrl+alt+t"]["command"] == "notepad"
+            assert (await client.call("get", "ctrl+alt+t"))["description"] == "记事本"
+            assert await client.call("remove", "ctrl+alt+t") == ["ctrl+alt+t"]
+            with pytest.raises(rpc.RpcError) as error:
+                await client.call("get", "ctrl+alt+t")
+            assert error.value.code == rpc.NOT_FOUND
+        finally:
+            await client.close()
+
+    run(scenario)
+    assert backend.shortcuts == {}
+
+
+def test_batch_error_reports_index(server):
+    backend, path = server
+    operations = [{"op": "add", "shortcut": "ctrl+alt+a", "command": "a"},
+                  {"op": "add", "shortcut": "ctrl+alt+b", "command": "b"},
+                  {"op": "remove", "shortcut": "ctrl+alt+z"}]
+
+    async def scenario():
+        client = await rpc.RpcClient.connect(path)
+        try:
+            with pytest.raises(rpc.RpcError) as error:
+                await client.call("batch", operations)
+            assert error.value.code == rpc.BATCH_FAILED
+            assert error.value.data == {"index": 2}
+            # 整批被拒绝，前两个操作没有生效
+            assert await client.call("list") == {}
+            assert await client.call("batch", operations[:2]) == ["ctrl+alt+a", "ctrl+alt+b"]
+        finally:
+            await client.close()
+
+    run(scenario)
+
+
+def test_subscriber_is_told_about_missed_events(server):
+    backend, path = server
+    capacity = backend.events.capacity
+
+    def flood():
+        # 在监听线程的事件循环上一次写入超过缓冲区容量的事件，订阅任务来不及读取
+        for index in range(capacity + 100):
+            backend.notify(f"触发 {index}", INFO, "ctrl+alt+t", TRIGGER)
+
+    async def scenario():
+        client = await rpc.RpcClient.connect(path)
+        try:
+            subscription = (await client.call("subscribe"))["subscription"]
+            backend.loop.call_soon_threadsafe(flood)
+            first = await client.notifications.get()
+            assert first["method"] == "missed"
+            assert first["params"] == {"subscription": subscription, "count": 100}
+            event = await client.notifications.get()
+            assert event["method"] == "event"
+            assert event["params"]["kind"] == TRIGGER and event["params"]["message"] == "触发 100"
+        finally:
+            await client.close()
+
+    run(scenario)
+
+
+def test_malformed_line_gets_parse_error(server):
+    backend, path = server
+
+    async def scenario():
+        reader, writer = await asyncio.open_unix_connection(path)
+        try:
+            writer.write(b'{"jsonrpc": "2.0", "id": 1, "method": \n')
+            response = json.loads(await reader.readline())
+            assert response["id"] is None and response["error"]["code"] == rpc.PARSE_ERROR
+            writer.write(b'[1, 2]\n')
+            response = json.loads(await reader.readline())
+            assert response["error"]["code"] == rpc.INVALID_REQUEST
+            # 连接仍然可用
+            writer.write(b'{"jsonrpc": "2.0", "id": 2, "method": "ping"}\n')
+            assert json.loads(await reader.readline()) == {"jsonrpc": "2.0", "id": 2, "result": "pong"}
+        finally:
+            writer.close()
+
+    run(scenario)
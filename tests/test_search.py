@@ -0,0 +1,29 @@
+import time
+
+from search import SearchIndex
+
+
+def make_index(entries):
+    index = SearchIndex()
+    index.updateMany((shortcut, {"command": command, "description": ""})
+                     for shortcut, command in entries.items())
+    return index
+
+
+def test_prefix_and_fuzzy_terms():
+    index = make_index({"ctrl+alt+c": "chrome --new-window", "ctrl+alt+f": "firefox"})
+    assert index.search("chro") == {"ctrl+alt+c"}
+    assert index.search("chrm") == {"ctrl+alt+c"}
+    assert index.search("frfx") == {"ctrl+alt+f"}
+    # 字符顺序不对时不匹配
+    assert index.search("cmorh") == set()
+
+
+def test_fuzzy_miss_is_linear():
+    # 曾用惰性正则实现，匹配失败时回溯是指数级的：9 个字符约 1 秒，12 个字符不结束
+    token = "a" * 40
+    index = make_index({"ctrl+alt+a": token})
+    start = time.perf_counter()
+    for length in range(2, 30):
+        assert index.search("a" * length + "b") == set()
+    assert time.perf_counter() - start < 0.05
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from storage import JsonStore, MigrationError, SqliteStore, openStore
+
+
+def test_failed_migration_is_retried(tmp_path):
+    legacy = tmp_path / "shortcuts.json"
+    database = str(tmp_path / "shortcuts.db")
+    legacy.write_text('{"alt+ctrl+T": {"command": ', encoding="utf-8")
+    errors = []
+    store = openStore(database, onError=errors.append)
+    try:
+        assert len(errors) == 1 and isinstance(errors[0], MigrationError)
+        assert not store.isMigrated() and len(store.load()) == 0
+    finally:
+        store.close()
+
+    # 修复旧配置后下次启动重新迁移，快捷键转换为规范形式
+    legacy.write_text(json.dumps({"alt+ctrl+T": {"command": "notepad", "throttle": {"minInterval": 1}}}),
+                      encoding="utf-8")
+    errors.clear()
+    store = openStore(database, onError=errors.append)
+    try:
+        assert errors == [] and store.isMigrated()
+        table = store.load()
+        assert list(table) == ["ctrl+alt+t"]
+        assert table["ctrl+alt+t"] == {"command": "notepad", "description": "",
+                                       "throttle": {"minInterval": 1}}
+    finally:
+        store.close()
+
+    # 已迁移后不再读取旧配置
+    legacy.write_text(json.dumps({"ctrl+alt+x": {"command": "x"}}), encoding="utf-8")
+    store = openStore(database)
+    try:
+        assert list(store.load()) == ["ctrl+alt+t"]
+    finally:
+        store.close()
+
+
+@pytest.fixture
+def table(tmp_path):
+    store = SqliteStore(str(tmp_path / "shortcuts.db"))
+    store.commit({f"ctrl+alt+{index}": {"command": f"c{index}", "description": f"d{index}"}
+                  for index in range(10)})
+    table = store.load()
+    table.cacheSize = 3
+    yield table
+    store.close()
+
+
+def test_sqlite_table_cache_is_bounded(table):
+    assert len(table) == 10 and len(table.cache) == 0
+    for index in range(10):
+        assert table[f"ctrl+alt+{index}"]["command"] == f"c{index}"
+    assert list(table.cache) == ["ctrl+alt+7", "ctrl+alt+8", "ctrl+alt+9"]
+    # 命中缓存时移到最近使用的位置
+    table["ctrl+alt+7"]
+    assert list(table.cache) == ["ctrl+alt+8", "ctrl+alt+9", "ctrl+alt+7"]
+    # 被淘汰的行重新从数据库读取
+    assert table["ctrl+alt+0"]["description"] == "d0"
+    assert "ctrl+alt+8" not in table.cache
+    # 流式遍历不填充缓存
+    assert len(list(table.items())) == 10
+    assert len(table.cache) == 3
+
+
+def test_sqlite_table_pop(table):
+    table["ctrl+alt+1"]
+    assert table.pop("ctrl+alt+1") == {"command": "c1", "description": "d1"}
+    assert "ctrl+alt+1" not in table and "ctrl+alt+1" not in table.cache
+    # 未缓存的行从数据库读取后删除
+    assert table.pop("ctrl+alt+2")["command"] == "c2"
+    assert len(table) == 8
+    assert table.pop("ctrl+alt+1", "missing") == "missing"
+    with pytest.raises(KeyError):
+        del table["ctrl+alt+1"]
+    with pytest.raises(KeyError):
+        table["ctrl+alt+1"]
+    table["ctrl+alt+1"] = {"command": "new", "description": ""}
+    assert table["ctrl+alt+1"]["command"] == "new"
+
+
+def test_json_store_iteration_survives_concurrent_edits(tmp_path):
+    store = JsonStore(str(tmp_path / "shortcuts.json"))
+    table = store.load()
+    table.update({f"ctrl+alt+{index}": {"command": str(index)} for index in range(3)})
+    items = store.iterItems()
+    assert next(items)[0] == "ctrl+alt+0"
+    # 分片遍历期间界面修改了快捷键表
+    table["ctrl+alt+x"] = {"command": "x"}
+    del table["ctrl+alt+1"]
+    assert [shortcut for shortcut, _ in items] == ["ctrl+alt+1", "ctrl+alt+2"]
+    store.close()
@@ -0,0 +1,71 @@
+import csv
+import json
+
+import pytest
+
+from backend import ShortcutBackend
+from transfer import importShortcuts, exportShortcuts
+
+
+@pytest.fixture
+def backend(tmp_path, fake_keyboard):
+    backend = ShortcutBackend(str(tmp_path / "shortcuts.json"), watchConfig=False)
+    yield backend
+    backend.shutdown()
+
+
+def write_jsonl(path, records):
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n", encoding="utf-8")
+
+
+def test_bad_records_are_reported_per_line(backend, tmp_path):
+    path = tmp_path / "in.jsonl"
+    write_jsonl(path, [{"shortcut": "ctrl+alt+a", "command": "a"},
+                       {"shortcut": "ctrl+e", "command": "x", "throttle": 5},
+                       {"shortcut": "", "command": "x"},
+                       {"shortcut": "ctrl+alt+b", "command": "b"}])
+    report = importShortcuts(backend, str(path))
+    assert report.imported == 2
+    assert [line for line, _, _ in report.errors] == [2, 3]
+    assert sorted(backend.shortcuts) == ["ctrl+alt+a", "ctrl+alt+b"]
+
+
+def test_unexpected_exception_becomes_report_entry(backend, tmp_path, monkeypatch):
+    path = tmp_path / "in.jsonl"
+    write_jsonl(path, [{"shortcut": "ctrl+alt+a", "command": "a"},
+                       {"shortcut": "ctrl+alt+b", "command": "b"}])
+    check = backend.checkShortcut
+
+    def flaky(shortcut, *args):
+        if shortcut == "ctrl+alt+a":
+            raise AttributeError("boom")
+        return check(shortcut, *args)
+
+    monkeypatch.setattr(backend, "checkShortcut", flaky)
+    report = importShortcuts(backend, str(path))
+    assert report.imported == 1
+    assert report.errors == [(1, "ctrl+alt+a", "boom")]
+
+
+def test_csv_row_errors_do_not_stop_import(backend, tmp_path):
+    path = tmp_path / "in.csv"
+    path.write_text("shortcut,command,description,options\n"
+                    "ctrl+alt+a,a,,\n"
+                    f"ctrl+alt+b,{'b' * 50},,\n"
+                    "ctrl+alt+c,c,,\n", encoding="utf-8")
+    limit = csv.field_size_limit(20)
+    try:
+        report = importShortcuts(backend, str(path))
+    finally:
+        csv.field_size_limit(limit)
+    assert report.imported == 2
+    assert report.failed == 1
+    assert sorted(backend.shortcuts) == ["ctrl+alt+a", "ctrl+alt+c"]
+
+
+def test_export_round_trip(backend, tmp_path):
+    backend.addShortcut("ctrl+alt+a", "a", "说明", shell=True)
+    path = tmp_path / "out.jsonl"
+    assert exportShortcuts(backend, str(path)) == 1
+    record = json.loads(path.read_text(encoding="utf-8"))
+    assert record == {"shortcut": "ctrl+alt+a", "command": "a", "description": "说明", "shell": True}
@@ -0,0 +1,94 @@
+import json
+import time
+import threading
+
+import pytest
+
+from persistence import ConfigWriter
+from watcher import ConfigWatcher
+
+
+def write_json(path, config):
+    path.write_text(json.dumps(config), encoding="utf-8")
+
+
+@pytest.fixture
+def table():
+    return {}
+
+
+@pytest.fixture
+def writer(tmp_path, table):
+    writer = ConfigWriter(str(tmp_path / "shortcuts.json"), lambda: dict(table), delay=0)
+    yield writer
+    writer.close()
+
+
+def make_watcher(path, writer, changes, errors, **kwargs):
+    return ConfigWatcher(str(path), changes.append, errors.append, writer.isOwnWrite, **kwargs)
+
+
+def test_external_edit_is_reported(tmp_path, writer):
+    path = tmp_path / "shortcuts.json"
+    changes, errors = [], []
+    watcher = make_watcher(path, writer, changes, errors)
+    write_json(path, {"ctrl+alt+t": {"command": "x"}})
+    watcher.check()
+    assert changes == [{"ctrl+alt+t": {"command": "x"}}]
+    # 内容没有变化时不重复回调
+    watcher.check()
+    assert len(changes) == 1 and errors == []
+
+
+def test_invalid_json_goes_to_on_error(tmp_path, writer):
+    path = tmp_path / "shortcuts.json"
+    changes, errors = [], []
+    watcher = make_watcher(path, writer, changes, errors)
+    path.write_text('{"ctrl+alt+t": ', encoding="utf-8")
+    watcher.check()
+    assert changes == [] and len(errors) == 1 and isinstance(errors[0], ValueError)
+
+
+def test_own_writes_are_ignored_even_when_superseded(tmp_path, writer, table):
+    path = tmp_path / "shortcuts.json"
+    changes, errors = [], []
+    watcher = make_watcher(path, writer, changes, errors)
+    table["ctrl+alt+a"] = {"command": "a"}
+    writer.schedule()
+    writer.flush()
+    first = path.read_bytes()
+    table["ctrl+alt+b"] = {"command": "b"}
+    writer.schedule()
+    writer.flush()
+    watcher.check()
+    # 监视器读到的是已被后一次写入取代的较早版本
+    path.write_bytes(first)
+    watcher.check()
+    assert changes == [] and errors == []
+
+
+def test_watcher_thread_ignores_own_burst_and_reports_external_edit(tmp_path, writer, table):
+    path = tmp_path / "shortcuts.json"
+    write_json(path, {})
+    changed = threading.Event()
+    changes, errors = [], []
+
+    def onChange(config):
+        changes.append(config)
+        changed.set()
+
+    watcher = ConfigWatcher(str(path), onChange, errors.append, writer.isOwnWrite,
+                            debounce=0.05, pollInterval=0.05)
+    watcher.start()
+    try:
+        for index in range(20):
+            table[f"ctrl+alt+{index}"] = {"command": str(index)}
+            writer.schedule()
+            writer.flush()
+        time.sleep(0.3)
+        assert changes == []
+        write_json(path, {"ctrl+alt+x": {"command": "x"}})
+        assert changed.wait(5)
+        assert changes == [{"ctrl+alt+x": {"command": "x"}}] and errors == []
+    finally:
+        watcher.stop()
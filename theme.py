@@ -0,0 +1,261 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap, QPainter, QLinearGradient, QColor, QPen
+
+# 全部界面样式编译为一份应用级样式表，只在启动时解析一次。
+# 控件按类名或 objectName 匹配，状态变化通过动态属性 state 切换（见 set_state），
+# 不再为每个控件实例或每次状态切换单独设置样式表。
+DIALOG_BACKGROUND = """qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
+                    stop: 0 #1a1a2a, stop: 0.5 #16213e, stop: 1 #0f3460)"""
+
+STYLESHEET = f"""
+    ShortcutManagerFrontend {{
+        background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
+            stop: 0 #0c0c1a, stop: 0.3 #1a1a2a, stop: 0.7 #16213e, stop: 1 #0f3460);
+        color: #e0e0e0;
+    }}
+    QLabel#titleLabel {{
+        color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 #00a8ff, stop:0.5 #00d4ff, stop:1 #00a8ff);
+        background-color: rgba(20, 20, 30, 180);
+        padding: 15px;
+        border-radius: 10px;
+        border: 2px solid rgba(0, 168, 255, 100);
+    }}
+    QFrame#statusFrame, QFrame#statusFrame QFrame {{
+        background-color: rgba(20, 25, 40, 180);
+        border: 1px solid rgba(100, 150, 255, 80);
+        border-radius: 8px;
+        padding: 5px;
+    }}
+    QLabel#statusLabel {{
+        color: #00d4ff;
+        font-size: 11px;
+        font-weight: bold;
+    }}
+
+    TechLineEdit {{
+        background-color: rgba(30, 30, 40, 200);
+        border: 2px solid rgba(100, 150, 255, 100);
+        border-radius: 8px;
+        padding: 5px 10px;
+        color: #ffffff;
+        font-size: 12px;
+        selection-background-color: rgba(0, 150, 255, 150);
+    }}
+    TechLineEdit:focus {{
+        border: 2px solid rgba(0, 150, 255, 200);
+        background-color: rgba(35, 35, 45, 200);
+    }}
+    TechLineEdit:hover {{
+        border: 2px solid rgba(100, 180, 255, 150);
+    }}
+
+    TechTableView {{
+        background-color: rgba(25, 25, 35, 180);
+        border: 1px solid rgba(100, 150, 255, 80);
+        border-radius: 8px;
+        gridline-color: rgba(100, 150, 255, 50);
+        color: #e0e0e0;
+        font-size: 11px;
+        outline: none;
+    }}
+    TechTableView::item {{
+        padding: 8px;
+        border-bottom: 1px solid rgba(100, 150, 255, 30);
+    }}
+    TechTableView::item:selected {{
+        background-color: rgba(0, 150, 255, 150);
+        color: white;
+    }}
+    TechTableView::item:hover {{
+        background-color: rgba(100, 150, 255, 50);
+    }}
+    TechTableView QHeaderView::section {{
+        background-color: rgba(20, 20, 30, 220);
+        color: #00a8ff;
+        padding: 8px;
+        border: none;
+        font-weight: bold;
+        font-size: 11px;
+        border-bottom: 2px solid rgba(0, 168, 255, 100);
+    }}
+    TechTableView QScrollBar:vertical {{
+        background-color: rgba(30, 30, 40, 150);
+        width: 12px;
+        border-radius: 6px;
+    }}
+    TechTableView QScrollBar::handle:vertical {{
+        background-color: rgba(100, 150, 255, 120);
+        border-radius: 6px;
+        min-height: 20px;
+    }}
+    TechTableView QScrollBar::handle:vertical:hover {{
+        background-color: rgba(100, 180, 255, 180);
+    }}
+    TechTableView QScrollBar::add-line:vertical, TechTableView QScrollBar::sub-line:vertical {{
+        border: none;
+        background: none;
+    }}
+
+    TechCheckBox {{
+        color: #b0b0b0;
+        font-size: 11px;
+        spacing: 8px;
+    }}
+    TechCheckBox::indicator {{
+        width: 16px;
+        height: 16px;
+        border: 2px solid rgba(100, 150, 255, 150);
+        border-radius: 3px;
+        background-color: rgba(30, 30, 40, 200);
+    }}
+    TechCheckBox::indicator:hover {{
+        border: 2px solid rgba(100, 180, 255, 200);
+    }}
+    TechCheckBox::indicator:checked {{
+        background-color: rgba(0, 150, 255, 200);
+        border: 2px solid rgba(0, 150, 255, 200);
+    }}
+    TechCheckBox::indicator:checked:hover {{
+        background-color: rgba(0, 180, 255, 200);
+        border: 2px solid rgba(0, 180, 255, 200);
+    }}
+
+    EventLogDialog, DiagnosticsDialog {{
+        background: {DIALOG_BACKGROUND};
+    }}
+    DiagnosticsDialog QLabel {{
+        color: #a0d0ff;
+    }}
+    AddShortcutDialog {{
+        background: {DIALOG_BACKGROUND};
+        border: 1px solid rgba(100, 150, 255, 100);
+        border-radius: 10px;
+    }}
+    QLabel#dialogTitle {{
+        color: #00a8ff;
+        font-size: 18px;
+        font-weight: bold;
+        padding: 10px;
+        background-color: rgba(20, 20, 30, 150);
+        border-radius: 8px;
+        border: 1px solid rgba(100, 150, 255, 80);
+    }}
+    QLabel#fieldLabel {{
+        color: #b0b0ff;
+        font-weight: bold;
+        font-size: 12px;
+    }}
+    QLabel#captureStatus {{
+        color: #00d4ff;
+        background-color: rgba(20, 25, 40, 180);
+        padding: 12px;
+        border-radius: 8px;
+        border: 1px solid rgba(0, 212, 255, 80);
+        font-size: 12px;
+        font-weight: bold;
+    }}
+    QLabel#captureStatus[state="capturing"] {{
+        color: #ffaa00;
+        background-color: rgba(40, 30, 20, 180);
+        border: 1px solid rgba(255, 170, 0, 100);
+    }}
+    QLabel#captureStatus[state="conflict"] {{
+        color: #ff6060;
+        background-color: rgba(40, 20, 20, 180);
+        border: 1px solid rgba(255, 96, 96, 100);
+    }}
+
+    QMessageBox#techMessageBox {{
+        background: {DIALOG_BACKGROUND};
+        border: 1px solid rgba(100, 150, 255, 100);
+        border-radius: 10px;
+    }}
+    QMessageBox#techMessageBox QLabel {{
+        color: #e0e0e0;
+        font-size: 12px;
+    }}
+    QMessageBox#techMessageBox QPushButton {{
+        background-color: rgba(0, 120, 220, 180);
+        color: white;
+        border: none;
+        padding: 8px 15px;
+        border-radius: 5px;
+        font-weight: bold;
+        min-width: 80px;
+    }}
+    QMessageBox#techMessageBox QPushButton:hover {{
+        background-color: rgba(0, 150, 255, 200);
+    }}
+
+    QMenu#trayMenu {{
+        background-color: rgba(30, 30, 45, 220);
+        border: 1px solid rgba(100, 150, 255, 100);
+        border-radius: 5px;
+        padding: 5px;
+    }}
+    QMenu#trayMenu::item {{
+        color: #e0e0e0;
+        padding: 5px 15px;
+        border-radius: 3px;
+    }}
+    QMenu#trayMenu::item:selected {{
+        background-color: rgba(0, 150, 255, 150);
+    }}
+"""
+
+# TechButton 各状态的渐变（上、下）颜色
+BUTTON_GRADIENTS = {
+    "normal": ((0, 120, 220), (0, 80, 180)),
+    "hover": ((0, 180, 255), (0, 120, 220)),
+    "down": ((0, 150, 255), (0, 100, 200)),
+}
+BUTTON_BORDER = (100, 180, 255)
+
+# (宽, 高, 状态, 设备像素比) -> 按钮背景 QPixmap
+button_cache = {}
+
+
+def install(app):
+    #把主题样式表设置到应用程序上，重复调用不会重新解析"""
+    if app.property("techTheme"):
+        return
+    app.setStyleSheet(STYLESHEET)
+    app.setProperty("techTheme", True)
+
+
+def set_state(widget, state):
+    #切换控件的 state 动态属性并只重新计算该控件的样式"""
+    if widget.property("state") == state:
+        return
+    widget.setProperty("state", state)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+
+
+def button_background(width, height, state, ratio=1.0):
+    #返回按钮背景（渐变圆角矩形和边框），每种尺寸和状态只绘制一次"""
+    key = (width, height, state, ratio)
+    pixmap = button_cache.get(key)
+    if pixmap is not None:
+        return pixmap
+    pixmap = QPixmap(round(width * ratio), round(height * ratio))
+    pixmap.setDevicePixelRatio(ratio)
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    top, bottom = BUTTON_GRADIENTS[state]
+    gradient = QLinearGradient(0, 0, 0, height)
+    gradient.setColorAt(0, QColor(*top))
+    gradient.setColorAt(1, QColor(*bottom))
+    painter.setBrush(gradient)
+    painter.setPen(Qt.NoPen)
+    painter.drawRoundedRect(0, 0, width, height, 5, 5)
+    painter.setPen(QPen(QColor(*BUTTON_BORDER), 1))
+    painter.setBrush(Qt.NoBrush)
+    painter.drawRoundedRect(0, 0, width - 1, height - 1, 5, 5)
+    painter.end()
+    button_cache[key] = pixmap
+    return pixmap
@@ -0,0 +1,205 @@
+import os
+import csv
+import json
+
+from backend import BatchError
+from chords import parseSequence
+from conflicts import ConflictIndex
+
+# CSV 列：快捷键、命令、描述，其余选项以 JSON 形式放在 options 列
+CSV_FIELDS = ("shortcut", "command", "description", "options")
+
+
+def detectFormat(path, format=None):
+    #按扩展名判断格式：.csv 为 CSV，其他（.jsonl/.ndjson 等）为 JSON Lines#
+    if format:
+        return format.lower()
+    return "csv" if os.path.splitext(path)[1].lower() == ".csv" else "jsonl"
+
+
+def readRecords(path, format=None):
+    #逐条读取记录，生成 (行号, 记录字典或异常)，不把整个文件读入内存#
+    if detectFormat(path, format) == "csv":
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            while True:
+                # 单行格式错误（如字段超长）作为该行的错误报告，读取器可以继续读后面的行
+                start = reader.line_num + 1
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as e:
+                    yield start, ValueError(f"CSV 格式错误: {str(e)}")
+                    continue
+                try:
+                    record = {"shortcut": row.get("shortcut") or "",
+                              "command": row.get("command") or "",
+                              "description": row.get("description") or ""}
+                    if row.get("options"):
+                        options = json.loads(row["options"])
+                        if not isinstance(options, dict):
+                            raise ValueError("options 列必须是 JSON 对象")
+                        record.update(options)
+                except ValueError as e:
+                    yield reader.line_num, e
+                    continue
+                yield reader.line_num, record
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            for lineNo, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("每行必须是 JSON 对象")
+                except ValueError as e:
+                    yield lineNo, e
+                    continue
+                yield lineNo, record
+
+
+class ImportReport:
+    #导入结果：成功条数与逐条错误（保留前 maxErrors 条明细）#
+    maxErrors = 1000
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def addError(self, lineNo, shortcut, message):
+        self.failed += 1
+        if len(self.errors) < self.maxErrors:
+            self.errors.append((lineNo, shortcut, message))
+
+    def summary(self):
+        return f"导入完成: 成功 {self.imported} 条，失败 {self.failed} 条"
+
+
+class ShortcutImporter:
+    #流式导入快捷键，每次 step() 读取并应用至多一批记录#
+    # 每条记录先用 normalize_shortcut 标准化并单独校验，无效记录写入报告而不影响其他记录；
+    # 文件中重复的快捷键保留第一条，已存在的快捷键被覆盖；
+    # 与现有快捷键或本批记录重复、互为前缀的记录作为冲突报告。
+    # onError(行号, 快捷键, 错误信息) 在发现每条错误时调用。
+    # 界面在事件循环空闲时逐批调用 step()，两批之间可以处理重绘和输入；
+    # 命令行直接调用 run() 导入全部记录。
+
+    def __init__(self, backend, path, format=None, chunkSize=1000, onError=None):
+        self.backend = backend
+        self.chunkSize = chunkSize
+        self.onError = onError
+        self.records = readRecords(path, format)
+        self.report = ImportReport()
+        # 已读取到的行号，用于显示进度
+        self.lineNo = 0
+        self.done = False
+        self.seen = set()
+        self.chunk = []
+        # 当前批次内尚未应用的记录
+        self.pending = ConflictIndex()
+
+    def fail(self, lineNo, shortcut, message):
+        self.report.addError(lineNo, shortcut, message)
+        if self.onError:
+            self.onError(lineNo, shortcut, message)
+
+    def applyChunk(self):
+        operations = [operation for _, operation in self.chunk]
+        try:
+            self.backend.applyBatch(operations)
+            self.report.imported += len(operations)
+        except BatchError as e:
+            # 逐条校验已通过，这里只会是应用阶段的错误，整批已回滚
+            for lineNo, operation in self.chunk:
+                self.fail(lineNo, operation[1], str(e))
+        self.chunk.clear()
+        self.pending.clear()
+
+    def step(self):
+        #读取记录直到应用一批或读完文件，返回是否已全部完成；读取文件失败时抛出 OSError#
+        if self.done:
+            return True
+        for lineNo, record in self.records:
+            self.lineNo = lineNo
+            self.add(lineNo, record)
+            if len(self.chunk) >= self.chunkSize:
+                self.applyChunk()
+                return False
+        if self.chunk:
+            self.applyChunk()
+        self.done = True
+        return True
+
+    def add(self, lineNo, record):
+        #校验一条记录，通过时放入当前批次#
+        if isinstance(record, Exception):
+            self.fail(lineNo, "", str(record))
+            return
+        record = dict(record)
+        shortcut = record.pop("shortcut", "")
+        command = record.pop("command", "")
+        description = record.pop("description", "") or ""
+        try:
+            if not isinstance(shortcut, str) or not shortcut.strip():
+                raise ValueError("快捷键不能为空")
+            if not isinstance(command, str) or not isinstance(description, str):
+                raise ValueError("命令和描述必须是字符串")
+            key, _ = self.backend.checkShortcut(shortcut, command, description, record)
+            if key in self.seen:
+                raise ValueError(f"与前面的记录重复: {key}")
+            sequence = parseSequence(key)
+            for conflict in self.backend.conflicts.check(sequence, ignore=key) + self.pending.check(sequence):
+                if conflict.blocking:
+                    raise ValueError(f"冲突: {conflict}")
+        except Exception as e:
+            # 任何单条记录的错误都只写入报告，不中断整个导入
+            self.fail(lineNo, shortcut if isinstance(shortcut, str) else "", str(e))
+            return
+        self.seen.add(key)
+        self.pending.add(key, sequence)
+        self.chunk.append((lineNo, ("add", key, command, description, record)))
+
+    def run(self):
+        #导入全部记录，返回 ImportReport#
+        try:
+            while not self.step():
+                pass
+        finally:
+            self.close()
+        return self.report
+
+    def close(self):
+        #关闭输入文件（中途放弃导入时调用）#
+        self.records.close()
+        self.done = True
+
+
+def importShortcuts(backend, path, format=None, chunkSize=1000, onError=None):
+    #流式导入快捷键，按 chunkSize 条一批应用，返回 ImportReport#
+    return ShortcutImporter(backend, path, format, chunkSize, onError).run()
+
+
+def exportShortcuts(backend, path, format=None):
+    #从存储流式导出全部快捷键，返回导出条数#
+    count = 0
+    if detectFormat(path, format) == "csv":
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            for shortcut, data in backend.store.iterItems():
+                options = {k: v for k, v in data.items() if k not in ("command", "description")}
+                writer.writerow((shortcut, data.get("command", ""), data.get("description", ""),
+                                 json.dumps(options, ensure_ascii=False) if options else ""))
+                count += 1
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            for shortcut, data in backend.store.iterItems():
+                record = {"shortcut": shortcut}
+                record.update(data)
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+    return count
@@ -0,0 +1,135 @@
+import time
+from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QStyle
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSignal
+
+import theme
+from backend import ShortcutBackend
+from latency import StartupTimer
+from events import INFO, WARNING
+
+# 从进程启动到快捷键可用的目标耗时（毫秒），超过时启动耗时以警告级别记录
+ARMED_BUDGET_MS = 200
+# 等待监听线程装好钩子的最长时间（秒），超时后只报告已完成的阶段
+ARMED_TIMEOUT = 5.0
+
+
+class QtNotifier(QObject):
+    #后端的 Qt 适配：把其他线程投递的函数经队列连接转到界面线程执行"""
+    called = pyqtSignal(object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.called.connect(self.invoke, Qt.QueuedConnection)
+
+    def post(self, function, *args):
+        self.called.emit(function, args)
+
+    def invoke(self, function, args):
+        function(*args)
+
+
+class TrayController(QObject):
+    #应用控制器：持有后端和托盘图标，主窗口在第一次显示时才创建"""
+    # 启动顺序：加载配置并启动监听 -> 托盘图标 -> （不是 --minimized 时）主窗口。
+    # 主窗口模块和其中的样式表、表格都在第一次显示时才导入和构建。
+
+    def __init__(self, config_file="shortcuts.json", trace_latency=False, icon=None, startup=None,
+                 rpc_socket=None):
+        super().__init__()
+        self.startup = startup or StartupTimer()
+        self.icon = icon
+        self.window = None
+        self.tray_icon = None
+        self.backend = ShortcutBackend(config_file, traceLatency=trace_latency,
+                                       notifier=QtNotifier(self), rpcSocket=rpc_socket)
+        self.startup.mark("config")
+        self.backend.startListener()
+        self.startup.mark("listener")
+        # 全部界面共用一份应用级样式表，托盘菜单和之后创建的窗口都不再单独解析样式
+        theme.install(QApplication.instance())
+        self.setup_tray_icon()
+        self.startup.mark("tray")
+        # 监听线程装好钩子后在事件循环中记录启动耗时
+        self.armed_timer = QTimer(self)
+        self.armed_timer.timeout.connect(self.check_armed)
+        self.armed_timer.start(10)
+
+    def setup_tray_icon(self):
+        #设置系统托盘图标"""
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            return
+        self.tray_icon = QSystemTrayIcon(self)
+        if self.icon is not None:
+            self.tray_icon.setIcon(self.icon)
+        else:
+            self.tray_icon.setIcon(QApplication.style().standardIcon(QStyle.SP_ComputerIcon))
+
+        # 菜单挂在托盘图标上，随控制器一起存在
+        self.tray_menu = QMenu()
+        self.tray_menu.setObjectName("trayMenu")
+
+        show_action = QAction("显示", self)
+        show_action.triggered.connect(self.show_window)
+        self.tray_menu.addAction(show_action)
+
+        hide_action = QAction("隐藏", self)
+        hide_action.triggered.connect(self.hide_window)
+        self.tray_menu.addAction(hide_action)
+
+        self.tray_menu.addSeparator()
+
+        quit_action = QAction("退出", self)
+        quit_action.triggered.connect(self.quit)
+        self.tray_menu.addAction(quit_action)
+
+        self.tray_icon.setContextMenu(self.tray_menu)
+        self.tray_icon.activated.connect(self.tray_icon_activated)
+        self.tray_icon.show()
+
+    def has_tray(self):
+        return self.tray_icon is not None and self.tray_icon.isVisible()
+
+    def tray_icon_activated(self, reason):
+        #托盘图标激活处理"""
+        if reason == QSystemTrayIcon.DoubleClick:
+            if self.window is not None and self.window.isVisible():
+                self.hide_window()
+            else:
+                self.show_window()
+
+    def show_window(self):
+        #显示主窗口，第一次调用时才创建"""
+        if self.window is None:
+            from frontend import ShortcutManagerFrontend
+            self.window = ShortcutManagerFrontend(controller=self)
+            self.startup.mark("window")
+        self.window.show()
+        self.window.raise_()
+        self.window.activateWindow()
+
+    def hide_window(self):
+        if self.window is not None:
+            self.window.hide()
+
+    def check_armed(self):
+        #快捷键可用后报告启动耗时；监听启动失败时 5 秒后报告已有的阶段"""
+        if self.backend.armed.is_set():
+            self.startup.mark("armed", self.backend.armedAt)
+        elif time.perf_counter() - self.startup.start < ARMED_TIMEOUT:
+            return
+        self.armed_timer.stop()
+        self.report_startup()
+
+    def report_startup(self):
+        summary = self.startup.summary()
+        print(summary)
+        armed = self.startup.elapsedMs("armed")
+        level = WARNING if armed is None or armed > ARMED_BUDGET_MS else INFO
+        self.backend.notify(summary, level)
+
+    def quit(self):
+        #退出应用程序"""
+        self.backend.shutdown()
+        if self.tray_icon is not None:
+            self.tray_icon.hide()
+        QApplication.quit()
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import select
+import struct
+import threading
+
+from persistence import fileDigest
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_MODIFY
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyError(OSError):
+    pass
+
+
+def openInotify(directory):
+    #通过 ctypes 打开 inotify 并监视目录，失败时抛出 InotifyError#
+    if not sys.platform.startswith('linux'):
+        raise InotifyError("inotify 仅在 Linux 上可用")
+    import ctypes
+    import ctypes.util
+    libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        raise InotifyError(ctypes.get_errno(), "inotify_init1 失败")
+    if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+        errno = ctypes.get_errno()
+        os.close(fd)
+        raise InotifyError(errno, "inotify_add_watch 失败")
+    return fd
+
+
+class ConfigWatcher:
+    #配置文件监视器#
+    # Linux 上使用 inotify 监视配置文件所在目录（原子重命名会替换文件），
+    # 其他平台或 inotify 不可用时按 mtime + 大小轮询，再用内容哈希确认变化。
+    # 连续写入在 debounce 秒内合并为一次；解析在监视线程中完成，
+    # 成功时调用 onChange(数据)，文件不完整或格式错误时调用 onError(异常)。
+
+    def __init__(self, path, onChange, onError=None, isOwnWrite=None,
+                 debounce=0.3, pollInterval=1.0):
+        self.path = os.path.abspath(path)
+        self.onChange = onChange
+        self.onError = onError
+        self.isOwnWrite = isOwnWrite
+        self.debounce = debounce
+        self.pollInterval = pollInterval
+        self.lastDigest = None
+        self.thread = None
+        self.stopEvent = threading.Event()
+        self.wakeFds = None
+        self.inotifyFd = None
+
+    def start(self):
+        #启动监视线程，优先使用 inotify#
+        if self.thread is not None:
+            return
+        self.lastDigest = self.readDigest()
+        self.stopEvent.clear()
+        try:
+            self.inotifyFd = openInotify(os.path.dirname(self.path))
+            self.wakeFds = os.pipe()
+            target = self.runInotify
+        except (InotifyError, OSError, AttributeError):
+            self.inotifyFd = None
+            target = self.runPolling
+        self.thread = threading.Thread(target=target, name="config-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        #停止监视并等待线程退出#
+        thread, self.thread = self.thread, None
+        if thread is None:
+            return
+        self.stopEvent.set()
+        if self.wakeFds is not None:
+            os.write(self.wakeFds[1], b'x')
+        if thread is not threading.current_thread():
+            thread.join()
+        if self.inotifyFd is not None:
+            os.close(self.inotifyFd)
+            self.inotifyFd = None
+        if self.wakeFds is not None:
+            for fd in self.wakeFds:
+                os.close(fd)
+            self.wakeFds = None
+
+    def readDigest(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return fileDigest(f.read())
+        except OSError:
+            return None
+
+    def runInotify(self):
+        name = os.fsencode(os.path.basename(self.path))
+        pending = False
+        while not self.stopEvent.is_set():
+            # 有待处理的变化时等待 debounce 秒的静默期
+            timeout = self.debounce if pending else None
+            ready, _, _ = select.select([self.inotifyFd, self.wakeFds[0]], [], [], timeout)
+            if self.stopEvent.is_set():
+                return
+            if not ready:
+                pending = False
+                self.check()
+                continue
+            if self.inotifyFd in ready:
+                if self.readEvents(name):
+                    pending = True
+
+    def readEvents(self, name):
+        #读取 inotify 事件，返回是否涉及配置文件#
+        try:
+            buffer = os.read(self.inotifyFd, 65536)
+        except BlockingIOError:
+            return False
+        matched = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            length = EVENT_HEADER.unpack_from(buffer, offset)[3]
+            offset += EVENT_HEADER.size
+            eventName = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if eventName == name:
+                matched = True
+        return matched
+
+    def runPolling(self):
+        stamp = self.readStamp()
+        pending = False
+        while True:
+            timeout = self.debounce if pending else self.pollInterval
+            if self.stopEvent.wait(timeout):
+                return
+            current = self.readStamp()
+            if current != stamp:
+                stamp = current
+                pending = True
+            elif pending:
+                pending = False
+                self.check()
+
+    def readStamp(self):
+        try:
+            info = os.stat(self.path)
+            return info.st_mtime_ns, info.st_size
+        except OSError:
+            return None
+
+    def check(self):
+        #文件已稳定：比较内容哈希，变化时解析并回调#
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            # 原子替换过程中或文件被删除，保留当前配置
+            return
+        except OSError as e:
+            self.reportError(e)
+            return
+        digest = fileDigest(data)
+        if digest == self.lastDigest:
+            return
+        self.lastDigest = digest
+        if self.isOwnWrite is not None and self.isOwnWrite(digest):
+            return
+        try:
+            config = json.loads(data.decode('utf-8'))
+        except ValueError as e:
+            self.reportError(e)
+            return
+        self.onChange(config)
+
+    def reportError(self, error):
+        if self.onError:
+            self.onError(error)